@@ -1,28 +1,36 @@
+import importlib
 import streamlit as st
-from tabs import tab_models, tab_pun, tab_commodities, tab_terna, tab_weather
+from core import cache, perf
 
 st.set_page_config(page_title="Energy Dashboard", layout="wide")
 
-st.title("📊 Energy Dashboard")
-tab1, tab2, tab3, tab4, tab5 = st.tabs([
-    "📈 ML Models", 
-    "💡 PUN Index GME", 
-    "💰 Commodities", 
-    "🔌 Terna", 
-    "🌦️ Weather"
-])
-
-with tab1:
-    tab_models.render()
+# === VIEWS ===
+# Only the open tab runs: st.tabs tracks the selection (on_change="rerun", kept in the URL as
+# ?view=... so reruns and links keep it) and each view's module, with its loaders and heavy
+# imports, is imported the first time the view is opened.
+VIEWS = [
+    ("📈 ML Models", "tabs.tab_models"),
+    ("💡 PUN Index GME", "tabs.tab_pun"),
+    ("💰 Commodities", "tabs.tab_commodities"),
+    ("🔌 Terna", "tabs.tab_terna"),
+    ("🌦️ Weather", "tabs.tab_weather"),
+    ("⏱️ Performance", "tabs.tab_performance"),
+]
 
-with tab2:
-    tab_pun.render()
-
-with tab3:
-    tab_commodities.render()
+st.title("📊 Energy Dashboard")
+tabs = st.tabs([label for label, _ in VIEWS], key="view", on_change="rerun", bind="query-params")
 
-with tab4:
-    tab_terna.render()
+for tab, (label, module) in zip(tabs, VIEWS):
+    if tab.open:
+        with tab, perf.stage(f"view:{label}"):  # with PERF_EVENTS set, one run per rerun of the view
+            importlib.import_module(module).render()
 
-with tab5:
-    tab_weather.render()
+# === DATA CACHE COUNTERS (after the tabs, so they include this run) ===
+with st.sidebar.expander("🗄️ Data cache"):
+    stats = cache.get_cache().stats()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Hits", stats["hits"])
+    col2.metric("Misses", stats["misses"])
+    col3.metric("Evictions", stats["evictions"])
+    st.caption(f"{stats['entries']} entries, {stats['bytes'] / 2**20:.1f} of {stats['max_bytes'] / 2**20:.0f} MiB; "
+               f"{stats['invalidations']} invalidated, {stats['expirations']} expired")
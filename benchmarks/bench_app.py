@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+# === DASHBOARD LATENCY: COLD START AND PER-VIEW RERUNS ===
+# cold start: first run of the app in a fresh interpreter (app imports + first loads), measured
+#             in a subprocess per repeat; the test harness import itself is excluded
+# open:       rerun that switches to a view (?view=<label>) for the first time in the session
+# rerun:      further reruns of the same view, e.g. after a widget interaction (warm caches)
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+TIMEOUT = 300
+
+COLD_START = """
+import json, sys, time
+sys.path.insert(0, {base!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout={timeout})
+t0 = time.perf_counter()
+at.run()
+print(json.dumps({{"seconds": time.perf_counter() - t0, "errors": len(at.exception),
+                  "views": [tab.label for tab in at.tabs]}}))
+"""
+
+
+def cold_start(app, repeats):
+    runs = []
+    for _ in range(repeats):
+        script = COLD_START.format(base=BASE_DIR, app=app, timeout=TIMEOUT)
+        out = subprocess.run([sys.executable, "-c", script], cwd=BASE_DIR, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(run["seconds"] for run in runs), runs[-1]
+
+
+def timed_run(at):
+    t0 = time.perf_counter()
+    at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - t0
+
+
+def per_view(app, views, repeats):
+    at = AppTest.from_file(app, default_timeout=TIMEOUT)
+    timed_run(at)
+    results = {}
+    for label in views:
+        at.query_params["view"] = label
+        opened = timed_run(at)
+        rerun = statistics.median(timed_run(at) for _ in range(repeats))
+        results[label] = (opened, rerun)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start and per-view rerun latency of the dashboard (AppTest)")
+    parser.add_argument("--app", default=APP_PATH, help="app script (e.g. an older app.py to compare against)")
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    app = os.path.abspath(args.app)
+
+    seconds, first = cold_start(app, args.repeats)
+    print(f"🧊 cold start: {seconds:.2f}s (median of {args.repeats}, {first['errors']} errors)")
+
+    print(f"{'view':<22}{'open s':>9}{'rerun s':>9}")
+    for label, (opened, rerun) in per_view(app, first["views"], args.repeats).items():
+        print(f"{label:<22}{opened:>9.3f}{rerun:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from benchmarks.tradefeeds_stub import start_server
+from core import schema
+from scripts import commodities
+
+# === SERIAL VS CONCURRENT COMMODITY INGESTION AGAINST A LOCAL STUB ===
+
+
+def run(mode, url, windows, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = schema.connect(os.path.join(tmp, "bench.db"))
+        start = time.perf_counter()
+        if mode == "serial":
+            commodities.run_serial(conn, windows, url=url)
+            seconds = time.perf_counter() - start
+            rows = conn.execute("SELECT COUNT(*) FROM commodity_prices").fetchone()[0]
+            stats = {"windows": len(windows), "rows": rows, "seconds": seconds,
+                     "windows_per_s": len(windows) / seconds, "rows_per_s": rows / seconds}
+        else:
+            stats = commodities.run_concurrent(conn, windows, workers=args.workers, rate=args.rate,
+                                               burst=args.burst, url=url, backoff=0.05)
+        conn.close()
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark commodity ingestion against a local Tradefeeds stub")
+    parser.add_argument("--latency", type=float, default=0.2, help="simulated server latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.1, help="fraction of 429/503 responses")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=20.0)
+    parser.add_argument("--burst", type=int, default=8)
+    parser.add_argument("--skip-serial", action="store_true", help="serial mode sleeps 1s per window")
+    args = parser.parse_args()
+
+    server, url = start_server(latency=args.latency, error_rate=args.error_rate)
+    windows = commodities.build_windows()
+
+    modes = ["concurrent"] if args.skip_serial else ["serial", "concurrent"]
+    for mode in modes:
+        stats = run(mode, url, windows, args)
+        print(f"⏱️ {mode:<10} {stats['windows']} windows, {stats['rows']} rows in {stats['seconds']:.2f}s "
+              f"({stats['windows_per_s']:.2f} windows/s, {stats['rows_per_s']:.0f} rows/s)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
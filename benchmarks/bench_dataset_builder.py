@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import synthetic  # noqa: E402
+from core import data_access, dataset_builder  # noqa: E402
+
+# === WIDE TABLE: PANDAS PIVOTS VS ONE SQLITE QUERY ===
+# "pivot" is what pipeline.load_base did before: one read per source table, pivoted and joined
+# in pandas. "sql" is core.dataset_builder, consumed chunk by chunk as the pipeline and the
+# feature store do. Both are timed over slices of a synthetic database; peak memory is the
+# Python heap (tracemalloc), which excludes SQLite's own page cache and sorter.
+ONE_DAY = pd.Timedelta(days=1)
+
+
+def pivot(start, end, freq, db_path):
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    periods = pd.date_range(start, end + ONE_DAY, freq=freq, inclusive="left")
+    day, next_day = start.strftime("%Y-%m-%d"), (end + ONE_DAY).strftime("%Y-%m-%d")
+    last = end.strftime("%Y-%m-%d")
+    df = pd.DataFrame({"date": periods})
+    pun = data_access.load("pun_prices", start=day, end=next_day, freq=freq, db_path=db_path)
+    pun_by_date = pun.set_index("date")["price"]
+    df["pun_Price"] = df["date"].map(pun_by_date)
+    commodity = data_access.load("commodity_prices", start=day, end=last, columns=["commodity", "date", "price"],
+                                 db_path=db_path)
+    commodity_pivot = commodity.pivot(index="date", columns="commodity", values="price").add_suffix("_Price")
+    commodity_pivot = commodity_pivot.reindex(periods.normalize()).set_axis(periods)
+    load = data_access.load("load_forecast", start=day, end=last, freq=freq, db_path=db_path)
+    load_pivot = load.pivot(index="date", columns="zone", values="load_mw").add_suffix("_Load")
+    weather = data_access.load("weather_data", start=day, end=last,
+                               columns=["city", "time"] + dataset_builder.WEATHER_FEATURES, freq=freq, db_path=db_path)
+    weather_pivot = weather.rename(columns={"time": "date"}).pivot(index="date", columns="city",
+                                                                   values=dataset_builder.WEATHER_FEATURES)
+    weather_pivot.columns = [f"{city}_{feature}" for feature, city in weather_pivot.columns]
+    df = df.set_index("date").join([commodity_pivot, load_pivot, weather_pivot]).reset_index()
+    df["target_pun"] = (df["date"] + ONE_DAY).map(pun_by_date)
+    return len(df)
+
+
+def stream(start, end, freq, db_path):
+    return sum(len(df) for df in dataset_builder.iter_wide(start, end, freq, db_path=db_path))
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    started = time.perf_counter()
+    rows = fn(*args)
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the pandas-pivot and SQLite builds of the wide table")
+    parser.add_argument("--years", type=int, default=5, help="years in the synthetic database")
+    parser.add_argument("--freq", default="h", help="resolution of PUN, load and weather: D, h, 15min")
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 92, 365], help="slice lengths, ending on the last day")
+    parser.add_argument("--all", action="store_true", help="also build the whole database")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "data.db")
+        synthetic.generate(db_path, args.years, args.freq)
+        last = pd.Timestamp(synthetic.END) - ONE_DAY
+        slices = [(last - pd.Timedelta(days=days - 1), last) for days in args.days]
+        if args.all:
+            slices.append((pd.Timestamp(synthetic.END) - pd.DateOffset(years=args.years) + ONE_DAY, last))
+
+        print(f"{'build':<8}{'days':>7}{'rows':>10}{'seconds':>10}{'peak MB':>10}")
+        for start, end in slices:
+            days = (end - start).days + 1
+            for label, fn in [("pivot", pivot), ("sql", stream)]:
+                rows, seconds, peak = measure(fn, start, end, args.freq, db_path)
+                print(f"{label:<8}{days:>7}{rows:>10,}{seconds:>10.3f}{peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from streamlit import dataframe_util  # noqa: E402
+from core import downsample  # noqa: E402
+
+# === CHART PAYLOAD: RAW VS DOWNSAMPLED ===
+# Payload = the Arrow bytes Streamlit ships to the browser for st.line_chart on every rerun;
+# encode = time to build them. The browser's parse and layout time grows with the same point count.
+
+
+def synthetic(hours, lines):
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2020-01-01", periods=hours, freq="h")
+    return pd.DataFrame(100 + np.cumsum(rng.normal(0, 1, (hours, lines)), axis=0), index=index,
+                        columns=[f"series_{i}" for i in range(lines)])
+
+
+def encode(frame, repeats):
+    """(payload bytes, median encode ms)"""
+    timings = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        payload = dataframe_util.convert_pandas_df_to_arrow_bytes(frame)
+        timings.append(time.perf_counter() - t0)
+    return len(payload), statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare chart payload and render time with and without downsampling")
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--lines", type=int, default=5, help="lines per chart (e.g. the commodity overview)")
+    parser.add_argument("--width", type=int, default=downsample.CHART_WIDTH)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'hourly data':<14}{'method':<8}{'points':>9}{'payload KB':>12}{'encode ms':>11}{'reduce ms':>11}")
+    for years in args.years:
+        frame = synthetic(years * 8760, args.lines)
+        size, encode_ms = encode(frame, args.repeats)
+        print(f"{f'{years}y x {args.lines}':<14}{'raw':<8}{len(frame):>9,}{size / 1024:>12,.0f}{encode_ms:>11.1f}")
+        for method in downsample.METHODS:
+            t0 = time.perf_counter()
+            reduced = downsample.downsample(frame, args.width, method)
+            reduce_ms = (time.perf_counter() - t0) * 1000
+            size, encode_ms = encode(reduced, args.repeats)
+            print(f"{'':<14}{method:<8}{len(reduced):>9,}{size / 1024:>12,.0f}{encode_ms:>11.1f}{reduce_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core import data_access, export, schema  # noqa: E402
+
+# === EXPORT MEMORY: DATAFRAME + to_csv VS STREAMING ===
+# "frame" is what the tabs did before: load the whole selection, then df.to_csv() in memory.
+# Peak memory is measured with tracemalloc (Python allocations, including numpy and pandas buffers).
+
+
+def populate(conn, years, zones):
+    rng = np.random.default_rng(0)
+    hours = [(datetime(2015, 1, 1) + timedelta(hours=h)).strftime("%Y-%m-%d %H:%M:%S") for h in range(years * 8760)]
+    with conn:
+        for zone in range(zones):
+            loads = rng.normal(30000, 5000, len(hours))
+            conn.executemany("INSERT INTO load_forecast (date, zone, load_mw) VALUES (?, ?, ?)",
+                             zip(hours, [f"zone_{zone}"] * len(hours), loads.tolist()))
+    return len(hours) * zones
+
+
+def frame_csv(db_path):
+    return len(data_access.load("load_forecast", db_path=db_path).to_csv(index=False).encode("utf-8"))
+
+
+def stream_csv(db_path):
+    return sum(len(block) for block in export.iter_csv("load_forecast", db_path=db_path))
+
+
+def stream_parquet(db_path):
+    with tempfile.TemporaryFile() as sink:
+        export.write_parquet(sink, "load_forecast", db_path=db_path)
+        return sink.tell()
+
+
+def measure(fn, db_path):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    size = fn(db_path)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of in-memory and streaming exports")
+    parser.add_argument("--years", type=int, default=5, help="years of hourly data per zone")
+    parser.add_argument("--zones", type=int, default=6)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = schema.connect(path)
+        rows = populate(conn, args.years, args.zones)
+        conn.close()
+        print(f"🏗️ load_forecast: {rows:,} hourly rows ({args.zones} zones × {args.years} years)")
+
+        print(f"{'export':<16}{'file MB':>10}{'seconds':>10}{'peak MB':>10}")
+        for label, fn in [("frame + to_csv", frame_csv), ("stream csv", stream_csv),
+                          ("stream parquet", stream_parquet)]:
+            size, seconds, peak = measure(fn, path)
+            print(f"{label:<16}{size / 2**20:>10.1f}{seconds:>10.2f}{peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from core import feature_grid, feature_selection
+
+# === TARGET CORRELATIONS: ONE O(n·p) PASS VS THE NOTEBOOK'S FULL df.corr() ===
+
+
+def wide_frame(rows, columns, nan_rate):
+    """Random-walk sources with a lag/rolling grid on top, and a next-day target driven by the first one."""
+    rng = np.random.default_rng(0)
+    values = rng.normal(0, 1, size=(rows, columns)).cumsum(axis=0) + 100
+    values[rng.random(values.shape) < nan_rate] = np.nan
+    df = pd.DataFrame(values, columns=[f"x{i}" for i in range(columns)])
+    grid = [{"columns": list(df.columns), "lags": [1, 2, 7, 14], "windows": [7, 28], "stats": ["mean", "std"]}]
+    df = pd.concat([df, feature_grid.generate(df, grid)], axis=1)
+    df["target_pun"] = np.roll(values[:, 0], -1) + rng.normal(0, 1, rows)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark target-correlation feature selection")
+    parser.add_argument("--rows", type=int, default=1827, help="rows (default: five years of days)")
+    parser.add_argument("--columns", type=int, nargs="+", default=[20, 60, 200],
+                        help="source columns; the grid adds 8 features per column")
+    parser.add_argument("--nan-rate", type=float, default=0.001)
+    parser.add_argument("--append-days", type=int, default=30, help="rows per streaming update")
+    args = parser.parse_args()
+
+    print(f"{'features':>9}{'df.corr s':>11}{'vector s':>10}{'speed-up':>10}{'append ms':>11}{'max err':>10}  same set")
+    for columns in args.columns:
+        df = wide_frame(args.rows, columns, args.nan_rate)
+
+        start = time.perf_counter()
+        reference = df.corr(numeric_only=True)["target_pun"].drop("target_pun")
+        corr_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        fast = feature_selection.target_correlations(df)
+        fast_s = time.perf_counter() - start
+
+        # streaming: the sums of everything but the last days, then one update with them
+        head, tail = df.iloc[:-args.append_days], df.iloc[-args.append_days:]
+        stats = feature_selection.TargetCorrelation(fast.index, "target_pun").update(head)
+        start = time.perf_counter()
+        streamed = stats.update(tail).correlations()
+        append_ms = (time.perf_counter() - start) * 1000
+
+        error = float(np.nanmax(np.abs(np.r_[fast - reference[fast.index], streamed - reference[fast.index]])))
+        same = feature_selection.select(fast) == feature_selection.select(reference)
+        print(f"{len(fast):>9,}{corr_s:>11.3f}{fast_s:>10.3f}{corr_s / fast_s:>9.1f}x{append_ms:>11.2f}"
+              f"{error:>10.1e}  {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import multiprocessing as mp
+import os
+import resource
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+import pandas as pd
+
+from core import feature_store
+
+# === LOAD TIME AND PEAK RSS: WIDE CSV VS PARQUET FEATURE STORE ===
+# Every measurement runs in a fresh process so peak RSS is not polluted by earlier runs;
+# the "imports only" row is the RSS floor every case pays for pandas + pyarrow.
+
+
+def synthetic_frame(rows, columns):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.normal(size=(rows, columns)), columns=[f"f{i}" for i in range(columns)])
+    df.insert(0, "date", pd.date_range("2000-01-01", periods=rows, freq="h"))
+    return df
+
+
+def _peak_rss_mb():
+    # VmHWM is reset on exec, unlike ru_maxrss which children inherit from the parent
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(kind, csv_path, root, columns, queue):
+    import pandas as pd
+    from core import feature_store
+
+    start = time.perf_counter()
+    if kind == "baseline":
+        df = pd.DataFrame()
+    elif kind == "csv":
+        df = pd.read_csv(csv_path, parse_dates=["date"], usecols=(["date"] + columns) if columns else None)
+    else:
+        df = feature_store.read_dataset("bench", columns=columns, root=root)
+    seconds = time.perf_counter() - start
+    queue.put((seconds, _peak_rss_mb(), df.shape))
+
+
+def measure(kind, csv_path, root, columns=None):
+    ctx = mp.get_context("spawn")
+    queue = ctx.Queue()
+    proc = ctx.Process(target=_measure, args=(kind, csv_path, root, columns, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare wide-CSV and Parquet feature-store loading")
+    parser.add_argument("--rows", type=int, default=87600, help="hourly rows (default: 10 years)")
+    parser.add_argument("--columns", type=int, default=100)
+    parser.add_argument("--project", type=int, default=10, help="columns read in the projected case")
+    args = parser.parse_args()
+
+    df = synthetic_frame(args.rows, args.columns)
+    projected = [f"f{i}" for i in range(args.project)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "bench.csv")
+        df.to_csv(csv_path, index=False)
+        feature_store.write_dataset(df, "bench", root=tmp)
+
+        print(f"{'case':<28}{'seconds':>10}{'peak RSS MB':>14}  shape")
+        for label, kind, columns in [
+            ("imports only", "baseline", None),
+            ("csv, all columns", "csv", None),
+            ("parquet, all columns", "parquet", None),
+            (f"csv, {args.project} columns", "csv", projected),
+            (f"parquet, {args.project} columns", "parquet", projected),
+        ]:
+            seconds, rss, shape = measure(kind, csv_path, tmp, columns)
+            print(f"{label:<28}{seconds:>10.3f}{rss:>14.1f}  {shape}")
+
+
+if __name__ == "__main__":
+    main()
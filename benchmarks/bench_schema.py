@@ -0,0 +1,104 @@
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core import schema
+
+# === RANGE-QUERY LATENCY: LEGACY to_sql LAYOUT VS MIGRATED SCHEMA ===
+# The legacy database mirrors what the old scripts produced: pun_prices and load_forecast
+# written by to_sql(replace) (no keys), weather_data and commodity_prices as originally declared.
+
+LEGACY_DDL = [
+    'CREATE TABLE pun_prices ("date" TEXT, "price" REAL)',
+    'CREATE TABLE load_forecast ("date" TEXT, "zone" TEXT, "load_mw" REAL)',
+    """CREATE TABLE weather_data (city TEXT, time TEXT, tavg REAL, tmin REAL, tmax REAL, prcp REAL,
+       snow REAL, wdir REAL, wspd REAL, wpgt REAL, pres REAL, tsun REAL, PRIMARY KEY (city, time))""",
+    """CREATE TABLE commodity_prices (id INTEGER PRIMARY KEY AUTOINCREMENT, commodity TEXT, date TEXT,
+       price REAL, unit TEXT, UNIQUE(commodity, date))""",
+]
+
+QUERIES = {
+    "pun_prices by date": (
+        "SELECT date, price FROM pun_prices WHERE date BETWEEN ? AND ?", lambda r: ()),
+    "load_forecast by zone, date": (
+        "SELECT date, load_mw FROM load_forecast WHERE zone = ? AND date BETWEEN ? AND ?",
+        lambda r: (f"zone_{r.randrange(ZONES)}",)),
+    "weather_data by city, time": (
+        "SELECT time, tavg, tmin, tmax FROM weather_data WHERE city = ? AND time BETWEEN ? AND ?",
+        lambda r: (f"city_{r.randrange(CITIES)}",)),
+    "commodity_prices by commodity, date": (
+        "SELECT date, price, unit FROM commodity_prices WHERE commodity = ? AND date BETWEEN ? AND ?",
+        lambda r: (f"commodity_{r.randrange(COMMODITIES)}",)),
+}
+
+ZONES, CITIES, COMMODITIES = 20, 100, 10
+
+
+def populate(conn, days):
+    rng = random.Random(0)
+    dates = [(date(2000, 1, 1) + timedelta(days=i)).isoformat() for i in range(days)]
+    with conn:
+        conn.executemany("INSERT INTO pun_prices VALUES (?, ?)", ((d, rng.random() * 200) for d in dates))
+        conn.executemany("INSERT INTO load_forecast (date, zone, load_mw) VALUES (?, ?, ?)",
+                         ((d, f"zone_{z}", rng.random() * 1e5) for d in dates for z in range(ZONES)))
+        conn.executemany("INSERT INTO weather_data (city, time, tavg, tmin, tmax) VALUES (?, ?, ?, ?, ?)",
+                         ((f"city_{c}", d, 15.0, 10.0, 20.0) for c in range(CITIES) for d in dates))
+        conn.executemany("INSERT INTO commodity_prices (commodity, date, price, unit) VALUES (?, ?, ?, ?)",
+                         ((f"commodity_{c}", d, 50.0, "USD") for c in range(COMMODITIES) for d in dates))
+    return dates
+
+
+def time_queries(conn, dates, repeats, span):
+    rng = random.Random(1)
+    results = {}
+    for label, (sql, extra) in QUERIES.items():
+        timings = []
+        for _ in range(repeats):
+            start = rng.randrange(len(dates) - span)
+            params = extra(rng) + (dates[start], dates[start + span])
+            t0 = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append(time.perf_counter() - t0)
+        results[label] = statistics.median(timings) * 1000
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare range-query latency before and after the schema migration")
+    parser.add_argument("--days", type=int, default=7300, help="days of synthetic history (default: 20 years)")
+    parser.add_argument("--span", type=int, default=90, help="days covered by each range query")
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = sqlite3.connect(path)
+        for ddl in LEGACY_DDL:
+            conn.execute(ddl)
+        print(f"🏗️ Populating synthetic database ({args.days} days)...")
+        dates = populate(conn, args.days)
+        before = time_queries(conn, dates, args.repeats, args.span)
+        conn.close()
+
+        t0 = time.perf_counter()
+        conn = schema.connect(path)
+        print(f"🔧 Migrated to schema v{schema.get_version(conn)} in {time.perf_counter() - t0:.2f}s")
+        after = time_queries(conn, dates, args.repeats, args.span)
+        conn.close()
+
+    print(f"{'query':<38}{'before ms':>12}{'after ms':>12}{'speedup':>10}")
+    for label in QUERIES:
+        print(f"{label:<38}{before[label]:>12.3f}{after[label]:>12.3f}{before[label] / after[label]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import os
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import numpy as np
+from joblib import parallel_config
+from threadpoolctl import threadpool_limits
+
+from core import search, training
+
+# === NOTEBOOK RANDOM SEARCH VS BUDGETED RACING (same Train / Validation 2023 / Test 2024 split) ===
+
+
+def timed_fit(family, split, threads, options):
+    (X_train, y_train), (X_val, y_val), (X_test, y_test) = split["train"], split["val"], split["test"]
+    wall, cpu = time.perf_counter(), time.process_time()
+    with threadpool_limits(limits=threads), parallel_config(backend="threading", n_jobs=threads):
+        model, _ = training.MODELS[family]["fit"](X_train, y_train, X_val, y_val, threads, options)
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    val_mae = float(np.mean(np.abs(model.predict(X_val) - y_val)))
+    test_mae = float(np.mean(np.abs(model.predict(X_test) - y_test)))
+    return wall, cpu, val_mae, test_mae
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark successive halving / Hyperband against RandomizedSearchCV")
+    parser.add_argument("--models", nargs="+", choices=search.BOOSTERS, default=search.BOOSTERS)
+    parser.add_argument("--n-iter", type=int, default=30, help="random-search candidates / halving configurations")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--budget-seconds", type=float, help="wall-clock budget for the racing searches")
+    parser.add_argument("--log-dir", default=os.path.join(BASE_DIR, "data", "search"))
+    args = parser.parse_args()
+
+    print(f"{'model':<20}{'search':<11}{'wall s':>9}{'cpu s':>9}{'val MAE':>9}{'test MAE':>10}")
+    for family in args.models:
+        split = search.load_split(family)
+        baseline = None
+        for method in ["random"] + search.METHODS:
+            options = {"search": method, "n_iter": args.n_iter, "budget_seconds": args.budget_seconds,
+                       "log_dir": args.log_dir}
+            wall, cpu, val_mae, test_mae = timed_fit(family, split, args.threads, options)
+            baseline = baseline or wall
+            speedup = "" if method == "random" else f"  ({baseline / wall:.1f}x faster)"
+            print(f"{family:<20}{method:<11}{wall:>9.1f}{cpu:>9.1f}{val_mae:>9.2f}{test_mae:>10.2f}{speedup}")
+    print(f"📄 Trajectories in {args.log_dir}")
+
+
+if __name__ == "__main__":
+    main()
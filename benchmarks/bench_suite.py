@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime
+from importlib import metadata
+
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))
+
+import commodities as commodities_script  # noqa: E402
+import pun as pun_script  # noqa: E402
+import terna as terna_script  # noqa: E402
+import weather as weather_script  # noqa: E402
+import synthetic  # noqa: E402
+from core import data_access, export, feature_store, predict, range_stats, registry, schema, training  # noqa: E402
+
+# === END-TO-END BENCHMARK SUITE ===
+# For every requested scale a synthetic data.db and feature store are generated, then each hot
+# path is timed on them:
+#   ingest     - the scripts' upsert functions on one key's full history (insert, then update pass)
+#   loaders    - the tabs' reads (30 days / 1 year / full), summary index, streaming export
+#   features   - the pipeline build of the feature tables, feature-store read
+#   training   - core.training.train_model per model family (random search, --n-iter candidates)
+#   prediction - registered models scored through core.predict.Predictor
+# Results go to benchmarks/results/suite-<timestamp>.json; --compare diffs two result files.
+STAGES = ["ingest", "loaders", "features", "training", "prediction"]
+RESULTS_DIR = os.path.join(BASE_DIR, "benchmarks", "results")
+PACKAGES = ["numpy", "pandas", "pyarrow", "scikit-learn", "xgboost", "lightgbm", "catboost", "streamlit"]
+SUMMARY_CALLS = 200
+PREDICT_REPEATS = 20
+REGRESSION = 0.2  # --compare flags stages more than 20% slower
+
+
+def _record(records, stage, name, rows, seconds, **extra):
+    entry = {"stage": stage, "name": name, "rows": int(rows), "seconds": seconds,
+             "rows_per_s": rows / seconds if seconds else None, **extra}
+    records.append(entry)
+    rate = f"{entry['rows_per_s']:>14,.0f}" if entry["rows_per_s"] else f"{'':>14}"
+    print(f"  {stage:<11}{name:<34}{int(rows):>12,}{seconds:>10.3f}{rate}")
+
+
+def _timed(fn):
+    started = time.perf_counter()
+    value = fn()
+    return value, time.perf_counter() - started
+
+
+def _raw(db_path, table, key=None):
+    """A slice with the date column as stored (text), the way the ingestion scripts receive it."""
+    sql, params = data_access.build_query(table, key=key)
+    with closing(schema.connect(db_path)) as conn:
+        return pd.read_sql(sql, conn, params=params)
+
+
+# === STAGES ===
+def bench_ingest(records, db_path, folder):
+    scratch = schema.connect(os.path.join(folder, "ingest.db"))
+    zone = data_access.distinct_keys("load_forecast", db_path)[0]
+    city = data_access.distinct_keys("weather_data", db_path)[0]
+    commodity = data_access.distinct_keys("commodity_prices", db_path)[0]
+    pun = _raw(db_path, "pun_prices").assign(fold=0)  # synthetic PUN has no repeated hours
+    load = _raw(db_path, "load_forecast", zone)
+    weather = _raw(db_path, "weather_data", city).drop(columns=["city"])
+    prices = _raw(db_path, "commodity_prices", commodity)
+    unit, price_rows = prices["unit"].iloc[0], list(prices[["date", "price"]].itertuples(index=False, name=None))
+
+    jobs = {
+        "pun_prices": (len(pun), lambda: pun_script.upsert_prices(scratch, pun)),
+        "load_forecast": (len(load), lambda: terna_script.upsert_load(scratch, load)),
+        "weather_data": (len(weather), lambda: weather_script.upsert_city(scratch, weather, city)),
+        "commodity_prices": (len(prices), lambda: commodities_script.store_prices(scratch, commodity, unit,
+                                                                                 price_rows)),
+    }
+    for table, (rows, job) in jobs.items():
+        for phase in ("insert", "update"):  # second pass hits the conflict path on every row
+            _, seconds = _timed(job)
+            _record(records, "ingest", f"{table} {phase}", rows, seconds)
+    scratch.close()
+
+    with closing(schema.connect(db_path)) as conn:
+        rows, seconds = _timed(lambda: range_stats.rebuild(conn))
+    _record(records, "ingest", "range_stats rebuild", rows, seconds)
+
+
+def bench_loaders(records, db_path):
+    for table in data_access.DATASETS:
+        keys = data_access.distinct_keys(table, db_path)
+        key = keys[0] if keys else None
+        last = pd.Timestamp(data_access.date_bounds(table, key, db_path)[1])
+        for label, days in (("30d", 30), ("365d", 365), ("full", None)):
+            start = None if days is None else (last - pd.Timedelta(days=days - 1)).strftime("%Y-%m-%d")
+            df, seconds = _timed(lambda: data_access.load(table, key=key, start=start, db_path=db_path))
+            _record(records, "loaders", f"{table} {label}", len(df), seconds)
+    df, seconds = _timed(lambda: data_access.load("commodity_prices", db_path=db_path))
+    _record(records, "loaders", "commodity_prices all keys", len(df), seconds)
+
+    zone = data_access.distinct_keys("load_forecast", db_path)[0]
+    range_stats.summary("load_forecast", "load_mw", key=zone, db_path=db_path)  # warm the index
+    _, seconds = _timed(lambda: [range_stats.summary("load_forecast", "load_mw", "2021-01-01", "2023-06-30",
+                                                     key=zone, db_path=db_path) for _ in range(SUMMARY_CALLS)])
+    _record(records, "loaders", "range_stats.summary (per call)", 1, seconds / SUMMARY_CALLS)
+
+    with closing(schema.connect(db_path)) as conn:
+        rows = conn.execute("SELECT COUNT(*) FROM load_forecast").fetchone()[0]
+    with open(os.devnull, "wb") as sink:
+        size, seconds = _timed(lambda: export.write_csv(sink, "load_forecast", db_path=db_path))
+    _record(records, "loaders", "export csv load_forecast", rows, seconds, bytes=size)
+
+
+def bench_features(records, db_path, root, scale):
+    rows, seconds = synthetic.write_features(db_path, root, scale["years"], freq=scale["freq"])
+    _record(records, "features", "pipeline build", rows, seconds)
+    df, seconds = _timed(lambda: feature_store.read_dataset("total_pun_model_features", root=root))
+    _record(records, "features", "feature_store read", len(df), seconds, columns=len(df.columns))
+    return True
+
+
+def bench_training(records, root, families, n_iter, cores):
+    folder = tempfile.mkdtemp(prefix="bench-suite-")
+    try:
+        shared = training.share_datasets(sorted({training.MODELS[name]["dataset"] for name in families}), folder, root)
+        if any(begin == end for data in shared.values() for begin, end in data["splits"].values()):
+            print(f"  ⚠️ training skipped: needs rows in every split (<={training.TRAIN_LAST_YEAR}, "
+                  f"{training.VAL_YEAR}, {training.TEST_YEAR})")
+            return {}
+        results = {}
+        for name in families:
+            data = shared[training.MODELS[name]["dataset"]]
+            result = training.train_model(name, data, cores, {"n_iter": n_iter, "search": "random"})
+            begin, end = data["splits"]["train"]
+            _record(records, "training", name, end - begin, result["wall_seconds"],
+                    cpu_seconds=result["cpu_seconds"], threads=cores, test_mae=result["test"]["MAE"])
+            results[name] = result
+        return results
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def bench_prediction(records, db_path, root, results, folder):
+    models_dir = os.path.join(folder, "models")
+    with closing(schema.connect(db_path)) as conn:
+        for name, result in results.items():
+            registry.register(conn, name, result["model"], result["scaler"], result["features"],
+                              training.MODELS[name]["dataset"], result["params"],
+                              {"val": result["val"], "test": result["test"]}, root=models_dir)
+    predictor = predict.Predictor(db_path)
+    for name in results:
+        rows = feature_store.read_dataset(training.MODELS[name]["dataset"], root=root)
+        predictor.predict(name, rows)  # load and warm; the timed calls below exclude loading
+        _, seconds = _timed(lambda: [predictor.predict(name, rows) for _ in range(PREDICT_REPEATS)])
+        stats = predictor.stats(name)
+        _record(records, "prediction", name, len(rows) * PREDICT_REPEATS, seconds,
+                p50_ms=stats["p50_ms"], p99_ms=stats["p99_ms"])
+
+
+# === SUITE ===
+def scale_label(scale):
+    return (f"{scale['years']}y {scale['freq']} {scale['zones']} zones {scale['cities']} cities "
+            f"{scale['commodities']} commodities")
+
+
+def run_scale(scale, stages, families, n_iter, cores):
+    records = []
+    folder = tempfile.mkdtemp(prefix="bench-suite-")
+    try:
+        db_path = os.path.join(folder, "data.db")
+        root = os.path.join(folder, "features")
+        print(f"🏗️ {scale_label(scale)}")
+        report = synthetic.generate(db_path, scale["years"], scale["freq"], scale["zones"], scale["cities"],
+                                    scale["commodities"])
+        for table, (rows, seconds) in report.items():
+            _record(records, "generate", table, rows, seconds)
+
+        if "ingest" in stages:
+            bench_ingest(records, db_path, folder)
+        if "loaders" in stages:
+            bench_loaders(records, db_path)
+        has_features = ("features" in stages or "training" in stages or "prediction" in stages) \
+            and bench_features(records, db_path, root, scale)
+        results = {}
+        if has_features and ("training" in stages or "prediction" in stages):
+            results = bench_training(records, root, families, n_iter, cores)
+        if results and "prediction" in stages:
+            bench_prediction(records, db_path, root, results, folder)
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return {"scale": scale, "label": scale_label(scale), "records": records}
+
+
+def environment():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "packages": versions, "commit": commit}
+
+
+def compare(old_path, new_path, threshold=REGRESSION):
+    """Print seconds per (scale, stage, name) of two result files and flag regressions."""
+    def index(path):
+        with open(path) as f:
+            runs = json.load(f)["runs"]
+        return {(run["label"], rec["stage"], rec["name"]): rec["seconds"] for run in runs for rec in run["records"]}
+
+    old, new = index(old_path), index(new_path)
+    print(f"{'scale / stage / name':<90}{'old s':>10}{'new s':>10}{'ratio':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        ratio = new[key] / old[key] if old[key] else float("nan")
+        flag = " ⚠️" if ratio > 1 + threshold else ""
+        print(f"{' / '.join(key):<90}{old[key]:>10.3f}{new[key]:>10.3f}{ratio:>7.2f}x{flag}")
+    for key in sorted(old.keys() ^ new.keys()):
+        print(f"{' / '.join(key):<90} only in {'old' if key in old else 'new'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark suite on synthetic data")
+    parser.add_argument("--years", type=int, nargs="+", default=[5], help="one run per value (scaling curve)")
+    parser.add_argument("--freq", default="D", help="resolution of PUN, load and weather: D, h, 15min")
+    parser.add_argument("--zones", type=int, default=len(synthetic.ZONES))
+    parser.add_argument("--cities", type=int, default=len(synthetic.CITIES))
+    parser.add_argument("--commodities", type=int, default=len(synthetic.COMMODITIES))
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--models", nargs="+", choices=list(training.MODELS), default=list(training.MODELS))
+    parser.add_argument("--n-iter", type=int, default=2, help="random-search candidates per model")
+    parser.add_argument("--cores", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=None, help="results file (default: benchmarks/results/suite-<time>.json)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two results files and exit")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    started = datetime.now()
+    runs = []
+    for years in args.years:
+        scale = {"years": years, "freq": args.freq, "zones": args.zones, "cities": args.cities,
+                 "commodities": args.commodities}
+        runs.append(run_scale(scale, args.stages, args.models, args.n_iter, args.cores))
+
+    out = args.out or os.path.join(RESULTS_DIR, f"suite-{started:%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump({"created_at": started.isoformat(timespec="seconds"), "environment": environment(),
+                   "options": {"stages": args.stages, "models": args.models, "n_iter": args.n_iter,
+                               "cores": args.cores}, "runs": runs}, f, indent=2, default=float)
+    print(f"🏁 {out}")
+
+
+if __name__ == "__main__":
+    main()
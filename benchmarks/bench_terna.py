@@ -0,0 +1,83 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+sys.path.insert(0, os.path.join(BASE_DIR, "scripts"))
+import terna  # noqa: E402
+from core import schema  # noqa: E402
+
+# === TERNA INGESTION MEMORY: WHOLE FILE VS STREAMING ===
+# "whole file" is what scripts/terna.py did before: read_csv of the full export, one groupby,
+# one upsert. "stream" reads CHUNK_ROWS lines at a time and upserts in batches. Peak memory is
+# measured with tracemalloc; with streaming it should stay flat as the file grows.
+
+
+def write_csv(path, months, zones):
+    """A 15-minute Terna export (Date;Zone;Load [MW], dd/mm/yyyy timestamps) of `months` months."""
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2024-01-01", periods=months * 30 * 96, freq="15min")
+    stamps = np.repeat(index.strftime("%d/%m/%Y %H:%M:%S").to_numpy(), zones)
+    df = pd.DataFrame({"Date": stamps, "Zone": np.tile([f"zone_{z}" for z in range(zones)], len(index)),
+                       "Load [MW]": rng.normal(3000, 500, len(stamps)).round(1)})
+    df.to_csv(path, sep=";", index=False)
+    return len(df)
+
+
+def whole_file(csv_path, db_path, daily):
+    df = pd.read_csv(csv_path, sep=";")
+    df = terna._clean(df, daily, "D" if daily else "h")
+    df = terna._to_db_columns(df.groupby(["Date", "Zone"], as_index=False)["Load [MW]"].sum())
+    conn = schema.connect(db_path)
+    terna.upsert_load(conn, df)
+    conn.close()
+    return len(df)
+
+
+def stream(csv_path, db_path, daily, chunk_rows=terna.CHUNK_ROWS):
+    conn = schema.connect(db_path)
+    ingest = terna.ingest_files(conn, [csv_path], daily=daily, workers=1, chunk_rows=chunk_rows)
+    conn.close()
+    return ingest.rows
+
+
+def measure(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    rows = fn(*args)
+    seconds = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, seconds, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare peak memory of whole-file and streaming Terna ingestion")
+    parser.add_argument("--months", type=int, nargs="+", default=[3, 12], help="file sizes, in months of 15-min data")
+    parser.add_argument("--zones", type=int, default=8)
+    parser.add_argument("--native", action="store_true", help="keep native timestamps instead of daily rows")
+    parser.add_argument("--chunk-rows", type=int, default=terna.CHUNK_ROWS, help="CSV lines per streamed chunk")
+    args = parser.parse_args()
+
+    print(f"{'ingest':<12}{'months':>8}{'csv rows':>12}{'db rows':>10}{'seconds':>10}{'peak MB':>10}")
+    for months in args.months:
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, "load.csv")
+            lines = write_csv(csv_path, months, args.zones)
+            runs = [("whole file", whole_file, ()), ("stream", stream, (args.chunk_rows,))]
+            for label, fn, extra in runs:
+                db_path = os.path.join(tmp, f"{label.replace(' ', '_')}.db")
+                rows, seconds, peak = measure(fn, csv_path, db_path, not args.native, *extra)
+                print(f"{label:<12}{months:>8}{lines:>12,}{rows:>10,}{seconds:>10.2f}{peak / 2**20:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core import feature_selection, feature_store, pipeline, schema  # noqa: E402
+
+# === SYNTHETIC data.db AND FEATURE TABLES AT CONFIGURABLE SCALE ===
+# Same tables, keys and column layout as the real database; the first zones, cities and
+# commodities carry the real names, the rest are numbered. PUN follows gas, load and season so
+# the models have something to learn.
+END = "2024-12-31"  # training splits: <=2022 / 2023 / 2024
+ZONES = ["Calabria", "Centre-North", "Centre-South", "Italy", "North", "Sardinia", "Sicily", "South"]
+CITIES = ["bari", "bologna", "cagliari", "milano", "napoli", "palermo", "roma", "torino", "venezia"]
+COMMODITIES = {"brent": "USD/Bbl", "coal": "USD/T", "crude_oil": "USD/Bbl", "gasoline": "USD/Gal",
+               "ttf_gas": "EUR/MWh"}
+WEATHER_VALUES = ["tavg", "tmin", "tmax", "prcp", "wspd", "pres"]
+CHUNK_ROWS = 100000
+
+
+def names(real, prefix, n):
+    return list(real[:n]) + [f"{prefix}_{i:03d}" for i in range(len(real), n)]
+
+
+def timestamps(years, freq, end=END):
+    """Every period of the last `years` years up to the end of `end`."""
+    last = pd.Timestamp(end) + pd.Timedelta(days=1) - pd.tseries.frequencies.to_offset(freq)
+    index = pd.date_range(pd.Timestamp(end) - pd.DateOffset(years=years) + pd.Timedelta(days=1), last, freq=freq)
+    fmt = "%Y-%m-%d" if freq == "D" else "%Y-%m-%d %H:%M:%S"
+    return index, index.strftime(fmt).tolist()
+
+
+def _season(index):
+    day = index.dayofyear.to_numpy()
+    hour = index.hour.to_numpy() + index.minute.to_numpy() / 60
+    return np.cos(2 * np.pi * (day - 15) / 365.25), np.sin(2 * np.pi * (hour - 9) / 24)
+
+
+def _insert(conn, sql, columns):
+    """executemany over column lists, CHUNK_ROWS at a time."""
+    n = len(columns[0])
+    for begin in range(0, n, CHUNK_ROWS):
+        conn.executemany(sql, zip(*(col[begin:begin + CHUNK_ROWS] for col in columns)))
+    return n
+
+
+def generate(db_path, years=5, freq="D", zones=8, cities=9, commodities=5, seed=0, end=END):
+    """
+    Write a synthetic database. Returns {table: (rows, seconds)}.
+
+    Args:
+        years (int): history ending at `end`
+        freq (str): resolution of PUN, load and weather ("D", "h", "15min"); commodities stay daily
+        zones, cities, commodities (int): number of keys per table
+    """
+    rng = np.random.default_rng(seed)
+    index, stamps = timestamps(years, freq, end)
+    days, _ = timestamps(years, "D", end)
+    winter, daily = _season(index)
+    report = {}
+    conn = schema.connect(db_path)
+
+    # --- commodities (business days); ttf_gas drives PUN ---
+    started = time.perf_counter()
+    business = days[days.dayofweek < 5]
+    business_stamps = business.strftime("%Y-%m-%d").tolist()
+    commodity_names = names(list(COMMODITIES), "commodity", commodities)
+    gas = None
+    rows = 0
+    with conn:
+        for name in commodity_names:
+            prices = np.abs(40 + np.cumsum(rng.normal(0, 1.0, len(business)))) + 5
+            if name == "ttf_gas":
+                gas = pd.Series(prices, index=business)
+            unit = COMMODITIES.get(name, "USD")
+            rows += _insert(conn, "INSERT INTO commodity_prices (commodity, date, price, unit) VALUES (?, ?, ?, ?)",
+                            [[name] * len(business), business_stamps, prices.round(2).tolist(), [unit] * len(business)])
+    report["commodity_prices"] = (rows, time.perf_counter() - started)
+    if gas is None:
+        gas = pd.Series(40.0, index=business)
+    gas_at = gas.reindex(index.normalize(), method="ffill").bfill().to_numpy()
+
+    # --- load forecast per zone ---
+    started = time.perf_counter()
+    rows = 0
+    national = np.zeros(len(index))
+    with conn:
+        for zone in names(ZONES, "zone", zones):
+            scale = 5000 + 3000 * rng.random()
+            load = scale * (1 + 0.15 * winter + 0.2 * daily) + rng.normal(0, scale * 0.03, len(index))
+            national += load
+            rows += _insert(conn, "INSERT INTO load_forecast (date, zone, load_mw) VALUES (?, ?, ?)",
+                            [stamps, [zone] * len(index), load.round(1).tolist()])
+    report["load_forecast"] = (rows, time.perf_counter() - started)
+
+    # --- weather per city ---
+    started = time.perf_counter()
+    rows = 0
+    with conn:
+        for city in names(CITIES, "city", cities):
+            tavg = 15 - 9 * winter + 4 * daily + rng.normal(0, 2, len(index))
+            values = {
+                "tavg": tavg, "tmin": tavg - 4 - rng.random(len(index)), "tmax": tavg + 4 + rng.random(len(index)),
+                "prcp": np.maximum(rng.normal(-2, 4, len(index)), 0), "wspd": np.abs(rng.normal(10, 5, len(index))),
+                "pres": 1013 + rng.normal(0, 6, len(index)),
+            }
+            rows += _insert(conn, f"INSERT INTO weather_data (city, time, {', '.join(WEATHER_VALUES)}) "
+                                  f"VALUES (?, ?, {', '.join('?' * len(WEATHER_VALUES))})",
+                            [[city] * len(index), stamps] + [values[col].round(1).tolist() for col in WEATHER_VALUES])
+    report["weather_data"] = (rows, time.perf_counter() - started)
+
+    # --- PUN: gas pass-through plus a load premium ---
+    started = time.perf_counter()
+    load_premium = (national - national.mean()) / max(national.std(), 1.0)
+    pun = 2.2 * gas_at + 8 * load_premium + 15 + rng.normal(0, 6, len(index))
+    with conn:
+        rows = _insert(conn, "INSERT INTO pun_prices (date, price) VALUES (?, ?)", [stamps, pun.round(2).tolist()])
+    report["pun_prices"] = (rows, time.perf_counter() - started)
+
+    conn.close()
+    return report
+
+
+def write_features(db_path, root, years, end=END, freq="D"):
+    """
+    Build total_pun_model_features with the pipeline and select pun_model_features from it.
+    Sub-daily tables go through the chunked build (pipeline.write_full).
+
+    Returns (rows, seconds) of the pipeline build.
+    """
+    days, _ = timestamps(years, "D", end)
+    last = days[-1] - pd.Timedelta(days=1)  # the last day has no next-day PUN, so its target would be missing
+    started = time.perf_counter()
+    if freq == "D":
+        df, _ = pipeline.add_features(pipeline.load_base(days[0], last, db_path))
+        feature_store.write_dataset(df, "total_pun_model_features", root=root)
+        rows = len(df)
+    else:
+        rows, _ = pipeline.write_full(last, freq, start=days[0], db_path=db_path, root=root)
+    seconds = time.perf_counter() - started
+    feature_selection.refresh(root=root)
+    return rows, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic data.db (and feature tables) at a given scale")
+    parser.add_argument("--out", required=True, help="output folder (data.db and features/ are written there)")
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--freq", default="D", help="resolution of PUN, load and weather: D, h, 15min")
+    parser.add_argument("--zones", type=int, default=len(ZONES))
+    parser.add_argument("--cities", type=int, default=len(CITIES))
+    parser.add_argument("--commodities", type=int, default=len(COMMODITIES))
+    parser.add_argument("--no-features", action="store_true", help="skip the feature tables")
+    args = parser.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    db_path = os.path.join(args.out, "data.db")
+    if os.path.exists(db_path):
+        print(f"❌ {db_path} already exists")
+        sys.exit(1)
+
+    report = generate(db_path, args.years, args.freq, args.zones, args.cities, args.commodities)
+    for table, (rows, seconds) in report.items():
+        print(f"✅ {table}: {rows:,} rows in {seconds:.2f}s")
+    if not args.no_features:
+        rows, seconds = write_features(db_path, os.path.join(args.out, "features"), args.years, freq=args.freq)
+        print(f"✅ feature tables: {rows:,} rows in {seconds:.2f}s")
+    print(f"🏁 {db_path}: {os.path.getsize(db_path) / 2**20:,.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# === LOCAL STAND-IN FOR THE TRADEFEEDS commodity_historical ENDPOINT ===
+# Serves deterministic synthetic daily prices in the same response shape as the real API,
+# with optional latency and injected 429/503 responses to exercise retry logic.
+
+UNITS = {"crude_oil": "USD/Bbl", "brent": "USD/Bbl", "ttf_gas": "EUR/MWh", "gasoline": "USD/Gal", "coal": "USD/T"}
+
+
+def synthetic_prices(name, date_from, date_to):
+    start = date.fromisoformat(date_from)
+    end = date.fromisoformat(date_to)
+    rng = random.Random(f"{name}:{date_from}")
+    price = 50.0 + rng.random() * 50
+    prices = []
+    day = start
+    while day <= end:
+        if day.weekday() < 5:  # markets closed at weekends
+            price = max(1.0, price + rng.gauss(0, 1))
+            prices.append({"date": day.isoformat(), "price": f"{price:.4f}"})
+        day += timedelta(days=1)
+    return prices
+
+
+class TradefeedsHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+    requests_served = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        with self.lock:
+            type(self).requests_served += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if self.error_rate and random.random() < self.error_rate:
+            status = random.choice([429, 503])
+            self.send_response(status)
+            self.send_header("Retry-After", "0")
+            self.end_headers()
+            self.wfile.write(b"stub: try again")
+            return
+
+        query = parse_qs(urlparse(self.path).query)
+        name = query.get("name", [""])[0]
+        prices = synthetic_prices(name, query["date_from"][0], query["date_to"][0])
+        body = json.dumps({
+            "result": {"output": {"name": name, "unit": UNITS.get(name, "unknown"), "prices": prices}}
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(latency=0.0, error_rate=0.0, port=0):
+    """Start the stub in a daemon thread. Returns (server, endpoint_url)."""
+    handler = type("Handler", (TradefeedsHandler,), {"latency": latency, "error_rate": error_rate,
+                                                     "requests_served": 0})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v1/commodity_historical"
+    return server, url
@@ -0,0 +1,346 @@
+import argparse
+import functools
+import multiprocessing
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from core import feature_store, resolution, schema, search, training
+
+# === BACKTEST CONFIGURATION ===
+# Origins are the feature rows of 2023–2024: at origin t the model forecasts target_pun of row t
+# (PUN of the same period a day later) and is trained only on rows whose targets are known by
+# then, those dated up to t minus one day. For daily rows that is every row before the origin;
+# at hourly or 15-minute resolution the last day of rows before t is left out, since their
+# targets fall after t.
+START = "2023-01-01"
+END = "2024-12-31"
+STEPS = {"day": 1, "week": 7}  # days between refits
+WINDOWS = ["expanding", "sliding"]
+SLIDING_DAYS = 730  # days of rows kept by a sliding window
+COLD_EVERY = 13  # refits per segment: every segment starts cold, so segments run in parallel
+REFIT_ROUNDS = 20  # boosting rounds added by a warm refit
+GROW_TREES = 20  # trees added to the forest by a warm refit
+CURVE_WINDOW = 28  # origins in the rolling-MAE error curve
+
+# Starting points when no search log exists (core.search writes the boosters' best config)
+DEFAULT_PARAMS = {
+    "XGBRegressor": {"n_estimators": 300, "learning_rate": 0.05, "max_depth": 4, "subsample": 0.8,
+                     "colsample_bytree": 0.8, "gamma": 1, "min_child_weight": 1},
+    "LGBMRegressor": {"n_estimators": 300, "learning_rate": 0.05, "max_depth": 6, "min_child_samples": 20,
+                      "subsample": 0.8, "colsample_bytree": 0.8, "reg_alpha": 0.1, "reg_lambda": 0.1},
+    "CatBoostRegressor": {"iterations": 300, "learning_rate": 0.05, "depth": 6, "l2_leaf_reg": 3},
+    "SVR": {"C": 100, "epsilon": 0.1, "gamma": "scale"},
+}
+
+# How each family takes new data without starting over
+WARM_STRATEGY = {
+    "XGBRegressor": "booster continuation",
+    "LGBMRegressor": "booster continuation",
+    "CatBoostRegressor": "booster continuation",
+    "RandomForestRegressor": "warm_start (adds trees)",
+    "LassoCV": "warm_start (coordinate descent from previous coef)",
+    "RidgeCV": "closed-form refit with the segment's alpha",
+    "SVR": "refit",
+}
+
+
+# === COLD AND WARM FITS ===
+@functools.lru_cache(maxsize=None)
+def _starting_params(family):
+    return search.best_params(family) or DEFAULT_PARAMS[family]
+
+
+def fit_cold(family, X, y, threads):
+    """Fit from scratch with the family's starting configuration."""
+    if family == "XGBRegressor":
+        from xgboost import XGBRegressor
+
+        return XGBRegressor(objective="reg:squarederror", random_state=training.RANDOM_STATE, verbosity=0,
+                            n_jobs=threads, **_starting_params(family)).fit(X, y)
+    if family == "LGBMRegressor":
+        from lightgbm import LGBMRegressor
+
+        return LGBMRegressor(random_state=training.RANDOM_STATE, n_jobs=threads, verbose=-1,
+                             **_starting_params(family)).fit(X, y)
+    if family == "CatBoostRegressor":
+        from catboost import CatBoostRegressor
+
+        return CatBoostRegressor(loss_function="RMSE", random_state=training.RANDOM_STATE, verbose=0,
+                                 thread_count=threads, allow_writing_files=False, **_starting_params(family)).fit(X, y)
+    if family == "RandomForestRegressor":
+        from sklearn.ensemble import RandomForestRegressor
+
+        return RandomForestRegressor(n_estimators=300, max_depth=10, random_state=training.RANDOM_STATE,
+                                     n_jobs=threads, warm_start=True).fit(X, y)
+    if family == "LassoCV":
+        from sklearn.linear_model import Lasso, LassoCV
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        # alpha is chosen by cross-validation once per segment, then refits warm-start from the last coef
+        scaled = StandardScaler().fit_transform(X)
+        alpha = LassoCV(alphas=np.logspace(-4, 1, 50), cv=5, max_iter=10000, random_state=training.RANDOM_STATE,
+                        n_jobs=threads).fit(scaled, y).alpha_
+        return Pipeline([("scaler", StandardScaler()),
+                         ("lasso", Lasso(alpha=alpha, max_iter=10000, warm_start=True))]).fit(X, y)
+    if family == "RidgeCV":
+        from sklearn.linear_model import RidgeCV
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+
+        return Pipeline([("scaler", StandardScaler()),
+                         ("ridge", RidgeCV(alphas=np.linspace(1, 10, 100), scoring="neg_mean_absolute_error",
+                                           cv=5))]).fit(X, y)
+    if family == "SVR":
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.svm import SVR
+
+        return Pipeline([("scaler", StandardScaler()), ("svr", SVR(kernel="rbf", **_starting_params(family)))]).fit(X, y)
+    raise ValueError(f"Unknown model family: {family} (expected one of {list(WARM_STRATEGY)})")
+
+
+def fit_warm(family, model, X, y, threads):
+    """Update `model` with the current training window, reusing what it has already learned."""
+    if family == "XGBRegressor":
+        from xgboost import XGBRegressor
+
+        params = {**_starting_params(family), "n_estimators": REFIT_ROUNDS}
+        return XGBRegressor(objective="reg:squarederror", random_state=training.RANDOM_STATE, verbosity=0,
+                            n_jobs=threads, **params).fit(X, y, xgb_model=model.get_booster())
+    if family == "LGBMRegressor":
+        from lightgbm import LGBMRegressor
+
+        params = {**_starting_params(family), "n_estimators": REFIT_ROUNDS}
+        return LGBMRegressor(random_state=training.RANDOM_STATE, n_jobs=threads, verbose=-1,
+                             **params).fit(X, y, init_model=model.booster_)
+    if family == "CatBoostRegressor":
+        from catboost import CatBoostRegressor
+
+        params = {**_starting_params(family), "iterations": REFIT_ROUNDS}
+        return CatBoostRegressor(loss_function="RMSE", random_state=training.RANDOM_STATE, verbose=0,
+                                 thread_count=threads, allow_writing_files=False, **params).fit(X, y, init_model=model)
+    if family == "RandomForestRegressor":
+        model.set_params(n_estimators=model.n_estimators + GROW_TREES)
+        return model.fit(X, y)
+    if family == "LassoCV":
+        return model.fit(X, y)
+    if family == "RidgeCV":
+        from sklearn.base import clone
+        from sklearn.linear_model import Ridge
+
+        ridge = model.named_steps["ridge"]
+        alpha = ridge.alpha_ if hasattr(ridge, "alpha_") else ridge.alpha  # RidgeCV after a cold fit, Ridge after
+        return clone(model).set_params(ridge=Ridge(alpha=alpha)).fit(X, y)
+    return fit_cold(family, X, y, threads)
+
+
+# === ONE SEGMENT OF ORIGINS (runs in a worker) ===
+def run_segment(family, data, origins, step, window, cold, threads):
+    """
+    Walk forward over `origins` (row positions), refitting every `step` origins: cold at the first
+    refit, warm afterwards unless `cold`. Every origin records a next-day forecast. Training rows
+    end a day before the origin (the last whose target is known there); a sliding window starts
+    SLIDING_DAYS before the origin, whatever the resolution.
+
+    Returns:
+        dict: family, records (date, forecast, actual, refit), fit_seconds, refits
+    """
+    from threadpoolctl import threadpool_limits
+
+    X = np.load(data["X"], mmap_mode="r")
+    y = np.load(data["y"], mmap_mode="r")
+    dates = np.load(data["dates"])
+    model, records, fit_seconds, refits = None, [], 0.0, 0
+
+    with threadpool_limits(limits=threads):
+        for n, i in enumerate(origins):
+            refit = n % step == 0
+            if refit:
+                begin = 0 if window == "expanding" else \
+                    int(np.searchsorted(dates, dates[i] - np.timedelta64(SLIDING_DAYS, "D")))
+                stop = int(np.searchsorted(dates, dates[i] - np.timedelta64(1, "D"), side="right"))
+                started = time.perf_counter()
+                if model is None or cold:
+                    model = fit_cold(family, X[begin:stop], y[begin:stop], threads)
+                else:
+                    model = fit_warm(family, model, X[begin:stop], y[begin:stop], threads)
+                fit_seconds += time.perf_counter() - started
+                refits += 1
+            forecast = float(model.predict(X[i:i + 1])[0])
+            records.append((str(dates[i]), forecast, float(y[i]), int(refit)))
+    return {"family": family, "records": records, "fit_seconds": fit_seconds, "refits": refits}
+
+
+def plan_segments(n_origins, step, cold_every=COLD_EVERY):
+    """Split origin positions 0..n-1 into runs of `cold_every` refits; each run starts with a cold fit."""
+    length = step * cold_every
+    return [(begin, min(begin + length, n_origins)) for begin in range(0, n_origins, length)]
+
+
+# === ORCHESTRATOR ===
+def backtest(models=None, start=START, end=END, step="week", window="expanding", cold=False, cores=None,
+             cold_every=COLD_EVERY, root=feature_store.FEATURE_DIR):
+    """
+    Rolling-origin backtest of `models` over [start, end], with segments of origins run in a process pool.
+
+    Returns:
+        tuple: (forecasts DataFrame [model_name, date, forecast, actual, refit], per-model stats, wall seconds)
+    """
+    models = sorted(models or training.MODELS, key=lambda name: -training.MODELS[name]["cost"])
+    end = pd.Timestamp(end)
+    last = np.datetime64(end + pd.Timedelta(days=1) if end == end.normalize() else end + pd.Timedelta(seconds=1))
+    folder = training._shared_folder()
+    started = time.perf_counter()
+    try:
+        shared = training.share_datasets(sorted({training.MODELS[m]["dataset"] for m in models}), folder, root=root)
+        tasks = []
+        for family in models:
+            data = shared[training.MODELS[family]["dataset"]]
+            dates = np.load(data["dates"])
+            positions = np.flatnonzero((dates >= np.datetime64(start)) & (dates < last))
+            # the first day has nothing to train on
+            positions = positions[dates[positions] >= dates[0] + np.timedelta64(1, "D")]
+            # refit every STEPS[step] days: that many origins per day at hourly or 15-minute resolution
+            step_rows = STEPS[step] * resolution.periods_per_day(
+                resolution.infer_freq(np.datetime_as_string(dates[-8:]).tolist()))
+            for begin, stop in plan_segments(len(positions), step_rows, cold_every):
+                tasks.append((family, data, positions[begin:stop].tolist(), step_rows))
+
+        cores = cores or os.cpu_count() or 1
+        workers, threads = training.split_cores(cores, len(tasks))
+        print(f"🧮 {len(models)} models, {len(tasks)} segments: {workers} worker(s) × {threads} thread(s)")
+
+        results = []
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=training._init_worker, initargs=(threads,)) as pool:
+            futures = {pool.submit(run_segment, family, data, origins, step_rows, window, cold, threads): family
+                       for family, data, origins, step_rows in tasks}
+            for future in as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as exc:
+                    print(f"❌ {futures[future]}: segment failed ({exc})")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    wall = time.perf_counter() - started
+
+    frames, stats = [], {}
+    for result in results:
+        family = result["family"]
+        frame = pd.DataFrame(result["records"], columns=["date", "forecast", "actual", "refit"])
+        frame.insert(0, "model_name", family)
+        frames.append(frame)
+        entry = stats.setdefault(family, {"fit_seconds": 0.0, "refits": 0})
+        entry["fit_seconds"] += result["fit_seconds"]
+        entry["refits"] += result["refits"]
+    if not frames:
+        return pd.DataFrame(columns=["model_name", "date", "forecast", "actual", "refit"]), stats, wall
+    forecasts = pd.concat(frames, ignore_index=True).sort_values(["model_name", "date"], ignore_index=True)
+    forecasts["date"] = pd.to_datetime(forecasts["date"])
+    for family, group in forecasts.groupby("model_name"):
+        stats[family]["mae"] = float((group["forecast"] - group["actual"]).abs().mean())
+        stats[family]["origins"] = len(group)
+    return forecasts, stats, wall
+
+
+# === ERROR CURVES ===
+def error_curves(forecasts, window=CURVE_WINDOW):
+    """Absolute error per origin and its rolling mean, one column per model (index: origin date)."""
+    errors = forecasts.assign(abs_error=(forecasts["forecast"] - forecasts["actual"]).abs())
+    abs_error = errors.pivot(index="date", columns="model_name", values="abs_error")
+    return abs_error, abs_error.rolling(window, min_periods=1).mean()
+
+
+def monthly_mae(forecasts):
+    errors = forecasts.assign(abs_error=(forecasts["forecast"] - forecasts["actual"]).abs())
+    errors["month"] = errors["date"].dt.strftime("%Y-%m")
+    return errors.pivot_table(index="month", columns="model_name", values="abs_error", aggfunc="mean")
+
+
+def plot_error_curves(rolling, path=os.path.join(training.IMAGE_DIR, "backtest_mae.png")):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 4))
+    for column in rolling.columns:
+        plt.plot(rolling.index, rolling[column], label=column, linewidth=1.5)
+    plt.title(f"Walk-forward backtest - rolling {CURVE_WINDOW}-day MAE")
+    plt.xlabel("Origin")
+    plt.ylabel("MAE €/MWh")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    plt.savefig(path)
+    plt.close()
+    return path
+
+
+def save_forecasts(conn, forecasts):
+    """Replace each backtested model's stored forecasts with this run's (sub-daily origins keep their time)."""
+    dates = resolution.format_timestamps(forecasts["date"]).tolist()
+    rows = [(row.model_name, date, row.forecast, row.actual, int(row.refit))
+            for row, date in zip(forecasts.itertuples(index=False), dates)]
+    with conn:
+        conn.executemany("DELETE FROM backtest_forecasts WHERE model_name = ?",
+                         [(name,) for name in forecasts["model_name"].unique()])
+        conn.executemany("""
+            INSERT INTO backtest_forecasts (model_name, date, forecast, actual, refit)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
+        schema.bump_data_version(conn, "backtest_forecasts")
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward (rolling-origin) backtest of the PUN models")
+    parser.add_argument("--models", nargs="+", choices=list(training.MODELS), help="model families (default: all)")
+    parser.add_argument("--start", default=START, help="first origin")
+    parser.add_argument("--end", default=END, help="last origin (a day includes all its periods)")
+    parser.add_argument("--step", choices=list(STEPS), default="week", help="refit every day or every week")
+    parser.add_argument("--window", choices=WINDOWS, default="expanding",
+                        help=f"train on all past rows or on the last {SLIDING_DAYS}")
+    parser.add_argument("--cold", action="store_true", help="refit every model from scratch (no warm start)")
+    parser.add_argument("--cold-every", type=int, default=COLD_EVERY,
+                        help="refits per parallel segment; each segment starts with a cold fit")
+    parser.add_argument("--cores", type=int, help="total core budget (default: all cores)")
+    parser.add_argument("--plots", action="store_true", help="save the rolling-MAE curves to images/backtest_mae.png")
+    parser.add_argument("--no-save", action="store_true", help="do not write forecasts to backtest_forecasts")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    forecasts, stats, wall = backtest(args.models, args.start, args.end, args.step, args.window, args.cold,
+                                      args.cores, args.cold_every)
+    if forecasts.empty:
+        print("⚠️ No forecasts produced")
+        return
+
+    print("\n📉 Monthly MAE (€/MWh) by origin month:")
+    print(monthly_mae(forecasts).round(2).to_string())
+
+    print(f"\n{'model':<24}{'origins':>8}{'refits':>8}{'fit s':>9}{'MAE':>8}  refit")
+    for family, entry in sorted(stats.items(), key=lambda item: item[1]["mae"]):
+        strategy = "cold" if args.cold else WARM_STRATEGY[family]
+        print(f"{family:<24}{entry['origins']:>8}{entry['refits']:>8}{entry['fit_seconds']:>9.1f}"
+              f"{entry['mae']:>8.2f}  {strategy}")
+    print(f"⏱️ Backtest wall time: {wall:.1f}s")
+
+    if args.plots:
+        _, rolling = error_curves(forecasts)
+        print(f"📸 Error curves saved: {plot_error_curves(rolling)}")
+    if not args.no_save:
+        conn = schema.connect(args.db)
+        print(f"✅ {save_forecasts(conn, forecasts)} forecasts saved to backtest_forecasts")
+        conn.close()
+    print("🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+import functools
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from core import perf, schema
+
+# === DASHBOARD DATA CACHE ===
+# One process-wide cache shared by every tab and session:
+#   - LRU eviction once the entries' total size exceeds MAX_BYTES
+#   - per-dataset TTL (DATASET_TTL, else DEFAULT_TTL)
+#   - invalidation by data version: writers call schema.bump_data_version() in their transaction;
+#     the cache polls `PRAGMA data_version` on one long-lived connection (no I/O) and reads the
+#     data_versions table only after another connection committed, dropping just the entries
+#     of the datasets whose version moved.
+MAX_BYTES = 256 * 2**20
+DEFAULT_TTL = 6 * 3600  # seconds; a safety net, freshness comes from the data versions
+DATASET_TTL = {
+    "model_results": 300,  # the notebook writes it directly, without bumping a version
+}
+
+
+def sizeof(value):
+    """Approximate bytes held by a cached value."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True, index=True)
+        return int(usage.sum() if isinstance(value, pd.DataFrame) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sys.getsizeof(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _detach(value):
+    """What a caller receives: pandas objects as copy-on-write views, so caller mutations never reach the cache."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy(deep=False)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class DataCache:
+    """
+    Bounded, version-aware cache of dataset reads.
+
+    Entries are keyed by (dataset, key); `dataset` is a table or feature-store name that
+    writers pass to schema.bump_data_version. Safe to share between threads.
+    """
+
+    def __init__(self, db_path=schema.DB_PATH, max_bytes=MAX_BYTES, default_ttl=DEFAULT_TTL, ttl=None):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttl = dict(DATASET_TTL if ttl is None else ttl)
+        self._entries = OrderedDict()  # (dataset, key) -> (value, nbytes, expires_at, version)
+        self._bytes = 0
+        self._versions = {}
+        self._data_version = None
+        self._conn = None
+        self._lock = threading.RLock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    # --- data versions ---
+    def _read_versions(self):
+        if self._conn is None:
+            self._conn = schema.connect(self.db_path, check_same_thread=False)
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if data_version == self._data_version:
+            return False
+        self._data_version = data_version
+        self._versions = dict(self._conn.execute("SELECT dataset, version FROM data_versions"))
+        return True
+
+    def _sync(self):
+        """Drop the entries of every dataset whose stored version changed since they were cached."""
+        if not self._read_versions():
+            return
+        stale = [entry_key for entry_key, entry in self._entries.items()
+                 if entry[3] != self._versions.get(entry_key[0], 0)]
+        for entry_key in stale:
+            self._drop(entry_key)
+        self.counters["invalidations"] += len(stale)
+
+    # --- entries ---
+    def _drop(self, entry_key):
+        _, nbytes, _, _ = self._entries.pop(entry_key)
+        self._bytes -= nbytes
+
+    def _store(self, entry_key, value, version):
+        nbytes = sizeof(value)
+        if nbytes > self.max_bytes:
+            return  # larger than the whole cache: serve it uncached
+        if entry_key in self._entries:
+            self._drop(entry_key)
+        ttl = self.ttl.get(entry_key[0], self.default_ttl)
+        self._entries[entry_key] = (value, nbytes, time.monotonic() + ttl, version)
+        self._bytes += nbytes
+        while self._bytes > self.max_bytes:
+            self._drop(next(iter(self._entries)))  # least recently used first
+            self.counters["evictions"] += 1
+
+    def get(self, dataset, key, loader):
+        """
+        The cached value of (dataset, key), calling loader() on a miss.
+
+        Args:
+            dataset (str): table or feature-store name whose version invalidates the entry
+            key (hashable): the read's arguments
+            loader (callable): no-argument function producing the value
+        """
+        entry_key = (dataset, key)
+        with self._lock:
+            self._sync()
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[2] < time.monotonic():
+                self._drop(entry_key)
+                self.counters["expirations"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(entry_key)
+                self.counters["hits"] += 1
+                return _detach(entry[0])
+            self.counters["misses"] += 1
+            version = self._versions.get(dataset, 0)
+
+        value = loader()  # outside the lock: a slow read never blocks other sessions' hits
+        with self._lock:
+            if self._versions.get(dataset, 0) == version:  # not invalidated while loading
+                self._store(entry_key, value, version)
+        return _detach(value)
+
+    def invalidate(self, dataset=None):
+        """Drop every entry of `dataset` (all entries when None)."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if dataset is None or k[0] == dataset]:
+                self._drop(entry_key)
+
+    def stats(self):
+        """Counters plus entries and bytes, overall and per dataset."""
+        with self._lock:
+            datasets = {}
+            for (dataset, _), (_, nbytes, _, _) in self._entries.items():
+                entry = datasets.setdefault(dataset, {"entries": 0, "bytes": 0})
+                entry["entries"] += 1
+                entry["bytes"] += nbytes
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return {**self.counters, "hit_rate": self.counters["hits"] / lookups if lookups else None,
+                    "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "datasets": datasets}
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(db_path=schema.DB_PATH):
+    """The process-wide cache of one database."""
+    path = os.path.abspath(db_path)
+    with _caches_lock:
+        if path not in _caches:
+            _caches[path] = DataCache(db_path)
+        return _caches[path]
+
+
+def cached(dataset):
+    """
+    Decorator caching a loader in the shared cache, like @st.cache_data but bounded and
+    invalidated when `dataset` changes. Each call is a perf stage "load:<module>.<loader>"
+    (detail "hit" or "miss") when timings are recorded.
+
+    Args:
+        dataset (str | callable): dataset name, or a function of the loader's arguments returning it
+    """
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        stage_name = f"load:{fn.__module__.split('.')[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            name_of = dataset(*args, **kwargs) if callable(dataset) else dataset
+            key = (name, args, tuple(sorted(kwargs.items())))
+            with perf.stage(stage_name, detail="hit") as event:
+                def load():
+                    event.detail = "miss"
+                    return fn(*args, **kwargs)
+
+                value = get_cache().get(name_of, key, load)
+                event.rows = perf.count(value)
+            return value
+        return wrapper
+    return decorator
@@ -0,0 +1,167 @@
+from contextlib import closing
+import pandas as pd
+from core import resolution, schema
+
+# === DATASETS EXPOSED TO THE DASHBOARD ===
+# Table and column names cannot be bound as SQL parameters, so every identifier that reaches
+# a query is checked against this whitelist; values (keys, dates) are always bound.
+# "agg" is how each value column rolls up into a coarser bucket; "energy" sums MW readings
+# weighted by the hours each row covers, so hourly and 15-minute load add up to the MWh per
+# day that daily rows have always held.
+DATASETS = {
+    "pun_prices": {
+        "date": "date",
+        "key": None,
+        "columns": ["date", "price"],
+        "agg": {"price": "avg"},
+    },
+    "commodity_prices": {
+        "date": "date",
+        "key": "commodity",
+        "columns": ["commodity", "date", "price", "unit"],
+        "agg": {"price": "avg", "unit": "max"},
+    },
+    "load_forecast": {
+        "date": "date",
+        "key": "zone",
+        "columns": ["date", "zone", "load_mw"],
+        "agg": {"load_mw": "energy"},
+    },
+    "weather_data": {
+        "date": "time",
+        "key": "city",
+        "columns": ["city", "time", "tavg", "tmin", "tmax", "prcp", "snow", "wdir", "wspd", "wpgt", "pres", "tsun"],
+        "agg": {"tavg": "avg", "tmin": "min", "tmax": "max", "prcp": "sum", "snow": "max", "wdir": "avg",
+                "wspd": "avg", "wpgt": "max", "pres": "avg", "tsun": "sum"},
+    },
+}
+
+
+def _dataset(table):
+    if table not in DATASETS:
+        raise ValueError(f"Unknown dataset: {table}")
+    return DATASETS[table]
+
+
+def _key_filter(spec, key):
+    """WHERE fragment and params selecting one key (str) or several (list/tuple) of the dataset."""
+    if key is None or spec["key"] is None:
+        return [], []
+    keys = [key] if isinstance(key, str) else list(key)
+    placeholders = ", ".join("?" * len(keys))
+    return [f"{spec['key']} IN ({placeholders})"], keys
+
+
+def aggregate_sql(column, how, date_col, hours):
+    if how == "energy":
+        # date-only rows already hold the day's energy; sub-daily rows are MW over `hours`
+        return f"SUM({column} * CASE WHEN length({date_col}) = 10 THEN 1.0 ELSE {float(hours)!r} END)"
+    return f"{how.upper()}({column})"
+
+
+def build_query(table, key=None, start=None, end=None, columns=None, freq=None, hours=1.0):
+    """
+    Parameterized SELECT for one slice of a dataset.
+
+    Args:
+        table (str): Dataset name (see DATASETS)
+        key (str | list): Zone, city or commodity to select; None for all
+        start, end (str): Inclusive 'YYYY-MM-DD' bounds on the date column; None for open-ended
+        columns (list): Columns to return; None for all. The date and key columns are always included.
+        freq (str): Aggregate into buckets of this resolution (see core.resolution); None for stored rows
+        hours (float): Hours covered by one sub-daily row, for "energy" columns
+
+    Returns:
+        tuple: (sql, params)
+    """
+    spec = _dataset(table)
+    date_col = spec["date"]
+
+    selected = list(spec["columns"]) if columns is None else list(columns)
+    unknown = [col for col in selected if col not in spec["columns"]]
+    if unknown:
+        raise ValueError(f"Unknown columns for {table}: {unknown}")
+    for required in (spec["key"], date_col):
+        if required and required not in selected:
+            selected.insert(0, required)
+
+    where, params = _key_filter(spec, key)
+    if start is not None:
+        where.append(f"{date_col} >= ?")
+        params.append(str(start))
+    if end is not None:
+        # '~' sorts after any time suffix, so a bare end date still includes that whole day
+        where.append(f"{date_col} <= ?")
+        params.append(f"{end}~")
+
+    order = [spec["key"], date_col] if spec["key"] else [date_col]
+    if freq is None:
+        sql = f"SELECT {', '.join(selected)} FROM {table}"
+    else:
+        bucket = resolution.bucket_sql(date_col, freq)
+        exprs = [col if col == spec["key"] else f"{bucket} AS {date_col}" if col == date_col
+                 else f"{aggregate_sql(col, spec['agg'][col], date_col, hours)} AS {col}" for col in selected]
+        sql = f"SELECT {', '.join(exprs)} FROM {table}"
+        order = [spec["key"], bucket] if spec["key"] else [bucket]
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    if freq is not None:
+        sql += " GROUP BY " + ", ".join(order)
+    sql += " ORDER BY " + ", ".join(order)
+    return sql, params
+
+
+def load(table, key=None, start=None, end=None, columns=None, freq=None, db_path=schema.DB_PATH):
+    """
+    Read one slice of a dataset, with the date column parsed to datetime64.
+
+    With `freq`, rows are aggregated in SQLite to that resolution (per key) before they are read.
+    """
+    spec = _dataset(table)
+    with closing(schema.connect(db_path)) as conn:
+        hours = 1.0
+        if freq is not None and "energy" in spec["agg"].values():
+            single = key if isinstance(key, str) else None
+            hours = resolution.period_hours(resolution.native_freq(conn, table, spec["date"], spec["key"], single))
+        sql, params = build_query(table, key, start, end, columns, freq, hours)
+        df = pd.read_sql(sql, conn, params=params)
+    # a table can hold date-only history and sub-daily rows: parse each value by its own ISO form
+    df[spec["date"]] = pd.to_datetime(df[spec["date"]], format="ISO8601")
+    return df
+
+
+def native_freq(table, key=None, db_path=schema.DB_PATH):
+    """Stored resolution ('D', 'h' or '15min') of a dataset's most recent rows, for one key or any."""
+    spec = _dataset(table)
+    with closing(schema.connect(db_path)) as conn:
+        return resolution.native_freq(conn, table, spec["date"], spec["key"], key)
+
+
+def date_bounds(table, key=None, db_path=schema.DB_PATH):
+    """(min, max) of the date column as 'YYYY-MM-DD' strings, for one key or the whole dataset."""
+    spec = _dataset(table)
+    where, params = _key_filter(spec, key)
+    sql = f"SELECT MIN({spec['date']}), MAX({spec['date']}) FROM {table}"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    with closing(schema.connect(db_path)) as conn:
+        low, high = conn.execute(sql, params).fetchone()
+    return (low[:10] if low else None), (high[:10] if high else None)
+
+
+def watermarks(table, db_path=schema.DB_PATH):
+    """Latest stored date per key, as stored (date or timestamp text); {None: latest} for PUN."""
+    spec = _dataset(table)
+    key = spec["key"] or "NULL"
+    with closing(schema.connect(db_path)) as conn:
+        return dict(conn.execute(f"SELECT {key}, MAX({spec['date']}) FROM {table} GROUP BY 1"))
+
+
+def distinct_keys(table, db_path=schema.DB_PATH):
+    """Sorted zones, cities or commodities present in a dataset."""
+    spec = _dataset(table)
+    if spec["key"] is None:
+        return []
+    with closing(schema.connect(db_path)) as conn:
+        rows = conn.execute(f"SELECT DISTINCT {spec['key']} FROM {table} ORDER BY {spec['key']}")
+        return [row[0] for row in rows]
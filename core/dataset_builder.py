@@ -0,0 +1,233 @@
+import argparse
+import time
+from contextlib import closing
+import pandas as pd
+from core import data_access, feature_store, perf, resolution, schema
+
+# === WIDE DATASET BUILT IN SQLITE ===
+# One row per period of [start, end] with pun_Price, one column per commodity (<name>_Price),
+# zone (<zone>_Load) and city × weather feature (<city>_<feature>), plus target_pun (the PUN of
+# the same period on the next day). The notebook and load_base read each source table and
+# pivoted it in pandas; here a single query does it all:
+#
+#     WITH RECURSIVE calendar(period, day, next) AS (...every period of the slice...),
+#          load AS MATERIALIZED (SELECT <bucket> AS period,
+#                                       SUM(CASE WHEN zone = ? THEN load_mw END * <hours>) AS "North_Load", ...
+#                                FROM load_forecast WHERE zone IN (...) AND date BETWEEN ... GROUP BY 1), ...
+#     SELECT calendar.period AS date, pun.price AS pun_Price, ..., target.price AS target_pun
+#     FROM calendar LEFT JOIN pun ON pun.period = calendar.period
+#                   LEFT JOIN pun AS target ON target.period = calendar.next
+#                   LEFT JOIN load ON load.period = calendar.period ...
+#
+# Each source is aggregated to the requested resolution with the rule of core.data_access
+# (prices averaged, load summed as energy, tmin/tmax as min/max), only over the slice and only
+# for the requested columns: the keys are filtered with IN, so every source reads one range of
+# its (key, date) order per key. Commodities are daily closes joined on the period's day. Rows
+# are fetched CHUNK_ROWS at a time, so Python holds one chunk of the requested slice, whatever
+# the size of the source tables.
+WEATHER_FEATURES = ["tavg", "tmin", "tmax", "wspd", "pres"]
+CHUNK_ROWS = 10000  # rows per fetched chunk (~2.5 KB of Python objects per row at 60 columns)
+MAX_COLUMNS = 1900  # SQLite returns at most 2000 columns per SELECT; wider requests use several queries
+STEPS = {"D": "+1 day", "h": "+1 hour", "15min": "+15 minutes"}
+
+# (alias, table, value columns, wide column name, calendar column joined on)
+SOURCES = [
+    ("commodity", "commodity_prices", ["price"], "{key}_Price", "day"),
+    ("load", "load_forecast", ["load_mw"], "{key}_Load", "period"),
+    ("weather", "weather_data", WEATHER_FEATURES, "{key}_{value}", "period"),
+]
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _range(spec, start, end):
+    """WHERE fragment and params for the days [start, end] of a source's date column."""
+    return f"{spec['date']} >= ? AND {spec['date']} <= ?", [start, f"{end}~"]
+
+
+def keys_in_range(conn, table, start, end):
+    """
+    Sorted keys (zones, cities, commodities) with rows in the days [start, end].
+
+    A loose index scan: each key is one seek on the (key, date) order past the previous key, and
+    one range probe, so the cost grows with the number of keys rather than the rows of the table.
+    """
+    spec = data_access.DATASETS[table]
+    key, where, params = spec["key"], *_range(spec, start, end)
+    rows = conn.execute(f"""
+        WITH RECURSIVE keys(k) AS (
+            SELECT MIN({key}) FROM {table}
+            UNION ALL
+            SELECT (SELECT MIN({key}) FROM {table} WHERE {key} > keys.k) FROM keys WHERE keys.k IS NOT NULL
+        )
+        SELECT k FROM keys WHERE k IS NOT NULL AND EXISTS (SELECT 1 FROM {table} WHERE {key} = keys.k AND {where})
+    """, params)
+    return [row[0] for row in rows]
+
+
+def catalogue(conn, start, end):
+    """
+    Every wide column the sources can fill over the days [start, end], in load_base's order.
+
+    Returns:
+        dict: {column: (alias, key, value column)}; pun_Price and target_pun map to ("pun", None, "price")
+    """
+    columns = {"pun_Price": ("pun", None, "price")}
+    for alias, table, values, name, _ in SOURCES:
+        keys = keys_in_range(conn, table, start, end)
+        for value in values:
+            for key in keys:
+                columns[name.format(key=key, value=value)] = (alias, key, value)
+    columns["target_pun"] = ("pun", None, "price")
+    return columns
+
+
+def build_query(conn, start, end, freq, columns):
+    """
+    (sql, params) of the wide slice.
+
+    Args:
+        columns (dict): {column: (alias, key, value)} from catalogue(), in output order;
+            (None, None, None) for a requested column no source fills (returned as NULL)
+    """
+    first, last = pd.Timestamp(start), pd.Timestamp(end)
+    day_after = (last + pd.Timedelta(days=1)).strftime(resolution.DAY_FORMAT)
+    start, end = first.strftime(resolution.DAY_FORMAT), last.strftime(resolution.DAY_FORMAT)
+    if resolution.is_sub_daily(freq):
+        fmt = resolution.TIME_FORMAT
+        stop = (last + pd.Timedelta(days=1) - pd.tseries.frequencies.to_offset(freq)).strftime(fmt)
+        calendar = (f"SELECT ?, ?, datetime(?, '+1 day') UNION ALL SELECT datetime(period, '{STEPS[freq]}'), "
+                    f"substr(datetime(period, '{STEPS[freq]}'), 1, 10), datetime(period, '{STEPS[freq]}', '+1 day') "
+                    "FROM calendar WHERE period < ?")
+        params = [first.strftime(fmt), start, first.strftime(fmt), stop]
+    else:
+        calendar = ("SELECT ?, ?, date(?, '+1 day') UNION ALL SELECT date(period, '+1 day'), date(period, '+1 day'), "
+                    "date(period, '+2 days') FROM calendar WHERE period < ?")
+        params = [start, start, start, end]
+    ctes = [f"calendar(period, day, next) AS ({calendar})"]
+
+    selects, joins = ["calendar.period AS date"], []
+    wanted = {alias for alias, _, _ in columns.values() if alias is not None}
+    if "pun" in wanted:
+        spec = data_access.DATASETS["pun_prices"]
+        where, range_params = _range(spec, start, day_after)
+        bucket = resolution.bucket_sql(spec["date"], freq)
+        ctes.append(f"pun AS MATERIALIZED (SELECT {bucket} AS period, AVG(price) AS price FROM pun_prices "
+                    f"WHERE {where} GROUP BY 1)")
+        params += range_params
+        joins.append("LEFT JOIN pun ON pun.period = calendar.period")
+        if "target_pun" in columns:
+            joins.append("LEFT JOIN pun AS target ON target.period = calendar.next")
+
+    for alias, table, _, _, on in SOURCES:
+        if alias not in wanted:
+            continue
+        spec = data_access.DATASETS[table]
+        hours = 1.0
+        if "energy" in spec["agg"].values():
+            hours = resolution.period_hours(resolution.native_freq(conn, table, spec["date"], spec["key"]))
+        exprs, expr_params = [], []
+        for column, (source, key, value) in columns.items():
+            if source == alias:
+                aggregate = data_access.aggregate_sql(
+                    f"CASE WHEN {spec['key']} = ? THEN {value} END", spec["agg"][value], spec["date"], hours)
+                exprs.append(f"{aggregate} AS {_quote(column)}")
+                expr_params.append(key)
+        # only the requested keys, so the (key, date) order is read as one range per key
+        keys = sorted(set(expr_params))
+        where, range_params = _range(spec, start, end)
+        where = f"{spec['key']} IN ({', '.join('?' * len(keys))}) AND {where}"
+        # commodities are daily closes, kept as stored and joined on the day of each period
+        bucket = spec["date"] if on == "day" else resolution.bucket_sql(spec["date"], freq)
+        ctes.append(f"{alias} AS MATERIALIZED (SELECT {bucket} AS period, {', '.join(exprs)} FROM {table} "
+                    f"WHERE {where} GROUP BY 1)")
+        params += expr_params + keys + range_params
+        joins.append(f"LEFT JOIN {alias} ON {alias}.period = calendar.{on}")
+
+    for column, (alias, _, _) in columns.items():
+        if alias is None:
+            selects.append(f"NULL AS {_quote(column)}")
+        elif column == "target_pun":
+            selects.append("target.price AS target_pun")
+        elif alias == "pun":
+            selects.append("pun.price AS pun_Price")
+        else:
+            selects.append(f"{alias}.{_quote(column)}")
+    sql = (f"WITH RECURSIVE {', '.join(ctes)} SELECT {', '.join(selects)} FROM calendar {' '.join(joins)} "
+           "ORDER BY calendar.period")
+    return sql, params
+
+
+def _groups(columns):
+    """The requested columns split into groups small enough for one SELECT each."""
+    items = list(columns.items())
+    return [dict(items[begin:begin + MAX_COLUMNS]) for begin in range(0, len(items), MAX_COLUMNS)] or [{}]
+
+
+def iter_wide(start, end, freq="D", columns=None, chunk_rows=CHUNK_ROWS, db_path=schema.DB_PATH):
+    """
+    The wide slice [start, end] at resolution `freq`, as frames of up to `chunk_rows` rows.
+
+    Args:
+        start, end (str | date): first and last day, inclusive
+        freq (str): "D", "h" or "15min"
+        columns (list): wide columns to build (besides date), in this order; None for every column
+            the sources can fill over the slice. Requested columns no source has come back as NaN.
+    """
+    with closing(schema.connect(db_path)) as conn:
+        available = catalogue(conn, pd.Timestamp(start).strftime(resolution.DAY_FORMAT),
+                              pd.Timestamp(end).strftime(resolution.DAY_FORMAT))
+        if columns is not None:
+            available = {col: available.get(col, (None, None, None)) for col in columns if col != "date"}
+        # every query returns one row per calendar period in the same order, so their chunks line up
+        cursors = [conn.execute(*build_query(conn, start, end, freq, group)) for group in _groups(available)]
+        fmt = resolution.TIME_FORMAT if resolution.is_sub_daily(freq) else resolution.DAY_FORMAT
+        while True:
+            parts = [cursor.fetchmany(chunk_rows) for cursor in cursors]
+            if not parts[0]:
+                break
+            with perf.stage("dataset_builder.chunk", rows=len(parts[0])):
+                frames = [pd.DataFrame.from_records(rows, columns=[d[0] for d in cursor.description])
+                          for rows, cursor in zip(parts, cursors)]
+                df = pd.concat([frames[0]] + [frame.drop(columns="date") for frame in frames[1:]], axis=1)
+                values = [col for col in df.columns if col != "date"]
+                df[values] = df[values].astype("float64")
+                df["date"] = pd.to_datetime(df["date"], format=fmt)
+            yield df
+
+
+def load_wide(start, end, freq="D", columns=None, chunk_rows=CHUNK_ROWS, db_path=schema.DB_PATH):
+    """The whole wide slice as one frame (see iter_wide)."""
+    frames = list(iter_wide(start, end, freq, columns, chunk_rows, db_path))
+    return pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+
+
+@perf.timed("dataset_builder", rows=None)
+def write_dataset(name, start, end, freq="D", columns=None, chunk_rows=CHUNK_ROWS, db_path=schema.DB_PATH,
+                  root=feature_store.FEATURE_DIR):
+    """Stream the wide slice into the feature store as dataset `name`. Returns the rows written."""
+    return feature_store.write_chunks(iter_wide(start, end, freq, columns, chunk_rows, db_path), name, root=root,
+                                      timestamps=resolution.is_sub_daily(freq))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the wide PUN / commodity / load / weather table in SQLite")
+    parser.add_argument("--start", default="2020-01-01", help="first day (default: 2020-01-01)")
+    parser.add_argument("--end", default="2024-12-31", help="last day (default: 2024-12-31)")
+    parser.add_argument("--freq", default="D", choices=list(resolution.PERIODS_PER_DAY))
+    parser.add_argument("--columns", nargs="+", help="wide columns to build (default: all)")
+    parser.add_argument("--name", default="energy_dataset", help="feature-store dataset to write")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows fetched at a time")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = write_dataset(args.name, args.start, args.end, args.freq, args.columns, args.chunk_rows, args.db)
+    print(f"✅ {args.name}: {rows} rows, {len(feature_store.list_columns(args.name))} columns "
+          f"({time.perf_counter() - started:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
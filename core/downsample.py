@@ -0,0 +1,116 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+# === CHART DOWNSAMPLING ===
+# A line chart cannot draw more than about one point per horizontal pixel, so every series is
+# reduced to ~`width` points before it is sent to the browser. A series that already fits is
+# returned untouched, so zooming into a short date range always shows the exact data.
+#   lttb   - Largest-Triangle-Three-Buckets: keeps the visually dominant point of each bucket
+#   minmax - min and max of each bucket: preserves the envelope (spikes, e.g. precipitation)
+CHART_WIDTH = 1400  # px, a full-width chart in the app's wide layout
+METHODS = ["lttb", "minmax"]
+DEFAULT_METHOD = "lttb"
+
+
+def lttb_indices(x, y, threshold):
+    """Positions of the `threshold` points LTTB keeps (first and last always included)."""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # threshold - 2 buckets over the inner points; bucket means come from prefix sums
+    edges = np.linspace(1, n - 1, threshold - 1).astype("int64")
+    csum_x = np.concatenate([[0.0], np.cumsum(x)])
+    csum_y = np.concatenate([[0.0], np.cumsum(y)])
+    sizes = edges[1:] - edges[:-1]
+    mean_x = (csum_x[edges[1:]] - csum_x[edges[:-1]]) / sizes
+    mean_y = (csum_y[edges[1:]] - csum_y[edges[:-1]]) / sizes
+    mean_x = np.append(mean_x[1:], x[-1])  # "next bucket" of the last bucket is the last point
+    mean_y = np.append(mean_y[1:], y[-1])
+
+    selected = np.empty(threshold, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # twice the area of the triangle (a, candidate, mean of next bucket)
+        area = np.abs((x[a] - mean_x[i]) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (mean_y[i] - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def minmax_indices(x, y, buckets):
+    """Positions of the min and max of each of `buckets` equal-width x intervals, plus the endpoints."""
+    n = len(y)
+    if 2 * buckets >= n or buckets < 1:
+        return np.arange(n)
+    span = x[-1] - x[0] or 1.0
+    bucket = np.minimum(((x - x[0]) * (buckets / span)).astype("int64"), buckets - 1)
+    starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+    ends = np.r_[starts[1:], n]
+    order = np.lexsort((y, bucket))  # by bucket, then value: min first, max last in each bucket
+    return np.unique(np.concatenate([[0, n - 1], order[starts], order[ends - 1]]))
+
+
+def _positions(index):
+    """Index values as floats (datetimes as nanoseconds) for the triangle areas and buckets."""
+    if pd.api.types.is_numeric_dtype(index):
+        return index.to_numpy(dtype="float64")
+    return pd.to_datetime(index).to_numpy("datetime64[ns]").astype("int64").astype("float64")
+
+
+def downsample(data, width=CHART_WIDTH, method=DEFAULT_METHOD):
+    """
+    Reduce a chart's data to about `width` points per series.
+
+    Args:
+        data (Series | DataFrame): what st.line_chart receives, indexed by date (sorted); one
+            line per column. NaN gaps are skipped per column.
+        width (int): chart width in pixels
+        method (str): "lttb" or "minmax"
+
+    Returns:
+        the same type with a subset of its rows (every row a column kept), or `data` itself
+        when it already fits
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+    if len(data) <= width:
+        return data
+
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    x = _positions(frame.index)
+    keep = np.zeros(len(frame), dtype=bool)
+    for col in frame.columns:
+        y = frame[col].to_numpy(dtype="float64")
+        valid = np.flatnonzero(~np.isnan(y))
+        if method == "lttb":
+            chosen = lttb_indices(x[valid], y[valid], width)
+        else:
+            chosen = minmax_indices(x[valid], y[valid], width // 2)
+        keep[valid[chosen]] = True
+    return data.iloc[np.flatnonzero(keep)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Downsample a synthetic hourly series and report the reduction")
+    parser.add_argument("--hours", type=int, default=5 * 8760)
+    parser.add_argument("--width", type=int, default=CHART_WIDTH)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    index = pd.date_range("2020-01-01", periods=args.hours, freq="h")
+    series = pd.Series(100 + np.cumsum(rng.normal(0, 1, args.hours)), index=index)
+    for method in METHODS:
+        started = time.perf_counter()
+        reduced = downsample(series, args.width, method)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"📉 {method}: {len(series):,} → {len(reduced):,} points in {elapsed:.1f} ms "
+              f"(min {reduced.min():.2f}/{series.min():.2f}, max {reduced.max():.2f}/{series.max():.2f})")
+
+
+if __name__ == "__main__":
+    main()
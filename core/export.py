@@ -0,0 +1,150 @@
+import argparse
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import closing
+import pyarrow as pa
+import pyarrow.parquet as pq
+from core import data_access, schema
+
+# === STREAMING EXPORT ===
+# Exports read the SQLite cursor CHUNK_ROWS rows at a time and write each chunk out before
+# fetching the next: CSV as encoded text blocks, Parquet as one row group per chunk. No
+# DataFrame of the whole selection is built, so memory stays at one chunk whatever the range.
+CHUNK_ROWS = 50000
+FORMATS = {
+    "csv": {"label": "CSV", "extension": "csv", "mime": "text/csv"},
+    "parquet": {"label": "Parquet", "extension": "parquet", "mime": "application/vnd.apache.parquet"},
+}
+PARQUET_COMPRESSION = "zstd"
+ARROW_TYPES = {"REAL": pa.float64(), "INTEGER": pa.int64(), "TEXT": pa.string()}
+
+
+def _rows(conn, table, key, start, end, columns, chunk_rows):
+    """(column names, iterator over lists of up to chunk_rows tuples)"""
+    sql, params = data_access.build_query(table, key, start, end, columns)
+    cursor = conn.execute(sql, params)
+    names = [col[0] for col in cursor.description]
+
+    def chunks():
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows:
+                return
+            yield rows
+    return names, chunks()
+
+
+def iter_csv(table, key=None, start=None, end=None, columns=None, db_path=schema.DB_PATH, chunk_rows=CHUNK_ROWS):
+    """
+    Yield a CSV export of one dataset slice as UTF-8 byte blocks (header first).
+
+    Args:
+        table (str): dataset (see data_access.DATASETS)
+        key (str | list): zone, city or commodity; None for all
+        start, end (str): inclusive 'YYYY-MM-DD' bounds; None for open-ended
+        columns (list): columns to export; None for all
+    """
+    with closing(schema.connect(db_path)) as conn:
+        names, chunks = _rows(conn, table, key, start, end, columns, chunk_rows)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(names)
+        for rows in chunks:
+            writer.writerows(rows)
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode("utf-8")  # header of an empty export
+
+
+def _arrow_schema(conn, table, names):
+    """Parquet column types from the declared SQLite types; the date column becomes a timestamp."""
+    declared = {row[1]: (row[2] or "").upper() for row in conn.execute(f"PRAGMA table_info({table})")}
+    date_col = data_access.DATASETS[table]["date"]
+    return pa.schema([(name, pa.timestamp("s") if name == date_col else ARROW_TYPES.get(declared.get(name), pa.string()))
+                      for name in names])
+
+
+def write_parquet(sink, table, key=None, start=None, end=None, columns=None, db_path=schema.DB_PATH,
+                  chunk_rows=CHUNK_ROWS, compression=PARQUET_COMPRESSION):
+    """
+    Write a compressed Parquet export of one dataset slice to `sink` (path or binary file object).
+
+    Same selection arguments as iter_csv. Returns the number of rows written.
+    """
+    total = 0
+    with closing(schema.connect(db_path)) as conn:
+        names, chunks = _rows(conn, table, key, start, end, columns, chunk_rows)
+        arrow_schema = _arrow_schema(conn, table, names)
+        with pq.ParquetWriter(sink, arrow_schema, compression=compression) as writer:
+            for rows in chunks:
+                arrays = [pa.array(values, type=field.type) if field.type != pa.timestamp("s")
+                          else pa.array(values, type=pa.string()).cast(field.type)
+                          for values, field in zip(zip(*rows), arrow_schema)]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=arrow_schema))
+                total += len(rows)
+    return total
+
+
+def write_csv(sink, table, key=None, start=None, end=None, columns=None, db_path=schema.DB_PATH,
+              chunk_rows=CHUNK_ROWS):
+    """Write a CSV export to `sink` (binary file object). Returns the number of bytes written."""
+    written = 0
+    for block in iter_csv(table, key, start, end, columns, db_path, chunk_rows):
+        sink.write(block)
+        written += len(block)
+    return written
+
+
+def export_file(fmt, table, key=None, start=None, end=None, columns=None, db_path=schema.DB_PATH):
+    """
+    The finished file as bytes, for st.download_button's deferred `data` callable. The export is
+    spooled to a temporary file chunk by chunk, then read back once and the file closed and
+    removed: Streamlit keeps downloads as bytes, so this single copy is the only one held.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    fd, path = tempfile.mkstemp(prefix=f"{table}-", suffix=f".{FORMATS[fmt]['extension']}")
+    try:
+        with os.fdopen(fd, "wb") as sink:
+            if fmt == "csv":
+                write_csv(sink, table, key, start, end, columns, db_path)
+            else:
+                write_parquet(sink, table, key, start, end, columns, db_path)
+        with open(path, "rb") as spooled:
+            return spooled.read()
+    finally:
+        os.remove(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export a dataset slice to CSV or Parquet without loading it in memory")
+    parser.add_argument("table", choices=list(data_access.DATASETS))
+    parser.add_argument("--key", nargs="+", help="zones, cities or commodities (default: all)")
+    parser.add_argument("--start", default=None)
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--format", choices=list(FORMATS), default="csv")
+    parser.add_argument("--out", default=None, help="output file (default: stdout for CSV)")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.format == "csv" and args.out is None:
+        write_csv(sys.stdout.buffer, args.table, args.key, args.start, args.end, db_path=args.db)
+        return
+    out = args.out or f"{args.table}.{FORMATS[args.format]['extension']}"
+    if args.format == "csv":
+        with open(out, "wb") as sink:
+            write_csv(sink, args.table, args.key, args.start, args.end, db_path=args.db)
+    else:
+        write_parquet(out, args.table, args.key, args.start, args.end, db_path=args.db)
+    print(f"✅ {out}: {os.path.getsize(out) / 1024:,.0f} KB in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# === DECLARATIVE LAG / ROLLING FEATURE GRID ===
+# A grid is a list of specs, each applying every lag and every (window, stat) pair to every column:
+#
+#     grid = [
+#         {"columns": ["pun_Price"], "lags": [1, 2, 7], "windows": [7, 28], "stats": ["mean", "std"]},
+#         {"columns": load_cols, "lags": [1], "windows": [7], "stats": ["mean", "min", "max"]},
+#     ]
+#
+# Output names follow the notebook: `<col>_lag<k>` and `<col>_rolling<w>_<stat>`. A window is
+# NaN until it is full or while it contains a NaN, like pandas `rolling(w)` with default min_periods.
+#
+# Internally every series is a row of a (p, n) array, so scans run along contiguous memory and
+# the (features, n) output is handed to pandas as its single block without a copy.
+
+STATS = ["mean", "std", "sum", "min", "max"]
+CHUNK_VALUES = 65536  # values per temporary in WindowMoments.window (~512 KiB, cache-sized)
+
+
+def feature_names(grid):
+    names = []
+    for spec in grid:
+        for lag in spec.get("lags", []):
+            names += [f"{col}_lag{lag}" for col in spec["columns"]]
+        for window in spec.get("windows", []):
+            for stat in spec.get("stats", []):
+                names += [f"{col}_rolling{window}_{stat}" for col in spec["columns"]]
+    return names
+
+
+# === BUILDING BLOCKS (X is (p, n): one series per row, time along axis 1) ===
+def lag_block(X, lag):
+    n = X.shape[1]
+    out = np.full_like(X, np.nan)
+    if lag < n:
+        out[:, lag:] = X[:, :n - lag]
+    return out
+
+
+def window_extreme(X, window, reduce):
+    """
+    Trailing-window min or max with log2(window) whole-array passes (sparse-table doubling).
+
+    After k passes, M[t] holds the extreme of the 2**k values ending at t; the window of length w
+    is then reduce(M[t], M[t - (w - 2**k)]) for the largest 2**k <= w.
+    NaN propagates through np.minimum/np.maximum, so NaN-tainted windows come out NaN.
+    """
+    p, n = X.shape
+    out = np.full((p, n), np.nan)
+    if window > n:
+        return out
+    span, M = 1, X
+    while span * 2 <= window:
+        doubled = M.copy()
+        reduce(M[:, span:], M[:, :n - span], out=doubled[:, span:])
+        span, M = span * 2, doubled
+    rest = window - span
+    out[:, window - 1:] = reduce(M[:, window - 1:], M[:, span - 1:n - rest]) if rest else M[:, window - 1:]
+    return out
+
+
+class WindowMoments:
+    """
+    Trailing-window sums and sums of squared deviations for every window up to `block` long.
+
+    Values are centred on the mean of their block of `block` values before taking prefix sums,
+    so running sums stay on the scale of the local spread rather than the series level. A window
+    spans at most two blocks; its two parts are merged with the pairwise (Chan et al.) update.
+    This keeps std as accurate as a two-pass computation on trending series, where plain prefix
+    sums of squares cancel badly. The prefix sums are shared by all windows of a spec.
+    """
+
+    def __init__(self, X, block):
+        p, n = X.shape
+        self.n, self.block = n, block
+        nan = np.isnan(X)
+
+        blocks = -(-n // block)
+        padded = np.full((p, blocks * block), np.nan)
+        padded[:, :n] = X
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN blocks
+            centers = np.nanmean(padded.reshape(p, blocks, block), axis=2)
+        centers[np.isnan(centers)] = 0.0
+        self.center = np.repeat(centers, block, axis=1)[:, :n]
+
+        Z = X - self.center
+        Z[nan] = 0.0
+        zeros = np.zeros((p, 1))
+        self.P1 = np.hstack([zeros, np.cumsum(Z, axis=1)])
+        self.P2 = np.hstack([zeros, np.cumsum(Z * Z, axis=1)])
+        self.nans = np.hstack([zeros, np.cumsum(nan, axis=1)]) if nan.any() else None
+
+    def window(self, window):
+        """(sum, M2) per trailing window, NaN where the window is incomplete or contains a NaN."""
+        n, P1, P2 = self.n, self.P1, self.P2
+        total = np.full(P1[:, 1:].shape, np.nan)
+        m2 = np.full_like(total, np.nan)
+        if window > n:
+            return total, m2
+
+        # windows are [begin, end] for end = window-1 .. n-1; part A is [begin, split) in the
+        # block of `begin`, part B is [split, end] in the block of `end` (A is empty if they match).
+        # Ends are processed in chunks so the temporaries below stay in cache.
+        chunk = max(256, CHUNK_VALUES // max(len(P1), 1))
+        for start in range(window - 1, n, chunk):
+            ends = np.arange(start, min(start + chunk, n))
+            begins = ends - window + 1
+            split = np.maximum(ends // self.block * self.block, begins)
+            n_b = (ends - split + 1).astype("float64")
+            n_a = window - n_b
+
+            head = slice(begins[0], begins[-1] + 1)
+            tail = slice(ends[0], ends[-1] + 1)
+            after = slice(ends[0] + 1, ends[-1] + 2)
+            P1_split, P2_split = P1[:, split], P2[:, split]
+            sum_a, sq_a = P1_split - P1[:, head], P2_split - P2[:, head]
+            sum_b, sq_b = P1[:, after] - P1_split, P2[:, after] - P2_split
+            c_a, c_b = self.center[:, head], self.center[:, tail]
+
+            mean_a = sum_a / np.maximum(n_a, 1.0)
+            mean_b = sum_b / n_b
+            delta = (c_b + mean_b) - (c_a + mean_a)
+            m2[:, tail] = (sq_a - sum_a * mean_a) + (sq_b - sum_b * mean_b) + delta * delta * (n_a * n_b / window)
+            total[:, tail] = sum_a + n_a * c_a + sum_b + n_b * c_b
+
+        if self.nans is not None:
+            tainted = (self.nans[:, window:] - self.nans[:, :n - window + 1]) > 0
+            total[:, window - 1:][tainted] = np.nan
+            m2[:, window - 1:][tainted] = np.nan
+        return total, m2
+
+
+def rolling_block(X, window, stat, sums=None):
+    """One (window, stat) block; `sums` is a precomputed WindowMoments.window(window) result."""
+    if stat in ("min", "max"):
+        return window_extreme(X, window, np.minimum if stat == "min" else np.maximum)
+
+    total, m2 = sums if sums is not None else WindowMoments(X, window).window(window)
+    if stat == "sum":
+        return total
+    if stat == "mean":
+        return total / window
+    if stat == "std":
+        if window < 2:
+            return np.full_like(total, np.nan)
+        return np.sqrt(np.maximum(m2, 0.0) / (window - 1))
+    raise ValueError(f"Unknown statistic: {stat} (expected one of {STATS})")
+
+
+# === GENERATOR ===
+def generate(df, grid, dtype="float64"):
+    """
+    Compute every lag and rolling feature of `grid` in one vectorized pass per spec.
+
+    Each spec's columns are taken as a single 2-D array: lags are shifts, mean/std/sum come from
+    prefix sums shared by all of the spec's windows (O(n·p) per block whatever the window length)
+    and min/max from log2(window) doubling passes. Blocks are written straight
+    into one preallocated output array. Rows are assumed to be in time order.
+
+    Returns:
+        DataFrame: Features aligned on df.index, in feature_names(grid) order
+    """
+    names = feature_names(grid)
+    out = np.empty((len(names), len(df)), dtype=dtype)
+    row = 0
+    for spec in grid:
+        X = np.ascontiguousarray(df[spec["columns"]].to_numpy(dtype="float64").T)
+        p = X.shape[0]
+        for lag in spec.get("lags", []):
+            out[row:row + p] = lag_block(X, lag)
+            row += p
+
+        windows, stats = spec.get("windows", []), spec.get("stats", [])
+        moments = WindowMoments(X, max(windows)) if windows and set(stats) & {"mean", "std", "sum"} else None
+        for window in windows:
+            sums = moments.window(window) if moments is not None else None
+            for stat in stats:
+                out[row:row + p] = rolling_block(X, window, stat, sums)
+                row += p
+    return pd.DataFrame(out.T, index=df.index, columns=names, copy=False)
+
+
+def generate_reference(df, grid):
+    """Per-column pandas implementation of `generate`, used to check its output."""
+    out = {}
+    for spec in grid:
+        for lag in spec.get("lags", []):
+            for col in spec["columns"]:
+                out[f"{col}_lag{lag}"] = df[col].shift(lag)
+        for window in spec.get("windows", []):
+            for stat in spec.get("stats", []):
+                for col in spec["columns"]:
+                    out[f"{col}_rolling{window}_{stat}"] = getattr(df[col].rolling(window), stat)()
+    return pd.DataFrame(out, index=df.index)[feature_names(grid)]
@@ -0,0 +1,246 @@
+import argparse
+import json
+import os
+import numpy as np
+import pandas as pd
+from core import feature_store, perf
+
+# === TARGET-CORRELATION FEATURE SELECTION ===
+# The notebook kept the columns of total_pun_model_features with |corr(target_pun)| > 0.2 by
+# computing df.corr(), a p × p matrix of which it used one column. Here only the p target
+# correlations are computed, from per-column sums over the rows where both the column and the
+# target are known (what df.corr does pairwise): one O(n·p) pass of matrix-vector products.
+#
+# The sums are additive, so TargetCorrelation keeps them and appended days update them without
+# rereading the table; pipeline runs save them next to the feature tables. Values are shifted by
+# the means of the first rows seen before summing, so the sums of squares do not cancel on
+# price levels.
+#
+# An optional redundancy filter then drops, from the most correlated feature down, any feature
+# whose |corr| with one already kept exceeds `max_redundancy` (a k × k matrix over the k
+# selected features only).
+SOURCE = "total_pun_model_features"
+DATASET = "pun_model_features"
+TARGET = "target_pun"
+THRESHOLD = 0.2  # the notebook's |corr(target_pun)| cut-off
+STATE_PATH = os.path.join(feature_store.FEATURE_DIR, f"{DATASET}.selection.json")
+BLOCK_ROWS = 8192  # rows reduced at once; bounds the (rows, p) temporaries of update()
+
+
+class TargetCorrelation:
+    """Running sums behind the correlation of every column with the target."""
+
+    def __init__(self, columns, target=TARGET):
+        self.columns = list(columns)
+        self.target = target
+        p = len(self.columns)
+        self.shift = None  # (column shifts, target shift), fixed by the first update
+        self.n = np.zeros(p)
+        self.sx, self.sy = np.zeros(p), np.zeros(p)
+        self.sxx, self.syy, self.sxy = np.zeros(p), np.zeros(p), np.zeros(p)
+
+    def update(self, df):
+        """Add the rows of a frame holding the columns and the target. Returns self."""
+        X = df[self.columns].to_numpy(dtype="float64")
+        y = df[self.target].to_numpy(dtype="float64")
+        known = ~np.isnan(y)
+        X, y = X[known], y[known]
+        if not len(y):
+            return self
+        if self.shift is None:
+            with np.errstate(all="ignore"):
+                shift_x = np.nan_to_num(np.nanmean(X, axis=0)) if np.isnan(X).any() else X.mean(axis=0)
+            self.shift = (shift_x, float(y.mean()))
+        for begin in range(0, len(y), BLOCK_ROWS):
+            Xb = X[begin:begin + BLOCK_ROWS] - self.shift[0]
+            yb = y[begin:begin + BLOCK_ROWS] - self.shift[1]
+            missing = np.isnan(Xb)
+            if missing.any():
+                present = (~missing).astype("float64")
+                Xb[missing] = 0.0
+                self.n += present.sum(axis=0)
+                self.sy += yb @ present
+                self.syy += (yb * yb) @ present
+            else:
+                self.n += len(yb)
+                self.sy += yb.sum()
+                self.syy += yb @ yb
+            self.sx += Xb.sum(axis=0)
+            self.sxx += np.einsum("ij,ij->j", Xb, Xb)
+            self.sxy += yb @ Xb
+        return self
+
+    def correlations(self):
+        """Pearson correlation of each column with the target (NaN for constant or empty columns)."""
+        with np.errstate(all="ignore"):
+            cov = self.n * self.sxy - self.sx * self.sy
+            var_x = self.n * self.sxx - self.sx * self.sx
+            var_y = self.n * self.syy - self.sy * self.sy
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[(self.n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+        return pd.Series(np.clip(corr, -1.0, 1.0), index=self.columns, name=self.target)
+
+    def to_dict(self):
+        return {
+            "columns": self.columns, "target": self.target,
+            "shift": None if self.shift is None else [self.shift[0].tolist(), self.shift[1]],
+            **{key: getattr(self, key).tolist() for key in ("n", "sx", "sy", "sxx", "syy", "sxy")},
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls(data["columns"], data["target"])
+        if data["shift"] is not None:
+            stats.shift = (np.array(data["shift"][0], dtype="float64"), float(data["shift"][1]))
+        for key in ("n", "sx", "sy", "sxx", "syy", "sxy"):
+            setattr(stats, key, np.array(data[key], dtype="float64"))
+        return stats
+
+
+def candidates(columns, target=TARGET):
+    """Every column that can be selected: all but the date and the target."""
+    return [col for col in columns if col not in ("date", target)]
+
+
+def target_correlations(df, target=TARGET):
+    """Correlation of every numeric column of `df` with `target`, in one O(n·p) pass."""
+    numeric = [col for col in candidates(df.columns, target) if pd.api.types.is_numeric_dtype(df[col])]
+    return TargetCorrelation(numeric, target).update(df).correlations()
+
+
+def drop_redundant(df, ranked, max_redundancy):
+    """
+    Greedy redundancy filter: walk `ranked` (most relevant first) and keep a column unless its
+    |corr| with an already kept one exceeds `max_redundancy`.
+    """
+    if len(ranked) < 2:
+        return list(ranked)
+    X = df[ranked].dropna().to_numpy(dtype="float64")
+    with np.errstate(all="ignore"):
+        Z = (X - X.mean(axis=0)) / X.std(axis=0)
+        corr = np.abs(Z.T @ Z / len(X))
+    kept = []
+    for i in range(len(ranked)):
+        if not kept or not (corr[i, kept] > max_redundancy).any():
+            kept.append(i)
+    return [ranked[i] for i in kept]
+
+
+def select(correlations, threshold=THRESHOLD, df=None, max_redundancy=None):
+    """
+    Columns with |correlation| > threshold, in the notebook's order (correlation descending).
+
+    Args:
+        df (DataFrame): rows of the selected columns, needed by the redundancy filter
+        max_redundancy (float): drop features more correlated than this with a stronger one; None keeps all
+    """
+    relevant = correlations[correlations.abs() > threshold]
+    if max_redundancy is not None and len(relevant) > 1:
+        ranked = relevant.abs().sort_values(ascending=False, kind="stable").index.tolist()
+        relevant = relevant[drop_redundant(df, ranked, max_redundancy)]
+    return relevant.sort_values(ascending=False, kind="stable").index.tolist()
+
+
+# === FEATURE-STORE TABLES ===
+@perf.timed("feature_selection.scan", rows=None)
+def scan(name=SOURCE, root=feature_store.FEATURE_DIR, target=TARGET):
+    """TargetCorrelation of a stored table, read one year partition at a time."""
+    stats = TargetCorrelation(candidates(feature_store.list_columns(name, root), target), target)
+    for year in feature_store.years(name, root):
+        stats.update(feature_store.read_dataset(name, years=[year], root=root))
+    return stats
+
+
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+@perf.timed("feature_selection", rows=None)
+def refresh(appended=None, threshold=None, max_redundancy=None, root=feature_store.FEATURE_DIR, state_path=None):
+    """
+    Update the selection after the source table changed and write pun_model_features.
+
+    Args:
+        appended (DataFrame): rows just appended to the source table; their sums are added to the
+            saved ones. None (a full build) rescans the whole table.
+        threshold, max_redundancy: default to the saved settings (THRESHOLD and no redundancy
+            filter the first time); max_redundancy 1 turns the filter off
+        state_path (str): saved sums and settings (default: next to the tables under `root`)
+
+    Returns:
+        tuple: (selected columns, True if pun_model_features was rewritten rather than appended to)
+    """
+    state_path = state_path or os.path.join(root, os.path.basename(STATE_PATH))
+    state = load_state(state_path)
+    saved = state or {"threshold": THRESHOLD, "max_redundancy": None}
+    threshold = saved["threshold"] if threshold is None else threshold
+    max_redundancy = saved["max_redundancy"] if max_redundancy is None else max_redundancy
+    stats = None
+    if appended is not None and state is not None and state["threshold"] == threshold \
+            and state["max_redundancy"] == max_redundancy and feature_store.exists(DATASET, root):
+        stats = TargetCorrelation.from_dict(state["stats"])
+        if set(stats.columns) <= set(appended.columns):
+            stats.update(appended)
+        else:
+            stats = None
+    if stats is None:
+        stats = scan(SOURCE, root)
+
+    correlations = stats.correlations()
+    ranked = correlations[correlations.abs() > threshold].index.tolist()
+    rows = feature_store.read_dataset(SOURCE, columns=ranked, root=root) if max_redundancy is not None else None
+    selected = select(correlations, threshold, rows, max_redundancy)
+    rewrite = appended is None or state is None or set(state["selected"]) != set(selected) \
+        or not feature_store.exists(DATASET, root)
+    if not rewrite:  # same features: keep the stored column order rather than rewrite for a reordering
+        selected = state["selected"]
+    columns = ["date"] + selected + [TARGET]
+
+    if rewrite:
+        timestamps = feature_store.has_timestamps(SOURCE, root=root)
+        feature_store.write_chunks((feature_store.read_dataset(SOURCE, columns=columns[1:], years=[year], root=root)
+                                    for year in feature_store.years(SOURCE, root)), DATASET, root=root,
+                                   timestamps=timestamps)
+    else:
+        feature_store.append_dataset(appended[columns], DATASET, root=root)
+    save_state({"threshold": threshold, "max_redundancy": max_redundancy, "selected": selected,
+                "stats": stats.to_dict()}, state_path)
+    return selected, rewrite
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank features by correlation with target_pun and write "
+                                                 "pun_model_features")
+    parser.add_argument("--threshold", type=float,
+                        help=f"minimum |corr(target_pun)| (default: saved, else {THRESHOLD})")
+    parser.add_argument("--max-redundancy", type=float,
+                        help="also drop features correlated above this with a stronger one (default: saved, "
+                             "else off; 1 turns it off)")
+    parser.add_argument("--write", action="store_true", help=f"rescan {SOURCE} and rewrite {DATASET}")
+    args = parser.parse_args()
+
+    if args.write:
+        selected, _ = refresh(threshold=args.threshold, max_redundancy=args.max_redundancy)
+        stats = TargetCorrelation.from_dict(load_state()["stats"])
+    else:
+        stats = scan()
+        selected = select(stats.correlations(), THRESHOLD if args.threshold is None else args.threshold)
+    correlations = stats.correlations()
+    order = correlations.abs().sort_values(ascending=False).index
+    print(f"📊 Correlation with {TARGET} ({len(correlations)} features, {int(stats.n.max())} rows):")
+    with pd.option_context("display.max_rows", 500):
+        print(correlations[order].round(4).to_string())
+    print(f"✅ {len(selected)} features selected" + (f" and written to {DATASET}" if args.write else ""))
+
+
+if __name__ == "__main__":
+    main()
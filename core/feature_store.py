@@ -0,0 +1,251 @@
+import argparse
+import os
+import shutil
+from contextlib import closing
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from core import schema
+
+# === FEATURE STORE LOCATION ===
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURE_DIR = os.path.join(BASE_DIR, "data", "features")
+
+# Wide modelling tables previously kept as CSV in data/
+DATASETS = ["energy_dataset", "total_pun_model_features", "pun_model_features"]
+
+PARTITION_COLUMN = "year"
+COMPRESSION = "zstd"
+
+
+def dataset_path(name, root=FEATURE_DIR):
+    return os.path.join(root, name)
+
+
+def exists(name, root=FEATURE_DIR):
+    return os.path.isdir(dataset_path(name, root))
+
+
+def _bump_version(name, root):
+    """
+    Invalidate the dashboard's cached reads of the dataset (core.cache) once its files are written.
+    Only the live store is read by the dashboard, so other roots (tests, scratch rebuilds) are skipped.
+    """
+    if os.path.abspath(root) != os.path.abspath(FEATURE_DIR):
+        return
+    with closing(schema.connect(schema.DB_PATH)) as conn, conn:
+        schema.bump_data_version(conn, name)
+
+
+def _to_table(df, date_column, timestamps=None):
+    """
+    Arrow table with the year partition column. Dates are stored as date32, or as timestamp[s]
+    for sub-daily rows (`timestamps`; None to decide from whether any value has a time of day).
+    """
+    df = df.copy()
+    df[date_column] = pd.to_datetime(df[date_column])
+    df[PARTITION_COLUMN] = df[date_column].dt.year
+    if timestamps is None:
+        timestamps = bool((df[date_column] != df[date_column].dt.normalize()).any())
+    if timestamps:
+        df[date_column] = df[date_column].astype("datetime64[s]")
+    else:
+        df[date_column] = df[date_column].dt.date  # stored as date32
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def has_timestamps(name, date_column="date", root=FEATURE_DIR):
+    """True if the dataset stores date and time (sub-daily rows) rather than dates."""
+    fields = ds.dataset(dataset_path(name, root), format="parquet", partitioning="hive").schema
+    return pa.types.is_timestamp(fields.field(date_column).type)
+
+
+def write_dataset(df, name, date_column="date", root=FEATURE_DIR, timestamps=None):
+    """
+    Write a wide frame as Parquet, one directory per year (`<root>/<name>/year=YYYY/`).
+
+    Any previous version of the dataset is replaced. Like every writer here, it bumps the
+    dataset's data version so the dashboard cache drops its reads.
+    """
+    path = dataset_path(name, root)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    pq.write_to_dataset(
+        _to_table(df, date_column, timestamps),
+        root_path=path,
+        partition_cols=[PARTITION_COLUMN],
+        compression=COMPRESSION,
+        basename_template="part-{i}.parquet",
+    )
+    _bump_version(name, root)
+    return path
+
+
+def write_chunks(frames, name, date_column="date", root=FEATURE_DIR, timestamps=None):
+    """
+    Write a dataset from an iterable of consecutive frames, each one becoming its own files in
+    the year partitions it spans, so only one frame is in memory at a time. Any previous version
+    of the dataset is replaced. Returns the number of rows written.
+    """
+    path = dataset_path(name, root)
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    rows = 0
+    for n, df in enumerate(frames):
+        if df.empty:
+            continue
+        pq.write_to_dataset(
+            _to_table(df, date_column, timestamps),
+            root_path=path,
+            partition_cols=[PARTITION_COLUMN],
+            compression=COMPRESSION,
+            basename_template=f"part-{n:05d}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        rows += len(df)
+    _bump_version(name, root)
+    return rows
+
+
+def append_dataset(df, name, date_column="date", root=FEATURE_DIR):
+    """
+    Add rows to an existing dataset, rewriting only the year partitions they fall in.
+
+    The partitions keep every stored column: a frame with fewer columns updates only its own
+    columns on dates already stored, and leaves the others empty on new dates.
+    """
+    if df.empty:
+        return dataset_path(name, root)
+    if not exists(name, root):
+        return write_dataset(df, name, date_column, root)
+    timestamps = has_timestamps(name, date_column, root)
+
+    new = df.assign(**{date_column: pd.to_datetime(df[date_column])}).set_index(date_column)
+    new = new[~new.index.duplicated(keep="last")]
+    current = read_dataset(name, years=sorted(new.index.year.unique().tolist()), root=root).set_index(date_column)
+    columns = current.columns.union(new.columns, sort=False)  # stored columns first, then new ones
+    merged = current.reindex(index=current.index.union(new.index), columns=columns)
+    merged.loc[new.index, new.columns] = new
+    merged = merged.rename_axis(date_column).reset_index()
+
+    pq.write_to_dataset(
+        _to_table(merged, date_column, timestamps),
+        root_path=dataset_path(name, root),
+        partition_cols=[PARTITION_COLUMN],
+        compression=COMPRESSION,
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+    )
+    _bump_version(name, root)
+    return dataset_path(name, root)
+
+
+def read_dataset(name, columns=None, start=None, end=None, years=None, date_column="date", root=FEATURE_DIR):
+    """
+    Load a dataset, reading only the requested columns and year partitions.
+
+    Args:
+        name (str): Dataset name (e.g. 'energy_dataset')
+        columns (list): Columns to project; None for all. The date column is always included.
+        start, end (str | date): Inclusive date bounds; None for open-ended
+        years (list): Restrict to these year partitions
+    """
+    if columns is not None and date_column not in columns:
+        columns = [date_column] + list(columns)
+
+    filters = []
+    if years is not None:
+        filters.append((PARTITION_COLUMN, "in", [int(y) for y in years]))
+    if start is not None or end is not None:
+        timestamps = has_timestamps(name, date_column, root)
+    if start is not None:
+        start = pd.Timestamp(start)
+        filters += [(PARTITION_COLUMN, ">=", start.year),
+                    (date_column, ">=", start.to_pydatetime() if timestamps else start.date())]
+    if end is not None:
+        end = pd.Timestamp(end)
+        filters.append((PARTITION_COLUMN, "<=", end.year))
+        if not timestamps:
+            filters.append((date_column, "<=", end.date()))
+        elif end == end.normalize():  # a bare end date includes that whole day
+            filters.append((date_column, "<", (end + pd.Timedelta(days=1)).to_pydatetime()))
+        else:
+            filters.append((date_column, "<=", end.to_pydatetime()))
+
+    table = pq.read_table(
+        dataset_path(name, root),
+        columns=columns,
+        filters=filters or None,
+        memory_map=True,
+        partitioning="hive",
+    )
+    if PARTITION_COLUMN in table.column_names and (columns is None or PARTITION_COLUMN not in columns):
+        table = table.drop_columns([PARTITION_COLUMN])
+
+    # release Arrow buffers column by column as they are converted, so peak memory stays near one copy
+    df = table.to_pandas(split_blocks=True, self_destruct=True)
+    del table
+    if date_column in df.columns:
+        df[date_column] = pd.to_datetime(df[date_column])
+        if not df[date_column].is_monotonic_increasing:
+            df = df.sort_values(date_column, ignore_index=True)
+    return df
+
+
+def years(name, root=FEATURE_DIR):
+    """Sorted year partitions of a dataset."""
+    return sorted(int(entry.split("=", 1)[1]) for entry in os.listdir(dataset_path(name, root))
+                  if entry.startswith(f"{PARTITION_COLUMN}="))
+
+
+def count_rows(name, root=FEATURE_DIR):
+    """Row count from the Parquet footers, without reading any column."""
+    return ds.dataset(dataset_path(name, root), format="parquet", partitioning="hive").count_rows()
+
+
+def date_bounds(name, date_column="date", root=FEATURE_DIR):
+    """
+    (first, last) date of a dataset from the Parquet row-group statistics, without reading any
+    column; falls back to reading the date column alone if a file was written without them.
+    """
+    lows, highs = [], []
+    for fragment in ds.dataset(dataset_path(name, root), format="parquet", partitioning="hive").get_fragments():
+        metadata = fragment.metadata
+        index = metadata.schema.to_arrow_schema().get_field_index(date_column)
+        for group in range(metadata.num_row_groups):
+            stats = metadata.row_group(group).column(index).statistics
+            if stats is None or not stats.has_min_max:
+                dates = read_dataset(name, columns=[date_column], date_column=date_column, root=root)[date_column]
+                return dates.min(), dates.max()
+            lows.append(stats.min)
+            highs.append(stats.max)
+    if not lows:
+        return pd.NaT, pd.NaT
+    return pd.Timestamp(min(lows)), pd.Timestamp(max(highs))
+
+
+def list_columns(name, root=FEATURE_DIR):
+    """Column names of a dataset, read from the Parquet schema only."""
+    fields = ds.dataset(dataset_path(name, root), format="parquet", partitioning="hive").schema
+    return [col for col in fields.names if col != PARTITION_COLUMN]
+
+
+def convert_csv(name, root=FEATURE_DIR, csv_folder=os.path.join(BASE_DIR, "data")):
+    """One-off import of `data/<name>.csv` into the store."""
+    df = pd.read_csv(os.path.join(csv_folder, f"{name}.csv"), parse_dates=["date"])
+    return write_dataset(df, name, root=root)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the wide CSV datasets into the Parquet feature store")
+    parser.add_argument("names", nargs="*", default=DATASETS, help="datasets to convert (default: all)")
+    args = parser.parse_args()
+
+    for name in args.names:
+        path = convert_csv(name)
+        print(f"✅ {name} → {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+import argparse
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+import tracemalloc
+import uuid
+from datetime import datetime
+import pandas as pd
+from core import schema
+
+try:
+    import resource  # Unix only: process peak RSS
+except ImportError:
+    resource = None
+
+# === HOT-PATH INSTRUMENTATION ===
+# `with perf.stage("terna.upsert", rows=n):` or `@perf.timed("pipeline.load_base")` record wall
+# time, CPU time, rows and memory of a stage. Stages nest: an event keeps the name of the stage it
+# ran in (parent) and the id of the outermost one (run), e.g. a dashboard rerun of one view or one
+# script invocation. Events are buffered and written when the outermost stage ends, never from
+# inside a stage, where the instrumented code may hold a write transaction on the database.
+#
+# Off by default; when off, stage() returns a shared no-op and timed() adds one flag check.
+# PERF_EVENTS=1 (or "db") writes to the perf_events table of data.db, PERF_EVENTS=<file>.jsonl
+# appends JSON lines instead. PERF_MEMORY=1 also traces Python allocations for a per-stage peak
+# (tracemalloc: slows the traced code noticeably); the process peak RSS is always recorded.
+COLUMNS = ["run", "stage", "parent", "started_at", "wall_seconds", "cpu_seconds", "rows", "peak_mb",
+           "max_rss_mb", "detail"]
+
+_enabled = False
+_sink = None  # database path or .jsonl path
+_memory = False
+_buffer = []
+_lock = threading.Lock()
+_local = threading.local()
+
+
+def configure(sink=None, memory=False):
+    """
+    Turn recording on (sink: "db", a database path or a .jsonl path) or off (sink None / "0").
+    """
+    global _enabled, _sink, _memory
+    flush()
+    if sink in (None, "", "0", False):
+        _enabled, _sink, _memory = False, None, False
+        return
+    _sink = schema.DB_PATH if sink in ("1", "db", True) else sink
+    _memory = bool(memory)
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _enabled = True
+
+
+def set_recording(on):
+    """
+    Pause or resume recording, keeping the configured sink and memory tracing (data.db if recording
+    was never configured), so a switch in the dashboard does not redirect a PERF_EVENTS=<file>.jsonl.
+    """
+    global _enabled
+    flush()
+    if on and _sink is None:
+        configure("db")
+    _enabled = bool(on)
+
+
+def enabled():
+    return _enabled
+
+
+def sink():
+    return _sink
+
+
+def count(value):
+    """Rows of a loader result: len() of frames, arrays and lists, else None."""
+    return len(value) if hasattr(value, "__len__") and not isinstance(value, (str, bytes, dict)) else None
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+class _NullStage:
+    """What stage() returns while recording is off."""
+    rows = None
+    detail = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+NULL_STAGE = _NullStage()
+
+
+class Stage:
+    """One timed stage; set `rows` or `detail` inside the block if they are known only then."""
+
+    def __init__(self, name, rows=None, detail=None):
+        self.name = name
+        self.rows = rows
+        self.detail = detail
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent = stack[-1] if stack else None
+        self.run = self.parent.run if self.parent else uuid.uuid4().hex[:12]
+        self.child_peak = 0
+        if _memory and tracemalloc.is_tracing():
+            self.outer_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+        stack.append(self)
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall_start
+        cpu = time.process_time() - self.cpu_start
+        _local.stack.pop()
+        peak = None
+        if _memory and tracemalloc.is_tracing() and hasattr(self, "outer_peak"):
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            if self.parent is not None:  # the reset hid earlier allocations from the enclosing stage
+                self.parent.child_peak = max(self.parent.child_peak, peak, self.outer_peak)
+            peak /= 2**20
+        detail = self.detail if exc_type is None else f"error: {exc_type.__name__}"
+        record(self.name, wall, cpu, rows=self.rows, detail=detail, peak_mb=peak, run=self.run,
+               parent=self.parent.name if self.parent else None, started_at=self.started_at)
+        return False
+
+
+def stage(name, rows=None, detail=None):
+    """Context manager timing a block (a shared no-op while recording is off)."""
+    if not _enabled:
+        return NULL_STAGE
+    return Stage(name, rows, detail)
+
+
+def timed(name=None, rows=count):
+    """
+    Decorator timing every call of a function.
+
+    Args:
+        name (str): stage name (default: module.function)
+        rows (callable): rows processed, from the return value (default: its len())
+    """
+    def decorator(fn):
+        label = name or f"{fn.__module__.split('.')[-1]}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Stage(label) as event:
+                result = fn(*args, **kwargs)
+                event.rows = rows(result) if rows else None
+            return result
+        return wrapper
+    return decorator
+
+
+def record(name, wall_seconds, cpu_seconds=None, rows=None, detail=None, peak_mb=None, run=None, parent=None,
+           started_at=None):
+    """Record a stage measured elsewhere (e.g. in a worker process)."""
+    if not _enabled:
+        return
+    stack = getattr(_local, "stack", None)
+    if run is None and stack:
+        run, parent = stack[-1].run, stack[-1].name
+    event = {
+        "run": run or uuid.uuid4().hex[:12], "stage": name, "parent": parent,
+        "started_at": started_at or datetime.now().isoformat(timespec="milliseconds"),
+        "wall_seconds": wall_seconds, "cpu_seconds": cpu_seconds, "rows": rows, "peak_mb": peak_mb,
+        "max_rss_mb": _max_rss_mb(), "detail": detail,
+    }
+    with _lock:
+        _buffer.append(event)
+    if not stack:  # outermost stage ended, or an event recorded outside any stage
+        flush()
+
+
+def flush():
+    """Write buffered events to the sink."""
+    global _buffer
+    with _lock:
+        events, _buffer = _buffer, []
+    if not events or _sink is None:
+        return
+    try:
+        if _sink.endswith(".jsonl"):
+            with open(_sink, "a", encoding="utf-8") as handle:
+                handle.writelines(json.dumps(event) + "\n" for event in events)
+            return
+        conn = schema.connect(_sink)
+        try:
+            with conn:
+                conn.executemany(f"INSERT INTO perf_events ({', '.join(COLUMNS)}) "
+                                 f"VALUES ({', '.join('?' * len(COLUMNS))})",
+                                 [tuple(event[col] for col in COLUMNS) for event in events])
+        finally:
+            conn.close()
+    except (OSError, sqlite3.Error) as exc:  # instrumentation never fails the instrumented code
+        print(f"⚠️ perf: {len(events)} events not written ({exc})")
+
+
+# === READING EVENTS BACK ===
+def read_events(since=None, stage_prefix=None, source=None):
+    """
+    Recorded events as a DataFrame (started_at parsed), oldest first.
+
+    Args:
+        since (str): ISO timestamp of the first event to return
+        stage_prefix (str): only stages starting with it, e.g. "view:" or "load:"
+        source (str): database or .jsonl path (default: the configured sink, else data.db)
+    """
+    source = source or _sink or schema.DB_PATH
+    if source.endswith(".jsonl"):
+        df = pd.read_json(source, lines=True, dtype=False) if os.path.exists(source) else pd.DataFrame(columns=COLUMNS)
+        if since is not None and len(df):
+            df = df[df["started_at"] >= since]
+        if stage_prefix is not None and len(df):
+            df = df[df["stage"].str.startswith(stage_prefix)]
+    else:
+        where, params = ["1 = 1"], []
+        if since is not None:
+            where.append("started_at >= ?")
+            params.append(since)
+        if stage_prefix is not None:
+            where.append("stage >= ? AND stage < ?")  # prefix range on the (stage, started_at) index
+            params += [stage_prefix, stage_prefix + "\uffff"]
+        conn = schema.connect(source)
+        try:
+            df = pd.read_sql(f"SELECT {', '.join(COLUMNS)} FROM perf_events WHERE {' AND '.join(where)} "
+                             "ORDER BY started_at", conn, params=params)
+        finally:
+            conn.close()
+    df = df.reindex(columns=COLUMNS)
+    df["started_at"] = pd.to_datetime(df["started_at"])
+    return df.sort_values("started_at", ignore_index=True)
+
+
+def summary(events):
+    """Calls, median / p95 / total wall seconds, CPU seconds and rows per stage."""
+    if events.empty:
+        return pd.DataFrame(columns=["calls", "median_s", "p95_s", "total_s", "cpu_s", "rows"])
+    grouped = events.groupby("stage")
+    return pd.DataFrame({
+        "calls": grouped.size(),
+        "median_s": grouped["wall_seconds"].median(),
+        "p95_s": grouped["wall_seconds"].quantile(0.95),
+        "total_s": grouped["wall_seconds"].sum(),
+        "cpu_s": grouped["cpu_seconds"].sum(),
+        "rows": grouped["rows"].sum(min_count=1),
+    }).sort_values("total_s", ascending=False)
+
+
+configure(os.getenv("PERF_EVENTS"), memory=os.getenv("PERF_MEMORY") == "1")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage timings recorded with PERF_EVENTS")
+    parser.add_argument("--since", help="ISO date or timestamp of the first event")
+    parser.add_argument("--stage", help="stage name prefix, e.g. terna. or load:")
+    parser.add_argument("--source", help="database or .jsonl file (default: data.db)")
+    args = parser.parse_args()
+    events = read_events(args.since, args.stage, args.source)
+    print(f"📊 {len(events)} events")
+    with pd.option_context("display.width", 160, "display.max_rows", 200):
+        print(summary(events).round(4))
+
+
+if __name__ == "__main__":
+    main()
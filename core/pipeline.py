@@ -0,0 +1,343 @@
+import argparse
+import filecmp
+import json
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from core import data_access, dataset_builder, feature_selection, feature_store, perf, resolution, schema
+
+# === PIPELINE CONFIGURATION (mirrors notebooks/pun_prediction.ipynb) ===
+FEATURE_DATASET = "total_pun_model_features"
+STATE_PATH = os.path.join(feature_store.FEATURE_DIR, f"{FEATURE_DATASET}.state.json")
+START_DATE = "2020-01-01"
+WEATHER_FEATURES = dataset_builder.WEATHER_FEATURES
+MISSING_THRESHOLD = 20  # % of missing values above which a column is dropped on a full build
+ROLLING_WINDOW = 7  # days
+ENGINEERED = ["day_of_week", "month", "is_sunday_or_holiday", "hour",
+              "pun_Price_lag1", "pun_Price_rolling7_mean", "pun_Price_rolling7_std"]
+ONE_DAY = pd.Timedelta(days=1)
+STALE_DAYS = 31  # a key this far behind the rest of its table no longer holds appends back
+
+# === SUB-DAILY BUILDS ===
+# At hourly or 15-minute resolution ("h", "15min") there is one row per period: every source is
+# aggregated to that period in SQLite, the lag and rolling window stay expressed in days (the
+# same period on previous days) and the target is the same period of the next day. Builds run
+# in chunks of CHUNK_DAYS, carrying the same state as incremental runs, and the chunks are
+# written to the store as they are produced, so memory stays bounded by one chunk.
+CHUNK_DAYS = 92
+ROLLING_BLOCK = 8192  # windows reduced at once; bounds the temporaries of the rolling std
+
+
+def _iso(day):
+    return pd.Timestamp(day).strftime("%Y-%m-%d")
+
+
+# === SOURCE DATA ===
+def _complete_day(latest, freq):
+    """Last day fully stored in a series whose latest row is `latest`, at native resolution `freq`."""
+    if len(latest) == 10:
+        return pd.Timestamp(latest)
+    return (pd.Timestamp(latest) + pd.tseries.frequencies.to_offset(freq)).normalize() - ONE_DAY
+
+
+def ready_until(db_path=schema.DB_PATH, columns=None):
+    """
+    Last day whose feature row can be finalized: its next-day PUN (the target) must be stored,
+    and every zone, city and commodity behind the table's columns must have arrived up to it.
+    Each key gates on its own watermark: a late key would otherwise be dropped (load, weather) or
+    forward-filled (commodities) by an append but not by a later full rebuild. Keys STALE_DAYS
+    behind the freshest of their table are taken as discontinued and no longer gate.
+
+    Args:
+        columns (list): the table's columns; None for every key of the sources
+    """
+    (pun,) = data_access.watermarks("pun_prices", db_path).values()
+    limits = [_complete_day(pun, data_access.native_freq("pun_prices", db_path=db_path)) - ONE_DAY]
+    for _, table, values, name, _ in dataset_builder.SOURCES:
+        latest = {}
+        for key, stamp in data_access.watermarks(table, db_path).items():
+            if columns is None or any(name.format(key=key, value=value) in columns for value in values):
+                freq = "D" if len(stamp) == 10 else data_access.native_freq(table, key, db_path)
+                latest[key] = _complete_day(stamp, freq)
+        if latest:
+            freshest = max(latest.values())
+            limits += [day for day in latest.values() if day > freshest - pd.Timedelta(days=STALE_DAYS)]
+    return min(limits)
+
+
+@perf.timed("pipeline.load_base")
+def load_base(start, end, db_path=schema.DB_PATH, freq="D", columns=None):
+    """
+    Calendar frame over the days [start, end] with the raw PUN, commodity, load and weather
+    columns and target_pun, one row per `freq` period ("D", "h" or "15min"), built by a single
+    SQLite query (core.dataset_builder). `columns` limits it to those columns (engineered ones
+    are ignored); None builds every column the sources have over those days.
+    """
+    if columns is not None:
+        columns = [col for col in columns if col not in ENGINEERED]
+    return dataset_builder.load_wide(start, end, freq, columns, db_path=db_path)
+
+
+# === FEATURE ENGINEERING ===
+def _rolling(values, window, stat):
+    """Trailing `window` statistic per position; NaN until the window is full or if it contains a NaN."""
+    out = np.full(len(values), np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        # in blocks of rows: std materializes its deviations, rows × window values at a time
+        for begin in range(0, len(windows), ROLLING_BLOCK):
+            block = windows[begin:begin + ROLLING_BLOCK]
+            out[window - 1 + begin:window - 1 + begin + len(block)] = (
+                block.mean(axis=1) if stat == "mean" else block.std(axis=1, ddof=1))
+    return out
+
+
+@perf.timed("pipeline.add_features", rows=lambda result: len(result[0]))
+def add_features(df, state=None, columns=None, freq="D"):
+    """
+    Forward-fill prices, drop sparse columns and add time, lag and rolling PUN features.
+
+    Args:
+        df (DataFrame): Output of load_base, one row per `freq` period
+        state (dict): Carry-over from the previous run ('ffill' values and 'pun_tail');
+            None when starting from the first day
+        columns (list): Final column set to enforce; None to derive it from the missing-value rule
+        freq (str): "D", "h" or "15min"; the lag and rolling window cover whole days
+
+    Returns:
+        tuple: (feature frame after dropna, new state)
+    """
+    df = df.copy()
+    state = state or {"ffill": {}, "pun_tail": []}
+    per_day = resolution.periods_per_day(freq)
+    window = ROLLING_WINDOW * per_day
+
+    if columns is not None:
+        df = df.reindex(columns=[col for col in columns if col not in ENGINEERED])
+    value_cols = [col for col in df.columns if col != "date"]
+    df[value_cols] = df[value_cols].astype("float64")
+
+    # === FORWARD FILL COMMODITY PRICES (carrying the last value seen by the previous run) ===
+    price_cols = [col for col in df.columns if col.endswith("_Price")]
+    for col in price_cols:
+        carried = state["ffill"].get(col)
+        if carried is not None and pd.isna(df[col].iloc[0]):
+            df.loc[df.index[0], col] = carried
+    df[price_cols] = df[price_cols].ffill()
+
+    # === DROP columns with missing percentage > threshold (full builds only) ===
+    if columns is None:
+        missing_pct = df.isnull().mean() * 100
+        df = df.drop(columns=missing_pct[missing_pct > MISSING_THRESHOLD].index)
+
+    # === CREATE TIME-BASED FEATURES ===
+    df["day_of_week"] = df["date"].dt.dayofweek  # 0=Monday, 6=Sunday
+    df["month"] = df["date"].dt.month
+    df["is_sunday_or_holiday"] = df["day_of_week"].isin([6]).astype(int)  # holiday list can be added later
+    if resolution.is_sub_daily(freq):
+        df["hour"] = df["date"].dt.hour + df["date"].dt.minute / 60
+
+    # === CREATE LAG AND ROLLING FEATURES FOR PUN (same period, previous days) ===
+    tail = np.array([np.nan if v is None else v for v in state["pun_tail"]], dtype="float64")
+    pun = np.concatenate([tail, df["pun_Price"].to_numpy()])
+    offset = len(tail)
+    lag = np.concatenate([np.full(per_day, np.nan), pun[:-per_day]])
+    df["pun_Price_lag1"] = lag[offset:]
+    df["pun_Price_rolling7_mean"] = _rolling(pun, window, "mean")[offset:]
+    df["pun_Price_rolling7_std"] = _rolling(pun, window, "std")[offset:]
+
+    new_state = {
+        "last_date": _iso(df["date"].iloc[-1]),
+        "ffill": {col: (None if pd.isna(df[col].iloc[-1]) else float(df[col].iloc[-1])) for col in price_cols
+                  if col in df.columns},
+        "pun_tail": [None if np.isnan(v) else float(v) for v in pun[-(window - 1):]],
+    }
+    if freq != "D":
+        new_state["freq"] = freq
+
+    if columns is not None:
+        df = df[columns]
+
+    # === DROP ROWS WITH ANY REMAINING NaNs ===
+    df = df.dropna().reset_index(drop=True)
+    new_state["columns"] = list(df.columns)
+    return df, new_state
+
+
+# === STATE ===
+def load_state(path=STATE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=STATE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+# === CHUNKED BUILDS ===
+def _chunks(start, end, chunk_days):
+    """Consecutive (first, last) day ranges of at most `chunk_days` days covering [start, end]."""
+    first, end = pd.Timestamp(start), pd.Timestamp(end)
+    while first <= end:
+        last = min(first + pd.Timedelta(days=chunk_days - 1), end)
+        yield first, last
+        first = last + ONE_DAY
+
+
+def _ordered(columns):
+    """Base columns in load_base's layout: PUN, commodities, zones, weather by feature then city, target."""
+    prices = sorted(col for col in columns if col.endswith("_Price") and col != "pun_Price")
+    loads = sorted(col for col in columns if col.endswith("_Load"))
+    weather = [col for feature in WEATHER_FEATURES for col in sorted(c for c in columns if c.endswith(f"_{feature}"))]
+    return ["date", "pun_Price"] + prices + loads + weather + ["target_pun"]
+
+
+def plan_columns(start, end, freq="D", chunk_days=CHUNK_DAYS, db_path=schema.DB_PATH):
+    """
+    Columns a full build over [start, end] keeps, found chunk by chunk: a first pass applies the
+    carried forward fill and the missing-value rule of add_features without holding the table.
+    """
+    rows, present, carried = 0, {}, {}
+    for first, last in _chunks(start, end, chunk_days):
+        df = load_base(first, last, db_path, freq)
+        for col in df.columns:
+            values = df[col]
+            if col.endswith("_Price"):
+                if carried.get(col) is not None and pd.isna(values.iloc[0]):
+                    values = pd.concat([pd.Series([carried[col]]), values.iloc[1:]], ignore_index=True)
+                values = values.ffill()
+            present[col] = present.get(col, 0) + int(values.notna().sum())
+        for col in [col for col in carried if col not in df.columns]:  # reindexed in, all carried value
+            present[col] += len(df) if carried[col] is not None else 0
+        for col in [col for col in df.columns if col.endswith("_Price")]:
+            value = df[col].ffill().iloc[-1] if df[col].notna().any() else carried.get(col)
+            carried[col] = None if value is None or pd.isna(value) else float(value)
+        rows += len(df)
+    kept = [col for col in _ordered(present) if (1 - present.get(col, 0) / max(rows, 1)) * 100 <= MISSING_THRESHOLD]
+    intraday = ["hour"] if resolution.is_sub_daily(freq) else []
+    return kept + ["day_of_week", "month", "is_sunday_or_holiday"] + intraday + [
+        "pun_Price_lag1", "pun_Price_rolling7_mean", "pun_Price_rolling7_std"]
+
+
+def iter_features(start, end, freq="D", columns=None, state=None, chunk_days=CHUNK_DAYS, db_path=schema.DB_PATH):
+    """(feature rows, state) per chunk of [start, end], each chunk continuing from the previous one's state."""
+    for first, last in _chunks(start, end, chunk_days):
+        df, state = add_features(load_base(first, last, db_path, freq, columns), state=state, columns=columns,
+                                 freq=freq)
+        yield df, state
+
+
+def write_full(end=None, freq="D", chunk_days=CHUNK_DAYS, columns=None, start=START_DATE, db_path=schema.DB_PATH,
+               root=feature_store.FEATURE_DIR):
+    """
+    Full build from `start` written to the store chunk by chunk, for tables too large to
+    build in memory (sub-daily resolutions). Returns (rows written, state to continue from).
+    """
+    end = pd.Timestamp(end) if end is not None else ready_until(db_path, columns)
+    columns = columns or plan_columns(start, end, freq, chunk_days, db_path)
+    progress = {"state": None}
+
+    def frames():
+        for df, state in iter_features(start, end, freq, columns, None, chunk_days, db_path):
+            progress["state"] = state
+            yield df
+
+    rows = feature_store.write_chunks(frames(), FEATURE_DATASET, root=root, timestamps=resolution.is_sub_daily(freq))
+    return rows, progress["state"]
+
+
+# === ENTRY POINTS ===
+def build_full(end=None, columns=None, db_path=schema.DB_PATH):
+    """Feature table from START_DATE to `end` (default: ready_until) plus the state to continue from."""
+    end = pd.Timestamp(end) if end is not None else ready_until(db_path, columns)
+    return add_features(load_base(START_DATE, end, db_path, columns=columns), columns=columns)
+
+
+def build_incremental(state, end=None, db_path=schema.DB_PATH):
+    """Feature rows for the days after state['last_date'] only. Returns (rows, new state) or (None, state)."""
+    start = pd.Timestamp(state["last_date"]) + ONE_DAY
+    end = pd.Timestamp(end) if end is not None else ready_until(db_path, state["columns"])
+    if start > end:
+        return None, state
+    freq = state.get("freq", "D")
+    return add_features(load_base(start, end, db_path, freq, state["columns"]), state=state, columns=state["columns"],
+                        freq=freq)
+
+
+def rebuild_matches_store(db_path=schema.DB_PATH, state_path=STATE_PATH, root=feature_store.FEATURE_DIR):
+    """True if a from-scratch build over the same days and columns writes byte-identical Parquet files."""
+    state = load_state(state_path)
+    if state.get("freq", "D") != "D":
+        # chunked tables have no single file layout to compare: compare their contents
+        with tempfile.TemporaryDirectory() as tmp:
+            write_full(state["last_date"], state["freq"], columns=state["columns"], db_path=db_path, root=tmp)
+            return feature_store.read_dataset(FEATURE_DATASET, root=root).equals(
+                feature_store.read_dataset(FEATURE_DATASET, root=tmp))
+    rebuilt, _ = build_full(end=state["last_date"], columns=state["columns"], db_path=db_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        feature_store.write_dataset(rebuilt, FEATURE_DATASET, root=tmp)
+        stored_dir = feature_store.dataset_path(FEATURE_DATASET, root)
+        rebuilt_dir = feature_store.dataset_path(FEATURE_DATASET, tmp)
+        stored_files = sorted(os.path.relpath(os.path.join(d, f), stored_dir)
+                              for d, _, files in os.walk(stored_dir) for f in files)
+        rebuilt_files = sorted(os.path.relpath(os.path.join(d, f), rebuilt_dir)
+                               for d, _, files in os.walk(rebuilt_dir) for f in files)
+        if stored_files != rebuilt_files:
+            return False
+        _, mismatch, errors = filecmp.cmpfiles(stored_dir, rebuilt_dir, stored_files, shallow=False)
+        return not mismatch and not errors
+
+
+@perf.timed("pipeline", rows=None)
+def main():
+    parser = argparse.ArgumentParser(description="Build or extend the PUN feature table in the feature store")
+    parser.add_argument("--full", action="store_true", help="rebuild from scratch instead of appending new days")
+    parser.add_argument("--end", help="last day to process (default: last day with complete sources)")
+    parser.add_argument("--check", action="store_true", help="verify a full rebuild equals the stored table")
+    parser.add_argument("--freq", choices=list(resolution.PERIODS_PER_DAY),
+                        help="row resolution of a full build (default: D; appends keep the stored one)")
+    parser.add_argument("--chunk-days", type=int,
+                        help=f"build in chunks of this many days (default for sub-daily builds: {CHUNK_DAYS})")
+    args = parser.parse_args()
+
+    if args.check:
+        print("✅ Rebuild matches store" if rebuild_matches_store() else "❌ Rebuild differs from store")
+        return
+
+    state = None if args.full else load_state()
+    if state is not None and args.freq and args.freq != state.get("freq", "D"):
+        print(f"❌ Stored table is at resolution {state.get('freq', 'D')}; use --full to rebuild at {args.freq}")
+        return
+    freq = args.freq or "D"
+    appended = None
+    if state is None and (resolution.is_sub_daily(freq) or args.chunk_days):
+        rows, state = write_full(end=args.end, freq=freq, chunk_days=args.chunk_days or CHUNK_DAYS)
+        print(f"✅ Full build ({freq}, chunks of {args.chunk_days or CHUNK_DAYS} days): {rows} rows, "
+              f"{len(state['columns'])} columns")
+    elif state is None:
+        df, state = build_full(end=args.end)
+        feature_store.write_dataset(df, FEATURE_DATASET)
+        print(f"✅ Full build: {len(df)} rows, {len(df.columns)} columns")
+    else:
+        df, state = build_incremental(state, end=args.end)
+        if df is None:
+            print(f"✅ Up to date (last day: {state['last_date']})")
+            return
+        feature_store.append_dataset(df, FEATURE_DATASET)
+        appended = df
+        print(f"✅ Appended {len(df)} rows up to {state['last_date']}")
+    save_state(state)
+
+    # === SELECTED FEATURES (pun_model_features, the linear models' inputs) ===
+    selected, rewritten = feature_selection.refresh(appended)
+    print(f"✅ {feature_selection.DATASET}: {len(selected)} features "
+          f"({'rewritten' if rewritten else 'appended'})")
+
+
+if __name__ == "__main__":
+    main()
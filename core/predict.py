@@ -0,0 +1,142 @@
+import argparse
+import threading
+import time
+from collections import deque
+import numpy as np
+from core import feature_selection, feature_store, registry, schema
+
+# === BATCH PREDICTION API ===
+LATENCY_WINDOW = 1000  # most recent calls kept per model for the latency percentiles
+
+
+class Predictor:
+    """
+    Serve registered models from memory.
+
+    Each model's artifact is loaded on first use and kept warm; a batch of feature rows is
+    scored with one scaler.transform and one model.predict call. Per-model call latencies
+    feed stats() (p50/p99 and rows/s). Safe to share between threads (e.g. Streamlit sessions).
+    """
+
+    def __init__(self, db_path=schema.DB_PATH, window=LATENCY_WINDOW):
+        self.db_path = db_path
+        self.window = window
+        self._artifacts = {}
+        self._latency = {}
+        self._totals = {}  # model -> [calls, rows, seconds]
+        self._lock = threading.Lock()
+
+    def load(self, model_name):
+        """The warm artifact of `model_name`, loading its latest registered version once."""
+        artifact = self._artifacts.get(model_name)
+        if artifact is None:
+            artifact = registry.load(model_name, db_path=self.db_path)
+            with self._lock:
+                artifact = self._artifacts.setdefault(model_name, artifact)
+        return artifact
+
+    def reload(self, model_name=None):
+        """Drop warm models (all, or one) so the next call picks up newly registered versions."""
+        with self._lock:
+            if model_name is None:
+                self._artifacts.clear()
+            else:
+                self._artifacts.pop(model_name, None)
+
+    def predict(self, model_name, rows):
+        """
+        Score a batch of feature rows.
+
+        Args:
+            model_name (str): registered model
+            rows (DataFrame | ndarray): a frame containing the model's feature columns (any order,
+                extra columns ignored), or a 2-D array already in feature order
+
+        Returns:
+            ndarray: one prediction per row, or (rows, horizons) for a multi-horizon model (D+1 first)
+        """
+        artifact = self.load(model_name)
+        started = time.perf_counter()
+        if hasattr(rows, "columns"):
+            missing = [col for col in artifact["features"] if col not in rows.columns]
+            if missing:
+                raise ValueError(f"{model_name}: missing feature columns {missing}")
+            X = rows[artifact["features"]].to_numpy(dtype="float64")
+        else:
+            X = np.asarray(rows, dtype="float64").reshape(-1, len(artifact["features"]))
+        if artifact["scaler"] is not None:
+            X = artifact["scaler"].transform(X)
+        predictions = artifact["model"].predict(X)
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self._latency.setdefault(model_name, deque(maxlen=self.window)).append(elapsed)
+            totals = self._totals.setdefault(model_name, [0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += len(X)
+            totals[2] += elapsed
+        return np.asarray(predictions, dtype="float64")
+
+    def stats(self, model_name):
+        """calls, rows, p50_ms and p99_ms over the recent calls, rows_per_s over all calls."""
+        with self._lock:
+            latencies = np.array(self._latency.get(model_name, ()))
+            calls, rows, seconds = self._totals.get(model_name, [0, 0, 0.0])
+        if not len(latencies):
+            return {"calls": 0, "rows": 0, "p50_ms": None, "p99_ms": None, "rows_per_s": None}
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+        return {"calls": calls, "rows": rows, "p50_ms": float(p50), "p99_ms": float(p99),
+                "rows_per_s": rows / seconds if seconds else None}
+
+
+def feature_table(dataset):
+    """
+    Table to read a model's rows from. pun_model_features holds only the current selection, which
+    can change after an append, so models trained on it read the superset it is selected from.
+    """
+    return feature_selection.SOURCE if dataset == feature_selection.DATASET else dataset
+
+
+def read_rows(dataset, features, start=None, end=None, root=feature_store.FEATURE_DIR):
+    """The saved `features` and the target of a model trained on `dataset`, between start and end."""
+    table = feature_table(dataset)
+    available = set(feature_store.list_columns(table, root))
+    columns = [col for col in list(features) + [feature_selection.TARGET] if col in available]
+    return feature_store.read_dataset(table, columns=columns, start=start, end=end, root=root)
+
+
+def load_rows(model_name, start=None, end=None, predictor=None):
+    """Feature rows for a registered model between start and end (see read_rows)."""
+    artifact = (predictor or Predictor()).load(model_name)
+    return read_rows(artifact["dataset"], artifact["features"], start, end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score feature-store rows with registered models")
+    parser.add_argument("--models", nargs="+", help="registered models (default: all)")
+    parser.add_argument("--start", default="2024-01-01")
+    parser.add_argument("--end", default=None)
+    parser.add_argument("--repeat", type=int, default=50, help="calls per model for the latency figures")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    models = args.models or registry.list_models(args.db)["model_name"].tolist()
+    if not models:
+        print("⚠️ No registered models (train them with: python -m core.training)")
+        return
+
+    predictor = Predictor(args.db)
+    print(f"{'model':<24}{'rows':>6}{'MAE':>8}{'p50 ms':>9}{'p99 ms':>9}{'rows/s':>12}")
+    for name in models:
+        rows = load_rows(name, args.start, args.end, predictor)
+        for _ in range(args.repeat):
+            predictions = predictor.predict(name, rows)
+        next_day = predictions[:, 0] if predictions.ndim == 2 else predictions
+        mae = float(np.mean(np.abs(next_day - rows["target_pun"].to_numpy())))
+        stats = predictor.stats(name)
+        print(f"{name:<24}{len(rows):>6}{mae:>8.2f}{stats['p50_ms']:>9.2f}{stats['p99_ms']:>9.2f}"
+              f"{stats['rows_per_s']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
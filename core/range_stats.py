@@ -0,0 +1,311 @@
+import argparse
+import io
+import os
+import threading
+import time
+from contextlib import closing
+import numpy as np
+import pandas as pd
+from core import data_access, perf, schema
+
+# === RANGE-STATISTICS INDEX ===
+# One index per (table, key, column) series, e.g. ("commodity_prices", "brent", "price").
+# Stored in the range_stats table: the series' days and values plus prefix count / sum / sum of
+# squares, so count, mean and std over any date range come from two prefix differences (O(1)).
+# Min and max come from segment trees built over the values when the index is loaded (O(log n)).
+# Ingestion scripts call refresh() after each upsert; only days from the first changed one on
+# are recomputed.
+SERIES_COLUMNS = {
+    "pun_prices": ["price"],
+    "commodity_prices": ["price"],
+    "load_forecast": ["load_mw"],
+    "weather_data": ["tavg", "tmin", "tmax", "prcp", "wspd"],
+}
+EPOCH = np.datetime64("1970-01-01", "D")
+
+
+def series_id(table, key, column):
+    return f"{table}:{key or ''}:{column}"
+
+
+def _day(value):
+    """Day number of a 'YYYY-MM-DD' string, date or Timestamp."""
+    return int((np.datetime64(pd.Timestamp(value).date(), "D") - EPOCH).astype("int64"))
+
+
+class SegmentTree:
+    """Iterative min or max tree over a fixed array; NaN values are ignored like pandas' min/max."""
+
+    def __init__(self, values, reduce):
+        self.reduce = reduce
+        self.size = 1 << max(0, int(np.ceil(np.log2(max(len(values), 1)))))
+        tree = np.full(2 * self.size, np.nan)
+        tree[self.size:self.size + len(values)] = values
+        lo = self.size
+        while lo > 1:  # each level is one vectorized pass over its parents
+            half = lo // 2
+            tree[half:lo] = reduce(tree[lo:2 * lo:2], tree[lo + 1:2 * lo:2])
+            lo = half
+        self.tree = tree
+
+    def query(self, left, right):
+        """Reduction over positions [left, right); NaN for an empty or all-NaN range."""
+        result = np.nan
+        left += self.size
+        right += self.size
+        tree, reduce = self.tree, self.reduce
+        while left < right:
+            if left & 1:
+                result = reduce(result, tree[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                result = reduce(result, tree[right])
+            left >>= 1
+            right >>= 1
+        return float(result)
+
+
+class SeriesIndex:
+    """
+    Prefix sums of one daily series.
+
+    Values are shifted by the series' first value before summing, so sums of squares stay on the
+    scale of the spread rather than the level and the std keeps its precision.
+    """
+
+    def __init__(self, days=None, values=None, shift=None):
+        self.days = np.zeros(0, dtype="int64")
+        self.values = np.zeros(0)
+        self.count = np.zeros(1, dtype="int64")
+        self.total = np.zeros(1)
+        self.total_sq = np.zeros(1)
+        self.shift = shift
+        self._trees = None
+        if days is not None:
+            self.extend(days, values)
+
+    def __len__(self):
+        return len(self.days)
+
+    @property
+    def last_day(self):
+        return int(self.days[-1]) if len(self.days) else None
+
+    def truncate(self, day):
+        """Drop every entry on or after `day`."""
+        keep = int(np.searchsorted(self.days, day, side="left"))
+        self.days, self.values = self.days[:keep], self.values[:keep]
+        self.count, self.total, self.total_sq = self.count[:keep + 1], self.total[:keep + 1], self.total_sq[:keep + 1]
+        self._trees = None
+
+    def extend(self, days, values):
+        """Append days (sorted, after last_day) and their values; prefix sums continue from the last entry."""
+        days = np.asarray(days, dtype="int64")
+        values = np.asarray(values, dtype="float64")
+        if not len(days):
+            return
+        if self.last_day is not None and days[0] <= self.last_day:
+            raise ValueError("extend() needs days after the last indexed day; truncate() first")
+        if self.shift is None:
+            present = values[~np.isnan(values)]
+            self.shift = float(present[0]) if len(present) else 0.0
+        valid = ~np.isnan(values)
+        centred = np.where(valid, values - self.shift, 0.0)
+        self.days = np.concatenate([self.days, days])
+        self.values = np.concatenate([self.values, values])
+        self.count = np.concatenate([self.count, self.count[-1] + np.cumsum(valid)])
+        self.total = np.concatenate([self.total, self.total[-1] + np.cumsum(centred)])
+        self.total_sq = np.concatenate([self.total_sq, self.total_sq[-1] + np.cumsum(centred * centred)])
+        self._trees = None
+
+    def trees(self):
+        if self._trees is None:
+            self._trees = (SegmentTree(self.values, np.fmin), SegmentTree(self.values, np.fmax))
+        return self._trees
+
+    def summary(self, start=None, end=None):
+        """count, mean, std (ddof=1), min, max of the values dated in [start, end]."""
+        left = 0 if start is None else int(np.searchsorted(self.days, _day(start), side="left"))
+        right = len(self.days) if end is None else int(np.searchsorted(self.days, _day(end), side="right"))
+        right = max(left, right)
+        n = int(self.count[right] - self.count[left])
+        if n == 0:
+            return {"count": 0, "mean": np.nan, "std": np.nan, "min": np.nan, "max": np.nan}
+        s = self.total[right] - self.total[left]
+        q = self.total_sq[right] - self.total_sq[left]
+        std = float(np.sqrt(max(q - s * s / n, 0.0) / (n - 1))) if n > 1 else np.nan
+        low, high = self.trees()
+        return {"count": n, "mean": float(self.shift + s / n), "std": std,
+                "min": low.query(left, right), "max": high.query(left, right)}
+
+    # --- persistence ---
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez(buffer, days=self.days, values=self.values, count=self.count, total=self.total,
+                 total_sq=self.total_sq, shift=np.array([np.nan if self.shift is None else self.shift]))
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, payload):
+        arrays = np.load(io.BytesIO(payload))
+        index = cls()
+        index.days, index.values = arrays["days"], arrays["values"]
+        index.count, index.total, index.total_sq = arrays["count"], arrays["total"], arrays["total_sq"]
+        shift = float(arrays["shift"][0])
+        index.shift = None if np.isnan(shift) else shift
+        return index
+
+
+# === BUILD / INCREMENTAL REFRESH (called by the ingestion scripts) ===
+def _read_index(conn, series):
+    row = conn.execute("SELECT payload, version FROM range_stats WHERE series = ?", (series,)).fetchone()
+    return (SeriesIndex.from_bytes(row[0]), row[1]) if row else (None, 0)
+
+
+@perf.timed("range_stats.refresh", rows=None)
+def refresh(conn, table, since=None, keys=None):
+    """
+    Bring the indexes of `table` up to date with its rows.
+
+    Args:
+        conn: connection the ingestion script just wrote with
+        table (str): dataset name (see SERIES_COLUMNS)
+        since (str): earliest day the caller inserted or updated; None if it only appended
+        keys (list): keys written (commodities, zones, cities); None for all
+
+    Returns:
+        int: rows read from the table
+    """
+    spec = data_access.DATASETS[table]
+    date_col, key_col, columns = spec["date"], spec["key"], SERIES_COLUMNS[table]
+    if key_col is None:
+        keys = [None]
+    elif keys is None:
+        keys = [row[0] for row in conn.execute(f"SELECT DISTINCT {key_col} FROM {table}")]
+
+    # first day to (re)compute per series: everything if never indexed, else the day after the
+    # last indexed one, moved back to `since` when the caller rewrote older days
+    plans = []
+    for key in keys:
+        for col in columns:
+            index, version = _read_index(conn, series_id(table, key, col))
+            if index is None or not len(index):
+                first = None
+            else:
+                first = index.last_day + 1 if since is None else min(index.last_day + 1, _day(since))
+            plans.append((key, col, index or SeriesIndex(), version, first))
+
+    firsts = [plan[4] for plan in plans]
+    start = None if None in firsts else str(EPOCH + min(firsts))
+    sql, params = data_access.build_query(table, key=None if key_col is None else list(keys), start=start,
+                                          columns=columns)
+    df = pd.read_sql(sql, conn, params=params)
+    days = (pd.to_datetime(df[date_col], format="ISO8601").to_numpy().astype("datetime64[D]") - EPOCH).astype("int64")
+    groups = {None: np.arange(len(df))} if key_col is None else df.groupby(key_col).indices
+
+    with conn:
+        for key, col, index, version, first in plans:
+            positions = groups.get(key, np.zeros(0, dtype="int64"))
+            if first is not None:
+                positions = positions[days[positions] >= first]
+                if not len(positions) and since is None:
+                    continue  # nothing appended
+                index.truncate(first)
+            index.extend(days[positions], df[col].to_numpy(dtype="float64")[positions])
+            last = str(EPOCH + index.last_day) if len(index) else None
+            conn.execute("""
+                INSERT INTO range_stats (series, table_name, series_key, column_name, rows, last_date, version, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(series) DO UPDATE SET rows = excluded.rows, last_date = excluded.last_date,
+                    version = excluded.version, payload = excluded.payload
+            """, (series_id(table, key, col), table, key, col, len(index), last, version + 1, index.to_bytes()))
+    return len(df)
+
+
+def rebuild(conn, tables=None):
+    """Drop and rebuild the indexes of `tables` (default: all) from scratch."""
+    total = 0
+    for table in tables or SERIES_COLUMNS:
+        with conn:
+            conn.execute("DELETE FROM range_stats WHERE table_name = ?", (table,))
+        total += refresh(conn, table)
+    return total
+
+
+# === QUERIES (dashboard) ===
+_cache = {}  # (db_path, series) -> (version, SeriesIndex)
+_cache_lock = threading.Lock()
+
+
+def _saved(table, column, key):
+    """True if refresh() keeps this series in range_stats (every single-key series of SERIES_COLUMNS)."""
+    return column in SERIES_COLUMNS.get(table, []) and (key is not None or data_access.DATASETS[table]["key"] is None)
+
+
+def load_index(table, column, key=None, db_path=schema.DB_PATH):
+    """
+    The series' index, kept in memory between calls and re-read only when its stored version
+    changes (one primary-key lookup). A series never indexed (e.g. right after the v5 migration)
+    is built and saved once, with every column of its key, so no later call or process reads
+    its rows again. Series refresh() does not keep (all keys together) are built in memory and
+    kept until the table's data version changes.
+    """
+    series = series_id(table, key, column)
+    cache_key = (os.path.abspath(db_path), series)
+    with closing(schema.connect(db_path)) as conn:
+        row = conn.execute("SELECT version FROM range_stats WHERE series = ?", (series,)).fetchone()
+        if row is None and _saved(table, column, key):
+            refresh(conn, table, keys=None if key is None else [key])
+            row = conn.execute("SELECT version FROM range_stats WHERE series = ?", (series,)).fetchone()
+        if row is not None:
+            version = row[0]
+        else:
+            data = conn.execute("SELECT version FROM data_versions WHERE dataset = ?", (table,)).fetchone()
+            version = ("data", data[0] if data else 0)
+        cached = _cache.get(cache_key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        if row is not None:
+            index, _ = _read_index(conn, series)
+        else:
+            df = data_access.load(table, key=key, columns=[column], db_path=db_path)
+            date_col = data_access.DATASETS[table]["date"]
+            days = (df[date_col].to_numpy().astype("datetime64[D]") - EPOCH).astype("int64")
+            index = SeriesIndex(days, df[column].to_numpy(dtype="float64"))
+    index.trees()  # build min/max trees once, outside the query path
+    with _cache_lock:
+        _cache[cache_key] = (version, index)
+    return index
+
+
+def summary(table, column, start=None, end=None, key=None, db_path=schema.DB_PATH):
+    """
+    count, mean, std, min and max of one series over [start, end] without reading its rows.
+
+    Args:
+        table (str): dataset (see SERIES_COLUMNS); column (str): value column
+        start, end (str): inclusive 'YYYY-MM-DD' bounds; None for open-ended
+        key (str): commodity, zone or city; None for pun_prices
+    """
+    return load_index(table, column, key, db_path).summary(start, end)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the range-statistics index")
+    parser.add_argument("--tables", nargs="+", choices=list(SERIES_COLUMNS), help="tables (default: all)")
+    parser.add_argument("--rebuild", action="store_true", help="drop and rebuild instead of refreshing")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    conn = schema.connect(args.db)
+    started = time.perf_counter()
+    for table in args.tables or SERIES_COLUMNS:
+        rows = rebuild(conn, [table]) if args.rebuild else refresh(conn, table)
+        print(f"✅ {table}: {rows} rows indexed")
+    print(f"⏱️ {time.perf_counter() - started:.2f}s")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
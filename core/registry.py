@@ -0,0 +1,161 @@
+import argparse
+import json
+import os
+from contextlib import closing
+from datetime import datetime
+import joblib
+import numpy as np
+import pandas as pd
+from core import schema
+
+# === MODEL REGISTRY ===
+# Every registration writes models/<model_name>/v<version>.joblib holding the fitted estimator,
+# the StandardScaler applied before it (None for tree models), the ordered feature list and the
+# number of horizons it forecasts (predict returns one column per horizon when more than one);
+# the metadata row goes to the model_registry table. The highest version is the live one.
+MODEL_DIR = os.path.join(schema.BASE_DIR, "models")
+COMPRESS = 3  # joblib zlib level: forests shrink ~5x, loading stays fast
+
+
+class HorizonModel:
+    """
+    One fitted estimator per horizon behind a single predict returning (rows, horizons).
+
+    Defined here rather than in core.training, which runs as __main__: artifacts must pickle
+    it under a module path every loader can import.
+    """
+
+    def __init__(self, estimators):
+        self.estimators_ = list(estimators)
+
+    def predict(self, X):
+        return np.column_stack([estimator.predict(X) for estimator in self.estimators_])
+
+
+def horizon_targets(dates, target, horizons):
+    """
+    (rows, horizons) array of the D+1 ... D+horizons targets, built in one vectorized lookup;
+    NaN where the row (h - 1) days later does not exist. `dates` must be sorted.
+    """
+    dates = np.asarray(dates)
+    target = np.asarray(target, dtype="float64")
+    wanted = dates[:, None] + np.arange(horizons) * np.timedelta64(1, "D")
+    positions = np.minimum(np.searchsorted(dates, wanted), len(dates) - 1)
+    return np.where(dates[positions] == wanted, target[positions], np.nan)
+
+
+def artifact_path(model_name, version, root=MODEL_DIR):
+    return os.path.join(root, model_name, f"v{version}.joblib")
+
+
+def _relative(path):
+    """Store paths relative to the repository, like model_results.image_path."""
+    path = os.path.abspath(path)
+    if path.startswith(schema.BASE_DIR + os.sep):
+        return os.path.relpath(path, schema.BASE_DIR).replace("\\", "/")
+    return path
+
+
+def _absolute(path):
+    return path if os.path.isabs(path) else os.path.join(schema.BASE_DIR, path)
+
+
+def register(conn, model_name, model, scaler, features, dataset=None, params=None, metrics=None, root=MODEL_DIR,
+             horizons=1):
+    """
+    Save a fitted model as the next version of `model_name` and record it in model_registry.
+
+    Args:
+        model: fitted estimator with a vectorized predict(X)
+        scaler: fitted StandardScaler applied to X before predict, or None
+        features (list): column names, in the order the model expects them
+        dataset (str): feature-store table the model was trained on
+        params (dict): chosen hyperparameters; metrics (dict): {"val": {...}, "test": {...}} (D+1)
+        horizons (int): forecast horizons D+1 ... D+horizons
+
+    Returns:
+        int: the new version
+    """
+    metrics = metrics or {}
+    conn.execute("BEGIN IMMEDIATE")  # versions are allocated under the write lock
+    try:
+        row = conn.execute("SELECT MAX(version) FROM model_registry WHERE model_name = ?", (model_name,)).fetchone()
+        version = (row[0] or 0) + 1
+        path = artifact_path(model_name, version, root)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        joblib.dump({"model_name": model_name, "version": version, "model": model, "scaler": scaler,
+                     "features": list(features), "dataset": dataset, "horizons": horizons}, path, compress=COMPRESS)
+        conn.execute("""
+            INSERT INTO model_registry (
+                model_name, version, path, dataset, features, params, val_mae, test_mae, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            model_name, version, _relative(path), dataset, json.dumps(list(features)),
+            json.dumps(params or {}, default=str),
+            metrics.get("val", {}).get("MAE"), metrics.get("test", {}).get("MAE"),
+            datetime.now().isoformat(timespec="seconds"),
+        ))
+        schema.bump_data_version(conn, "model_registry")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return version
+
+
+def list_models(db_path=schema.DB_PATH):
+    """Latest registered version of every model, one row each."""
+    with closing(schema.connect(db_path)) as conn:
+        return pd.read_sql("""
+            SELECT r.model_name, r.version, r.path, r.dataset, r.val_mae, r.test_mae, r.created_at
+            FROM model_registry AS r
+            JOIN (SELECT model_name, MAX(version) AS version FROM model_registry GROUP BY model_name) AS latest
+              USING (model_name, version)
+            ORDER BY r.model_name
+        """, conn)
+
+
+def describe(model_name, version=None, db_path=schema.DB_PATH):
+    """Metadata of one version (default: latest) as a dict, or None if the model is not registered."""
+    with closing(schema.connect(db_path)) as conn:
+        if version is None:
+            row = conn.execute("""
+                SELECT model_name, version, path, dataset, features, params, val_mae, test_mae, created_at
+                FROM model_registry WHERE model_name = ? ORDER BY version DESC LIMIT 1
+            """, (model_name,)).fetchone()
+        else:
+            row = conn.execute("""
+                SELECT model_name, version, path, dataset, features, params, val_mae, test_mae, created_at
+                FROM model_registry WHERE model_name = ? AND version = ?
+            """, (model_name, version)).fetchone()
+    if row is None:
+        return None
+    keys = ["model_name", "version", "path", "dataset", "features", "params", "val_mae", "test_mae", "created_at"]
+    entry = dict(zip(keys, row))
+    entry["features"] = json.loads(entry["features"])
+    entry["params"] = json.loads(entry["params"])
+    return entry
+
+
+def load(model_name, version=None, db_path=schema.DB_PATH):
+    """The stored artifact dict (model, scaler, features, dataset, version, horizons; older artifacts lack the last)."""
+    entry = describe(model_name, version, db_path)
+    if entry is None:
+        raise KeyError(f"Model not registered: {model_name}" + (f" v{version}" if version else ""))
+    return joblib.load(_absolute(entry["path"]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List the models in the registry")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    models = list_models(args.db)
+    if models.empty:
+        print("⚠️ No registered models (train them with: python -m core.training)")
+        return
+    print(models.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
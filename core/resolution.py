@@ -0,0 +1,98 @@
+import pandas as pd
+
+# === TIME RESOLUTIONS ===
+# Every source is stored at its native resolution as ISO text: 'YYYY-MM-DD' for daily rows,
+# 'YYYY-MM-DD HH:MM:SS' for hourly and 15-minute rows. Both forms sort and range-compare as
+# text, so the (key, date) primary keys serve either. Reads aggregate on the fly, inside SQLite,
+# to any coarser bucket (core.data_access).
+FREQUENCIES = ["15min", "h", "D", "W", "MS"]  # finest to coarsest (pandas aliases)
+LABELS = {"15min": "15 minutes", "h": "Hourly", "D": "Daily", "W": "Weekly", "MS": "Monthly"}
+PERIODS_PER_DAY = {"15min": 96, "h": 24, "D": 1}
+DAY_FORMAT = "%Y-%m-%d"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def periods_per_day(freq):
+    if freq not in PERIODS_PER_DAY:
+        raise ValueError(f"Unsupported resolution for row-level data: {freq}")
+    return PERIODS_PER_DAY[freq]
+
+
+def period_hours(freq):
+    """Hours covered by one row of a daily or sub-daily series."""
+    return 24 / periods_per_day(freq)
+
+
+def is_sub_daily(freq):
+    return freq in ("15min", "h")
+
+
+def coarser(freq):
+    """`freq` and every coarser bucket, finest first."""
+    return FREQUENCIES[FREQUENCIES.index(freq):]
+
+
+def bucket_sql(column, freq):
+    """SQL expression mapping a stored timestamp (either text form) to the start of its `freq` bucket."""
+    time_of = f"CASE WHEN length({column}) = 10 THEN {column} || ' 00:00:00' ELSE {column} END"
+    buckets = {  # substr on the stored text is cheaper than SQLite's date functions where it suffices
+        "15min": f"substr({time_of}, 1, 14) || printf('%02d:00', CAST(substr({time_of}, 15, 2) AS INTEGER) / 15 * 15)",
+        "h": f"substr({time_of}, 1, 13) || ':00:00'",
+        "D": f"substr({column}, 1, 10)",
+        "W": f"date({column}, '-6 days', 'weekday 1')",  # Monday on or before
+        "MS": f"substr({column}, 1, 7) || '-01'",
+    }
+    if freq not in buckets:
+        raise ValueError(f"Unknown resolution: {freq}")
+    return buckets[freq]
+
+
+def format_timestamps(values, freq=None):
+    """
+    Storage text of timestamps: dates for daily data, date and time otherwise.
+
+    Args:
+        values: anything pd.to_datetime accepts (Series, Index, list of strings)
+        freq (str): resolution of the values; None to use dates when every value is at midnight
+    """
+    stamps = pd.to_datetime(pd.Series(values), format="ISO8601")
+    if freq is None:
+        freq = "D" if (stamps == stamps.dt.normalize()).all() else "h"
+    return stamps.dt.strftime(TIME_FORMAT if is_sub_daily(freq) else DAY_FORMAT)
+
+
+def infer_freq(stamps):
+    """Resolution of stored timestamp strings (sorted): 'D', 'h' or '15min'."""
+    stamps = [s for s in stamps if s]
+    if not stamps or all(len(s) == 10 for s in stamps):
+        return "D"
+    times = pd.to_datetime(pd.Series(stamps), format="ISO8601").sort_values()
+    steps = times.diff().dropna()
+    steps = steps[steps > pd.Timedelta(0)]
+    return "15min" if len(steps) and steps.min() <= pd.Timedelta(minutes=15) else "h"
+
+
+def native_freq(conn, table, date_col, key_col=None, key=None, sample=8):
+    """Resolution of the most recent rows of one series (older history may be coarser)."""
+    where, params = ("", []) if key_col is None or key is None else (f" WHERE {key_col} = ?", [key])
+    rows = conn.execute(f"SELECT {date_col} FROM {table}{where} ORDER BY {date_col} DESC LIMIT {int(sample)}",
+                        params)
+    return infer_freq([row[0] for row in rows][::-1])
+
+
+def drop_daily_rows(conn, table, date_col, rows, key_col=None):
+    """
+    Delete date-only rows of the days that `rows` now cover at sub-daily resolution, so a day
+    is never stored twice when a source is re-ingested at its native resolution.
+
+    Args:
+        rows (iterable): (key, timestamp) pairs, or timestamps when the table has no key column
+    """
+    if key_col is None:
+        days = {(stamp[:10],) for stamp in rows if len(stamp) > 10}
+        sql = f"DELETE FROM {table} WHERE {date_col} = ?"
+    else:
+        days = {(key, stamp[:10]) for key, stamp in rows if len(stamp) > 10}
+        sql = f"DELETE FROM {table} WHERE {key_col} = ? AND {date_col} = ?"
+    conn.executemany(sql, sorted(days))
+    return len(days)
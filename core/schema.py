@@ -0,0 +1,338 @@
+import os
+import sqlite3
+
+# === DATABASE PATH ===
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.path.join(BASE_DIR, "db", "data.db")  # unified DB
+
+# === CONNECTION PRAGMAS ===
+PRAGMAS = {
+    "journal_mode": "WAL",  # readers (dashboard) never block the ingestion writer
+    "synchronous": "NORMAL",  # safe with WAL, avoids an fsync per commit
+    "temp_store": "MEMORY",
+    "cache_size": -65536,  # 64 MiB page cache
+    "mmap_size": 268435456,  # 256 MiB memory-mapped reads
+    "foreign_keys": "ON",
+}
+BUSY_TIMEOUT = 30  # seconds to wait on a locked database
+
+# === TABLE DEFINITIONS ===
+# `{name}` lets a migration build the new layout next to the old table before swapping them.
+TABLES = {
+    "pun_prices": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            date TEXT,
+            fold INTEGER NOT NULL DEFAULT 0,
+            price REAL,
+            PRIMARY KEY (date, fold)
+        ) WITHOUT ROWID
+    """,
+    "load_forecast": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            zone TEXT,
+            date TEXT,
+            load_mw REAL,
+            PRIMARY KEY (zone, date)
+        ) WITHOUT ROWID
+    """,
+    "weather_data": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            city TEXT,
+            time TEXT,
+            tavg REAL,
+            tmin REAL,
+            tmax REAL,
+            prcp REAL,
+            snow REAL,
+            wdir REAL,
+            wspd REAL,
+            wpgt REAL,
+            pres REAL,
+            tsun REAL,
+            PRIMARY KEY (city, time)
+        ) WITHOUT ROWID
+    """,
+    "commodity_prices": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            commodity TEXT,
+            date TEXT,
+            price REAL,
+            unit TEXT,
+            UNIQUE(commodity, date)
+        )
+    """,
+    "model_results": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            model_name TEXT,
+            horizon INTEGER NOT NULL DEFAULT 1,
+            val_mae REAL,
+            val_rmse REAL,
+            val_r2 REAL,
+            test_mae REAL,
+            test_rmse REAL,
+            test_r2 REAL,
+            image_path TEXT,
+            wall_seconds REAL,
+            cpu_seconds REAL,
+            threads INTEGER,
+            trained_at TEXT,
+            PRIMARY KEY (model_name, horizon)
+        )
+    """,
+    "backtest_forecasts": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            model_name TEXT,
+            date TEXT,
+            forecast REAL,
+            actual REAL,
+            refit INTEGER,
+            PRIMARY KEY (model_name, date)
+        ) WITHOUT ROWID
+    """,
+    "model_registry": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            model_name TEXT,
+            version INTEGER,
+            path TEXT,
+            dataset TEXT,
+            features TEXT,
+            params TEXT,
+            val_mae REAL,
+            test_mae REAL,
+            created_at TEXT,
+            PRIMARY KEY (model_name, version)
+        ) WITHOUT ROWID
+    """,
+    "range_stats": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            series TEXT PRIMARY KEY,
+            table_name TEXT,
+            series_key TEXT,
+            column_name TEXT,
+            rows INTEGER,
+            last_date TEXT,
+            version INTEGER,
+            payload BLOB
+        )
+    """,
+    "data_versions": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            dataset TEXT PRIMARY KEY,
+            version INTEGER NOT NULL,
+            updated_at TEXT
+        )
+    """,
+    "source_files": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            dataset TEXT,
+            path TEXT,
+            size INTEGER,
+            sha256 TEXT,
+            rows INTEGER,
+            ingested_at TEXT,
+            PRIMARY KEY (dataset, path)
+        ) WITHOUT ROWID
+    """,
+    "perf_events": """
+        CREATE TABLE IF NOT EXISTS {name} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            run TEXT,
+            stage TEXT,
+            parent TEXT,
+            started_at TEXT,
+            wall_seconds REAL,
+            cpu_seconds REAL,
+            rows INTEGER,
+            peak_mb REAL,
+            max_rss_mb REAL,
+            detail TEXT
+        )
+    """,
+}
+
+# Columns added to model_results after its first release: (name, type)
+MODEL_RESULT_RUN_COLUMNS = [
+    ("wall_seconds", "REAL"),
+    ("cpu_seconds", "REAL"),
+    ("threads", "INTEGER"),
+    ("trained_at", "TEXT"),
+]
+
+# Tables whose primary key is the clustered (zone/city, date) order and therefore already covering.
+CLUSTERED_TABLES = ["pun_prices", "load_forecast", "weather_data"]
+
+INDEXES = [
+    # commodity_prices keeps its rowid layout; this index answers (commodity, date) range scans alone
+    "CREATE INDEX IF NOT EXISTS idx_commodity_prices_commodity_date "
+    "ON commodity_prices (commodity, date, price, unit)",
+    # date-first lookups across all zones (e.g. the notebook's daily pivot)
+    "CREATE INDEX IF NOT EXISTS idx_load_forecast_date ON load_forecast (date, zone, load_mw)",
+]
+PERF_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_perf_events_stage ON perf_events (stage, started_at)",
+    "CREATE INDEX IF NOT EXISTS idx_perf_events_started ON perf_events (started_at)",
+]
+
+
+# === MIGRATIONS ===
+def _table_sql(conn, table):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row[0] if row else None
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def rebuild_table(conn, table):
+    """Copy `table` into its current definition from TABLES, keeping the last row seen for each key."""
+    new = f"{table}__new"
+    conn.execute(TABLES[table].format(name=new))
+    shared = [col for col in _columns(conn, new) if col in _columns(conn, table)]
+    cols = ", ".join(shared)
+    conn.execute(f"INSERT OR REPLACE INTO {new} ({cols}) SELECT {cols} FROM {table} ORDER BY rowid")
+    conn.execute(f"DROP TABLE {table}")
+    conn.execute(f"ALTER TABLE {new} RENAME TO {table}")
+
+
+def _v1_keys_and_indexes(conn):
+    """Primary keys and clustered layout for tables written by to_sql(replace), plus covering indexes."""
+    for table in CLUSTERED_TABLES:
+        sql = _table_sql(conn, table)
+        if sql is not None and "WITHOUT ROWID" not in sql.upper():
+            rebuild_table(conn, table)
+    for table, ddl in TABLES.items():
+        conn.execute(ddl.format(name=table))
+    for ddl in INDEXES:
+        conn.execute(ddl)
+
+
+def _v2_training_run_columns(conn):
+    """Per-model wall time, CPU time and thread budget recorded by core.training."""
+    conn.execute(TABLES["model_results"].format(name="model_results"))
+    existing = _columns(conn, "model_results")
+    for column, kind in MODEL_RESULT_RUN_COLUMNS:
+        if column not in existing:
+            conn.execute(f"ALTER TABLE model_results ADD COLUMN {column} {kind}")
+
+
+def _v3_backtest_forecasts(conn):
+    """Next-day forecasts recorded at every origin of a walk-forward backtest (core.backtest)."""
+    conn.execute(TABLES["backtest_forecasts"].format(name="backtest_forecasts"))
+
+
+def _v4_model_registry(conn):
+    """Versioned model artifacts written by core.registry."""
+    conn.execute(TABLES["model_registry"].format(name="model_registry"))
+
+
+def _v5_range_stats(conn):
+    """Per-series prefix sums used for O(1) date-range summaries (core.range_stats)."""
+    conn.execute(TABLES["range_stats"].format(name="range_stats"))
+
+
+def _v6_data_versions(conn):
+    """Per-dataset change counters bumped by every writer; the dashboard cache invalidates on them."""
+    conn.execute(TABLES["data_versions"].format(name="data_versions"))
+
+
+def _v7_source_files(conn):
+    """Fingerprints of ingested source files, so unchanged exports are skipped (core.source_files)."""
+    conn.execute(TABLES["source_files"].format(name="source_files"))
+
+
+def _v8_perf_events(conn):
+    """Stage timings recorded by core.perf when PERF_EVENTS is set."""
+    conn.execute(TABLES["perf_events"].format(name="perf_events"))
+    for ddl in PERF_INDEXES:
+        conn.execute(ddl)
+
+
+def _v9_model_result_horizons(conn):
+    """One model_results row per forecast horizon (D+1 ... D+7); existing rows are D+1 (core.training)."""
+    if "horizon" not in _columns(conn, "model_results"):
+        rebuild_table(conn, "model_results")
+
+
+def _v10_pun_folds(conn):
+    """
+    Local wall time plus fold (as datetime.fold: 1 on the second pass through the hour repeated
+    when summer time ends) as the pun_prices key, so the 25-hour day keeps every hour (scripts/pun.py).
+    """
+    if "fold" not in _columns(conn, "pun_prices"):
+        rebuild_table(conn, "pun_prices")
+
+
+MIGRATIONS = [
+    (1, _v1_keys_and_indexes),
+    (2, _v2_training_run_columns),
+    (3, _v3_backtest_forecasts),
+    (4, _v4_model_registry),
+    (5, _v5_range_stats),
+    (6, _v6_data_versions),
+    (7, _v7_source_files),
+    (8, _v8_perf_events),
+    (9, _v9_model_result_horizons),
+    (10, _v10_pun_folds),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every pending migration, each in its own transaction. Returns the resulting version."""
+    for version, step in MIGRATIONS:
+        if get_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if get_version(conn) < version:  # another process may have migrated while we waited
+                step(conn)
+                conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+    return get_version(conn)
+
+
+def bump_data_version(conn, dataset):
+    """
+    Record that `dataset` changed. Call it inside the writer's own transaction so readers never
+    see the new version without the new rows.
+    """
+    conn.execute("""
+        INSERT INTO data_versions (dataset, version, updated_at) VALUES (?, 1, datetime('now'))
+        ON CONFLICT(dataset) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+    """, (dataset,))
+
+
+def apply_pragmas(conn):
+    for pragma, value in PRAGMAS.items():
+        conn.execute(f"PRAGMA {pragma} = {value}")
+
+
+_migrated = set()
+
+
+def connect(db_path=DB_PATH, upgrade=True, check_same_thread=True):
+    """
+    Open the SQLite database with the project pragmas, upgrading its schema on first use in this process.
+
+    Args:
+        db_path (str): Path of the SQLite file (default: db/data.db)
+        upgrade (bool): Run pending migrations if the schema is older than SCHEMA_VERSION
+        check_same_thread (bool): False for a connection shared between threads behind a lock
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=BUSY_TIMEOUT, check_same_thread=check_same_thread)
+    apply_pragmas(conn)
+    key = os.path.abspath(db_path)
+    if upgrade and key not in _migrated:
+        migrate(conn)
+        _migrated.add(key)
+    return conn
@@ -0,0 +1,276 @@
+import argparse
+import inspect
+import json
+import math
+import os
+import time
+import numpy as np
+from core import feature_store, training
+
+# === SEARCH CONFIGURATION ===
+# Boosting rounds are the resource being raced: each family's rounds parameter is taken out of
+# its notebook grid, and its largest value is the most any configuration is ever trained for.
+ROUNDS_PARAM = {"XGBRegressor": "n_estimators", "LGBMRegressor": "n_estimators", "CatBoostRegressor": "iterations"}
+BOOSTERS = list(ROUNDS_PARAM)
+METHODS = ["halving", "hyperband"]
+MIN_ROUNDS = 50
+ETA = 3  # keep the best 1/ETA of a rung, give survivors ETA times more rounds
+EARLY_STOPPING_ROUNDS = 30
+LOG_DIR = os.path.join(feature_store.BASE_DIR, "data", "search")
+
+
+# === BUDGET ===
+class Budget:
+    """Wall-clock and/or process CPU-seconds allowance; either limit may be None."""
+
+    def __init__(self, seconds=None, cpu_seconds=None):
+        self.seconds = seconds
+        self.cpu_seconds = cpu_seconds
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def spent(self):
+        return time.perf_counter() - self.wall_start, time.process_time() - self.cpu_start
+
+    def exhausted(self):
+        wall, cpu = self.spent()
+        return ((self.seconds is not None and wall >= self.seconds)
+                or (self.cpu_seconds is not None and cpu >= self.cpu_seconds))
+
+
+# === ONE TRIAL: NATIVE EARLY STOPPING ON THE VALIDATION YEAR ===
+def fit_booster(family, params, rounds, X_train, y_train, X_val, y_val, threads=1):
+    """
+    Train one configuration for at most `rounds` rounds, stopping when validation MAE has not
+    improved for EARLY_STOPPING_ROUNDS rounds; the model keeps its best iteration.
+
+    Returns:
+        tuple: (fitted model, best validation MAE, best iteration)
+    """
+    if family == "XGBRegressor":
+        from xgboost import XGBRegressor
+
+        model = XGBRegressor(objective="reg:squarederror", random_state=training.RANDOM_STATE, n_estimators=rounds,
+                             early_stopping_rounds=EARLY_STOPPING_ROUNDS, eval_metric="mae", verbosity=0,
+                             n_jobs=threads, **params)
+        model.fit(X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+        return model, float(model.best_score), int(model.best_iteration) + 1
+
+    if family == "LGBMRegressor":
+        from lightgbm import LGBMRegressor, early_stopping
+
+        model = LGBMRegressor(random_state=training.RANDOM_STATE, n_estimators=rounds, n_jobs=threads, verbose=-1,
+                              **params)
+        # lightgbm >= 4.7 takes eval_X / eval_y and deprecates eval_set
+        if "eval_X" in inspect.signature(LGBMRegressor.fit).parameters:
+            evaluation = {"eval_X": (X_val,), "eval_y": (y_val,)}
+        else:
+            evaluation = {"eval_set": [(X_val, y_val)]}
+        model.fit(X_train, y_train, eval_metric="l1", **evaluation,
+                  callbacks=[early_stopping(EARLY_STOPPING_ROUNDS, first_metric_only=True, verbose=False)])
+        return model, float(model.best_score_["valid_0"]["l1"]), int(model.best_iteration_ or rounds)
+
+    if family == "CatBoostRegressor":
+        from catboost import CatBoostRegressor
+
+        model = CatBoostRegressor(loss_function="RMSE", eval_metric="MAE", random_state=training.RANDOM_STATE,
+                                  iterations=rounds, od_type="Iter", od_wait=EARLY_STOPPING_ROUNDS,
+                                  use_best_model=True, verbose=0, thread_count=threads,
+                                  allow_writing_files=False, **params)
+        model.fit(X_train, y_train, eval_set=(X_val, y_val))
+        return model, float(model.get_best_score()["validation"]["MAE"]), int(model.get_best_iteration()) + 1
+
+    raise ValueError(f"Unknown booster: {family} (expected one of {BOOSTERS})")
+
+
+# === RACING ===
+def sample_configs(family, n, seed):
+    from sklearn.model_selection import ParameterSampler
+
+    grid = {k: v for k, v in training.PARAM_GRIDS[family].items() if k != ROUNDS_PARAM[family]}
+    return list(ParameterSampler(grid, n_iter=n, random_state=seed))
+
+
+def max_rounds(family):
+    return max(training.PARAM_GRIDS[family][ROUNDS_PARAM[family]])
+
+
+class Race:
+    """
+    Shared state of one search: budget, trajectory log and the best trial so far.
+
+    Trials that early-stopped before their round cap are final (more rounds would pick the same
+    iteration), so they are carried to the next rung instead of being retrained.
+    """
+
+    def __init__(self, family, data, budget, threads=1, log_path=None):
+        self.family, self.data, self.budget, self.threads = family, data, budget, threads
+        self.log = open(log_path, "w", encoding="utf-8") if log_path else None
+        self.trajectory = []
+        self.best = None  # (val MAE, trial record, model)
+        self.trials = 0
+
+    def trial(self, config_id, params, rounds, bracket, rung, previous=None):
+        if previous is not None and previous["converged"]:
+            return previous
+        if self.budget.exhausted():
+            return None
+        X_train, y_train, X_val, y_val = self.data
+        model, mae, best_iteration = fit_booster(self.family, params, rounds, X_train, y_train, X_val, y_val,
+                                                 self.threads)
+        self.trials += 1
+        wall, cpu = self.budget.spent()
+        record = {
+            "trial": self.trials, "bracket": bracket, "rung": rung, "config": config_id, "rounds": rounds,
+            "best_iteration": best_iteration, "val_mae": mae, "params": params,
+            "converged": best_iteration + EARLY_STOPPING_ROUNDS <= rounds,
+            "wall_seconds": round(wall, 3), "cpu_seconds": round(cpu, 3),
+        }
+        if self.best is None or mae < self.best[0]:
+            self.best = (mae, record, model)
+        record["best_val_mae"] = self.best[0]
+        self.trajectory.append(record)
+        if self.log is not None:
+            self.log.write(json.dumps(record) + "\n")
+            self.log.flush()
+        return record
+
+    def close(self):
+        if self.log is not None:
+            self.log.close()
+
+
+def successive_halving(race, configs, min_rounds, max_rounds, eta=ETA, bracket=0, first_id=0):
+    """
+    Race `configs`: train all for min_rounds, keep the best 1/eta, multiply rounds by eta, until
+    one configuration is left, max_rounds is reached or the budget runs out.
+    """
+    survivors = [(first_id + i, params, None) for i, params in enumerate(configs)]
+    rounds, rung = min_rounds, 0
+    while survivors:
+        scored = []
+        for config_id, params, previous in survivors:
+            record = race.trial(config_id, params, rounds, bracket, rung, previous)
+            if record is None:  # budget spent
+                return
+            scored.append((record["val_mae"], config_id, params, record))
+        if rounds >= max_rounds or len(scored) == 1:
+            return
+        scored.sort(key=lambda item: item[0])
+        survivors = [(config_id, params, record) for _, config_id, params, record in scored[:max(1, len(scored) // eta)]]
+        rounds, rung = min(max_rounds, rounds * eta), rung + 1
+
+
+def hyperband(race, family, min_rounds, max_rounds, eta=ETA, seed=training.RANDOM_STATE):
+    """Successive halving over brackets from many-configs/few-rounds to few-configs/all-rounds."""
+    s_max = int(math.floor(math.log(max_rounds / min_rounds, eta) + 1e-9))
+    first_id = 0
+    for s in range(s_max, -1, -1):
+        n = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        rounds = max(min_rounds, int(round(max_rounds * eta ** -s)))
+        configs = sample_configs(family, n, seed + s)
+        successive_halving(race, configs, rounds, max_rounds, eta, bracket=s_max - s, first_id=first_id)
+        first_id += n
+        if race.budget.exhausted():
+            return
+
+
+def run(family, X_train, y_train, X_val, y_val, threads=1, method="halving", n_configs=30,
+        min_rounds=MIN_ROUNDS, eta=ETA, seconds=None, cpu_seconds=None, log_path=None):
+    """
+    Budgeted search for one booster family on the fixed Train / Validation (2023) split.
+
+    Args:
+        method (str): 'halving' races n_configs sampled from the notebook grid; 'hyperband'
+            runs brackets of successive halving with different starting rounds
+        seconds (float): wall-clock budget; cpu_seconds: process CPU budget (None: unlimited)
+        log_path (str): JSONL file receiving one record per trial
+
+    Returns:
+        tuple: (best model, its params incl. the rounds used, trajectory records)
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown search method: {method} (expected one of {METHODS})")
+    race = Race(family, (X_train, y_train, X_val, y_val), Budget(seconds, cpu_seconds), threads, log_path)
+    try:
+        top = max_rounds(family)
+        if method == "halving":
+            successive_halving(race, sample_configs(family, n_configs, training.RANDOM_STATE), min_rounds, top, eta)
+        else:
+            hyperband(race, family, min_rounds, top, eta)
+    finally:
+        race.close()
+    if race.best is None:
+        raise RuntimeError(f"Search budget for {family} ran out before the first trial finished")
+    _, record, model = race.best
+    params = {**record["params"], ROUNDS_PARAM[family]: record["best_iteration"]}
+    return model, params, race.trajectory
+
+
+def log_path_for(family, method, folder=LOG_DIR):
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f"{family}.{method}.jsonl")
+
+
+def best_params(family, method="halving", folder=LOG_DIR):
+    """Params (incl. rounds) of the best trial in the latest logged search, or None if there is no log."""
+    path = os.path.join(folder, f"{family}.{method}.jsonl")
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    if not records:
+        return None
+    best = min(records, key=lambda record: record["val_mae"])
+    return {**best["params"], ROUNDS_PARAM[family]: best["best_iteration"]}
+
+
+def load_split(family, root=feature_store.FEATURE_DIR):
+    """{'train' | 'val' | 'test': (X, y)} for a family's feature table, split by year like the notebook."""
+    df = feature_store.read_dataset(training.MODELS[family]["dataset"], root=root)
+    years = df["date"].dt.year
+    X = df.drop(columns=["date", training.TARGET]).to_numpy(dtype="float64")
+    y = df[training.TARGET].to_numpy(dtype="float64")
+    masks = {
+        "train": years <= training.TRAIN_LAST_YEAR,
+        "val": years == training.VAL_YEAR,
+        "test": years == training.TEST_YEAR,
+    }
+    return {split: (X[mask.to_numpy()], y[mask.to_numpy()]) for split, mask in masks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Budgeted successive-halving / Hyperband search for the boosters")
+    parser.add_argument("--models", nargs="+", choices=BOOSTERS, default=BOOSTERS)
+    parser.add_argument("--method", choices=METHODS, default="halving")
+    parser.add_argument("--configs", type=int, default=30, help="configurations raced by successive halving")
+    parser.add_argument("--min-rounds", type=int, default=MIN_ROUNDS)
+    parser.add_argument("--eta", type=int, default=ETA)
+    parser.add_argument("--budget-seconds", type=float, help="wall-clock budget per model")
+    parser.add_argument("--budget-cpu", type=float, help="CPU-seconds budget per model")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1, help="booster threads")
+    args = parser.parse_args()
+
+    for family in args.models:
+        split = load_split(family)
+        (X_train, y_train), (X_val, y_val), (X_test, y_test) = split["train"], split["val"], split["test"]
+        started = time.perf_counter()
+        log_path = log_path_for(family, args.method)
+        model, params, trajectory = run(
+            family, X_train, y_train, X_val, y_val, threads=args.threads, method=args.method,
+            n_configs=args.configs, min_rounds=args.min_rounds, eta=args.eta,
+            seconds=args.budget_seconds, cpu_seconds=args.budget_cpu, log_path=log_path,
+        )
+        seconds = time.perf_counter() - started
+        val_mae = float(np.mean(np.abs(model.predict(X_val) - y_val)))
+        test_mae = float(np.mean(np.abs(model.predict(X_test) - y_test)))
+        rounds = sum(record["rounds"] for record in trajectory)
+        print(f"✅ {family}: {len(trajectory)} trials, {rounds} rounds trained in {seconds:.1f}s, "
+              f"val MAE {val_mae:.2f}, test MAE {test_mae:.2f}")
+        print(f"   best params: {params}")
+        print(f"   trajectory: {log_path}")
+    print("🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
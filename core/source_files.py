@@ -0,0 +1,85 @@
+import hashlib
+import os
+
+# === SOURCE-FILE FINGERPRINTS ===
+# Ingestion scripts record the size and SHA-256 of every file they load (source_files table).
+# On the next run an identical file is skipped without parsing it, and a file that only grew
+# (same bytes up to the recorded size, as with exports that append new days) is parsed from the
+# recorded size on. Any other change means a full parse.
+BLOCK_BYTES = 1 << 20
+
+
+def fingerprint(path, prefix=None):
+    """
+    SHA-256 of a file, read once.
+
+    Args:
+        prefix (int): also return the digest of the first `prefix` bytes
+
+    Returns:
+        (size, digest, prefix_digest); prefix_digest is None without `prefix` or when the file is shorter
+    """
+    full = hashlib.sha256()
+    head = None
+    size = 0
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(BLOCK_BYTES)
+            if not block:
+                break
+            if prefix is not None and head is None and size + len(block) >= prefix:
+                cut = prefix - size
+                full.update(block[:cut])
+                head = full.hexdigest()
+                full.update(block[cut:])
+            else:
+                full.update(block)
+            size += len(block)
+    return size, full.hexdigest(), head
+
+
+def get(conn, dataset, path):
+    """(size, sha256) recorded for `path`, or None if it was never ingested."""
+    row = conn.execute("SELECT size, sha256 FROM source_files WHERE dataset = ? AND path = ?",
+                       (dataset, os.path.abspath(path))).fetchone()
+    return tuple(row) if row else None
+
+
+def record(conn, dataset, path, size, digest, rows):
+    """Remember the fingerprint of `path` and the rows parsed from it (call after they are committed)."""
+    with conn:
+        conn.execute("""
+            INSERT INTO source_files (dataset, path, size, sha256, rows, ingested_at)
+            VALUES (?, ?, ?, ?, ?, datetime('now'))
+            ON CONFLICT(dataset, path) DO UPDATE SET
+                size = excluded.size, sha256 = excluded.sha256, rows = excluded.rows,
+                ingested_at = excluded.ingested_at
+        """, (dataset, os.path.abspath(path), size, digest, rows))
+
+
+def plan(conn, dataset, path, force=False):
+    """
+    What to parse of `path`.
+
+    Returns:
+        (offset, size, digest): offset None when the file is unchanged, 0 for a full parse, else
+        the byte offset new lines start at
+    """
+    seen = None if force else get(conn, dataset, path)
+    size, digest, head = fingerprint(path, None if seen is None else seen[0])
+    if seen is None:
+        return 0, size, digest
+    if (size, digest) == seen:
+        return None, size, digest
+    if size > seen[0] and head == seen[1] and _ends_line(path, seen[0]):
+        return seen[0], size, digest
+    return 0, size, digest
+
+
+def _ends_line(path, offset):
+    """True when byte `offset` starts a line (the previous run did not stop mid-row)."""
+    if offset == 0:
+        return False
+    with open(path, "rb") as handle:
+        handle.seek(offset - 1)
+        return handle.read(1) == b"\n"
@@ -0,0 +1,534 @@
+import argparse
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+import numpy as np
+from core import feature_store, perf, registry, schema
+
+# === TRAINING CONFIGURATION (mirrors notebooks/pun_prediction.ipynb) ===
+TARGET = "target_pun"
+TRAIN_LAST_YEAR = 2022  # Train (<=2022), Validation (2023), Test (2024)
+VAL_YEAR = 2023
+TEST_YEAR = 2024
+RANDOM_STATE = 42
+MAX_HORIZON = 7  # D+1 ... D+7
+IMAGE_DIR = os.path.join(schema.BASE_DIR, "images")
+
+# Thread-count variables read by BLAS/OpenMP runtimes when they first load in a worker
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"]
+
+
+# === MODEL FAMILIES ===
+# Random-search spaces from the notebook, shared with core.search
+PARAM_GRIDS = {
+    "SVR": {
+        "C": [0.1, 1, 10, 100, 500],
+        "epsilon": [0.01, 0.05, 0.1, 0.5, 1],
+        "gamma": ["scale", "auto", 0.01, 0.1, 1]
+    },
+    "XGBRegressor": {
+        "n_estimators": [300, 500, 800, 1000],
+        "learning_rate": [0.01, 0.03, 0.05, 0.1],
+        "max_depth": [3, 4, 5, 6, 8],
+        "subsample": [0.6, 0.8, 1.0],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+        "gamma": [0, 1, 5],
+        "min_child_weight": [1, 3, 5]
+    },
+    "LGBMRegressor": {
+        "n_estimators": [300, 500, 800, 1000],
+        "learning_rate": [0.01, 0.03, 0.05, 0.1],
+        "max_depth": [4, 6, 8, 10],
+        "min_child_samples": [10, 20, 30],
+        "subsample": [0.6, 0.8, 1.0],
+        "colsample_bytree": [0.6, 0.8, 1.0],
+        "reg_alpha": [0, 0.1, 0.5],
+        "reg_lambda": [0, 0.1, 0.5]
+    },
+    "CatBoostRegressor": {
+        "iterations": [300, 500, 800],
+        "learning_rate": [0.01, 0.03, 0.05],
+        "depth": [4, 6, 8],
+        "l2_leaf_reg": [1, 3, 5, 7],
+        "bagging_temperature": [0, 0.5, 1, 2],
+        "random_strength": [0.5, 1, 2],
+        "border_count": [32, 64, 128]
+    },
+}
+
+# Each fit function takes the split arrays, the thread budget of its worker and the run options
+# (n_iter, search, budget_seconds, budget_cpu, log_dir) and returns (fitted model, chosen
+# hyperparameters). Inner parallelism (search candidates, trees, folds) never exceeds `threads`,
+# so outer workers × threads stays within the core budget.
+def _search(estimator, model_name, n_iter, cv, threads, X, y, **fit_params):
+    from sklearn.model_selection import RandomizedSearchCV
+
+    search = RandomizedSearchCV(
+        estimator=estimator,
+        param_distributions=PARAM_GRIDS[model_name],
+        n_iter=n_iter,
+        scoring="neg_mean_absolute_error",
+        cv=cv,
+        random_state=RANDOM_STATE,
+        n_jobs=threads,
+    )
+    search.fit(X, y, **fit_params)
+    return search.best_estimator_, search.best_params_
+
+
+def _race(model_name, X_train, y_train, X_val, y_val, threads, options):
+    """Budgeted successive halving / Hyperband with early stopping on the validation year (core.search)."""
+    from core import search
+
+    method = options["search"]
+    model, params, _ = search.run(
+        model_name, X_train, y_train, X_val, y_val, threads=threads, method=method,
+        n_configs=options.get("n_iter") or 30, seconds=options.get("budget_seconds"),
+        cpu_seconds=options.get("budget_cpu"),
+        log_path=search.log_path_for(model_name, method, options.get("log_dir") or search.LOG_DIR),
+    )
+    return model, params
+
+
+def fit_lasso(X_train, y_train, X_val, y_val, threads, options):
+    from sklearn.linear_model import LassoCV, MultiTaskLassoCV
+
+    # several horizons: one alpha path for all of them, selecting the same features
+    estimator = MultiTaskLassoCV if y_train.ndim == 2 else LassoCV
+    model = estimator(alphas=np.logspace(-4, 1, 50), cv=5, max_iter=10000, random_state=RANDOM_STATE, n_jobs=threads)
+    model.fit(X_train, y_train)
+    return model, {"alpha": float(model.alpha_)}
+
+
+def fit_ridge(X_train, y_train, X_val, y_val, threads, options):
+    from sklearn.linear_model import RidgeCV
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    # scaler and alpha are both fitted on Train + Validation, as in the notebook
+    model = Pipeline([
+        ("scaler", StandardScaler()),
+        ("ridge", RidgeCV(alphas=np.linspace(1, 10, 100), scoring="neg_mean_absolute_error", cv=5))
+    ])
+    model.fit(np.concatenate([X_train, X_val]), np.concatenate([y_train, y_val]))
+    return model, {"alpha": float(model.named_steps["ridge"].alpha_)}
+
+
+def fit_svr(X_train, y_train, X_val, y_val, threads, options):
+    from sklearn.svm import SVR
+
+    return _search(SVR(kernel="rbf"), "SVR", options.get("n_iter") or 20, 3, threads, X_train, y_train)
+
+
+def fit_random_forest(X_train, y_train, X_val, y_val, threads, options):
+    from sklearn.ensemble import RandomForestRegressor
+
+    model = RandomForestRegressor(n_estimators=300, max_depth=10, random_state=RANDOM_STATE, n_jobs=threads)
+    model.fit(X_train, y_train)
+    return model, {}
+
+
+def fit_xgboost(X_train, y_train, X_val, y_val, threads, options):
+    from sklearn.model_selection import TimeSeriesSplit
+    from xgboost import XGBRegressor
+
+    if options.get("search", "random") != "random":
+        return _race("XGBRegressor", X_train, y_train, X_val, y_val, threads, options)
+    base_model = XGBRegressor(objective="reg:squarederror", random_state=RANDOM_STATE, early_stopping_rounds=30,
+                              eval_metric="mae", verbosity=0, n_jobs=1)
+    return _search(base_model, "XGBRegressor", options.get("n_iter") or 30, TimeSeriesSplit(n_splits=3), threads,
+                   X_train, y_train, eval_set=[(X_val, y_val)], verbose=False)
+
+
+def fit_lightgbm(X_train, y_train, X_val, y_val, threads, options):
+    from lightgbm import LGBMRegressor
+    from sklearn.model_selection import TimeSeriesSplit
+
+    if options.get("search", "random") != "random":
+        return _race("LGBMRegressor", X_train, y_train, X_val, y_val, threads, options)
+    base_model = LGBMRegressor(random_state=RANDOM_STATE, n_jobs=1, verbose=-1)
+    return _search(base_model, "LGBMRegressor", options.get("n_iter") or 30, TimeSeriesSplit(n_splits=3), threads,
+                   X_train, y_train)
+
+
+def fit_catboost(X_train, y_train, X_val, y_val, threads, options):
+    from catboost import CatBoostRegressor
+
+    if options.get("search", "random") != "random":
+        return _race("CatBoostRegressor", X_train, y_train, X_val, y_val, threads, options)
+    loss = "MultiRMSE" if y_train.ndim == 2 else "RMSE"  # MultiRMSE: one tree ensemble for all horizons
+    base_cat = CatBoostRegressor(loss_function=loss, verbose=0, random_state=RANDOM_STATE, thread_count=1,
+                                 allow_writing_files=False)
+    return _search(base_cat, "CatBoostRegressor", options.get("n_iter") or 30, 3, threads, X_train, y_train)
+
+
+# dataset: feature table the model is trained on; scale: StandardScaler fitted on Train first;
+# cost: relative training time, used to start the slowest families first;
+# multi_output: the fit function trains all horizons at once when y has one column per horizon
+MODELS = {
+    "CatBoostRegressor": {"dataset": "total_pun_model_features", "scale": False, "cost": 10, "fit": fit_catboost,
+                          "multi_output": True},
+    "XGBRegressor": {"dataset": "total_pun_model_features", "scale": False, "cost": 6, "fit": fit_xgboost,
+                     "multi_output": False},
+    "LGBMRegressor": {"dataset": "total_pun_model_features", "scale": False, "cost": 5, "fit": fit_lightgbm,
+                      "multi_output": False},
+    "SVR": {"dataset": "pun_model_features", "scale": True, "cost": 3, "fit": fit_svr, "multi_output": False},
+    "RandomForestRegressor": {"dataset": "total_pun_model_features", "scale": False, "cost": 2,
+                              "fit": fit_random_forest, "multi_output": True},
+    "LassoCV": {"dataset": "pun_model_features", "scale": True, "cost": 1, "fit": fit_lasso, "multi_output": True},
+    "RidgeCV": {"dataset": "pun_model_features", "scale": False, "cost": 1, "fit": fit_ridge, "multi_output": True},
+}
+
+
+RACED = ["XGBRegressor", "LGBMRegressor", "CatBoostRegressor"]  # fit functions that can switch to core.search
+
+
+# === MULTI-HORIZON FORECASTS ===
+# With horizons > 1, y has one column per horizon: D+1 is target_pun, D+h is the target_pun of
+# the row (h - 1) days later (same period for sub-daily tables), so the feature table stays as
+# the pipeline writes it. Rows whose later targets are missing (the last days, gaps) are left
+# out. Families with native multi-output fit every horizon at once; the others are searched on
+# D+1 and the chosen configuration is refitted for each further horizon, in threads over the
+# same (already scaled) matrices, and registered as a core.registry.HorizonModel. The targets
+# come from core.registry.horizon_targets, shared with the dashboard.
+def _native_multi_output(model_name, options):
+    """Budgeted racing (core.search) early-stops on a single target, so a raced family goes per horizon."""
+    raced = model_name in RACED and options.get("search", "random") != "random"
+    return MODELS[model_name]["multi_output"] and not raced
+
+
+def refit_horizons(model, params, X_train, Y_train, X_val, Y_val, threads):
+    """Clones of `model` (with `params`) fitted on every column of Y, `threads` horizons at a time."""
+    from joblib import Parallel, delayed
+    from sklearn.base import clone
+
+    def fit_one(column):
+        estimator = clone(model).set_params(**{k: v for k, v in params.items() if k in model.get_params()})
+        if threads > 1 and "n_jobs" in estimator.get_params():
+            estimator.set_params(n_jobs=1)  # parallel across horizons instead
+        fit_params = {}
+        if getattr(estimator, "early_stopping_rounds", None):  # XGBoost stops on its eval_set
+            fit_params = {"eval_set": [(X_val, Y_val[:, column])], "verbose": False}
+        elif estimator.get_params().get("use_best_model"):  # CatBoost (raced) keeps its best iteration on it
+            fit_params = {"eval_set": (X_val, Y_val[:, column])}
+        return estimator.fit(X_train, Y_train[:, column], **fit_params)
+
+    return Parallel(n_jobs=threads, prefer="threads")(delayed(fit_one)(column) for column in range(Y_train.shape[1]))
+
+
+# === SHARED FEATURE MATRICES ===
+def share_datasets(names, folder, root=feature_store.FEATURE_DIR, horizons=1):
+    """
+    Write each feature table once as .npy files that workers memory-map instead of unpickling.
+
+    Rows are in date order, so every split is a contiguous row range and slicing the
+    memory-mapped X gives views of the same pages in every process.
+
+    Args:
+        horizons (int): 1 for target_pun alone (y is 1-D); more for a (rows, horizons) y of
+            D+1 ... D+horizons targets, keeping only rows where all of them are known
+
+    Returns:
+        dict: {dataset: {"X", "y", "dates" (paths), "columns", "horizons", "splits": {split: (begin, end)}}}
+    """
+    shared = {}
+    for name in names:
+        columns = [col for col in feature_store.list_columns(name, root) if col not in ("date", TARGET)]
+        unit = "s" if feature_store.has_timestamps(name, root=root) else "D"
+        if horizons > 1:
+            targets = feature_store.read_dataset(name, columns=["date", TARGET], root=root)
+            Y = registry.horizon_targets(targets["date"].to_numpy().astype(f"datetime64[{unit}]"), targets[TARGET],
+                                         horizons)
+            keep = ~np.isnan(Y).any(axis=1)
+            Y = Y[keep]
+            del targets
+        rows = int(keep.sum()) if horizons > 1 else feature_store.count_rows(name, root)
+        paths = {part: os.path.join(folder, f"{name}.{part}.npy") for part in ("X", "y", "dates")}
+        # filled one year partition at a time: sub-daily tables never sit in memory whole
+        X = np.lib.format.open_memmap(paths["X"], mode="w+", dtype="float64", shape=(rows, len(columns)))
+        y = np.lib.format.open_memmap(paths["y"], mode="w+", dtype="float64",
+                                      shape=(rows, horizons) if horizons > 1 else (rows,))
+        dates = np.lib.format.open_memmap(paths["dates"], mode="w+", dtype=f"datetime64[{unit}]", shape=(rows,))
+        begin, read = 0, 0
+        for year in feature_store.years(name, root):
+            df = feature_store.read_dataset(name, years=[year], root=root)
+            if horizons > 1:
+                kept = keep[read:read + len(df)]
+                read += len(kept)
+                df = df[kept]
+            end = begin + len(df)
+            X[begin:end] = df[columns].to_numpy(dtype="float64")
+            y[begin:end] = Y[begin:end] if horizons > 1 else df[TARGET].to_numpy(dtype="float64")
+            dates[begin:end] = df["date"].to_numpy().astype(f"datetime64[{unit}]")
+            begin = end
+        years = dates.astype("datetime64[Y]").astype("int64") + 1970
+        splits = {
+            "train": (0, int(np.searchsorted(years, TRAIN_LAST_YEAR, side="right"))),
+            "val": (int(np.searchsorted(years, VAL_YEAR)), int(np.searchsorted(years, VAL_YEAR, side="right"))),
+            "test": (int(np.searchsorted(years, TEST_YEAR)), int(np.searchsorted(years, TEST_YEAR, side="right"))),
+        }
+        del X, y, dates  # flushes the memory maps
+        shared[name] = {**paths, "columns": columns, "horizons": horizons, "splits": splits}
+    return shared
+
+
+def _shared_folder():
+    """Temporary folder for the shared arrays, on tmpfs when available so nothing touches the disk."""
+    return tempfile.mkdtemp(prefix="pun-training-", dir="/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+
+# === CORE BUDGET ===
+def split_cores(cores, n_models, workers=None):
+    """(outer workers, threads per model) with workers × threads <= cores."""
+    workers = max(1, min(workers or cores, n_models, cores))
+    return workers, max(1, cores // workers)
+
+
+def _init_worker(threads):
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+
+
+# === WORKER ===
+def evaluate(y_true, y_pred):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+    return {
+        "MAE": mean_absolute_error(y_true, y_pred),
+        "RMSE": float(np.sqrt(mean_squared_error(y_true, y_pred))),
+        "R2": r2_score(y_true, y_pred),
+    }
+
+
+def train_model(model_name, data, threads, options=None):
+    """
+    Fit one model family on memory-mapped arrays inside a worker process.
+
+    joblib is switched to its threading backend and BLAS/OpenMP pools are capped at `threads`,
+    so all of the model's work stays in this process: it cannot oversubscribe the cores, and
+    process CPU time measures the model exactly.
+
+    Returns:
+        dict: model_name, fitted model and scaler, features, params, val/test metrics (D+1),
+            per-horizon metrics, D+1 test predictions, wall/CPU seconds, threads
+    """
+    from joblib import parallel_config
+    from threadpoolctl import threadpool_limits
+
+    spec = MODELS[model_name]
+    X = np.load(data["X"], mmap_mode="r")
+    y = np.load(data["y"], mmap_mode="r")
+    parts = {split: (X[begin:end], y[begin:end]) for split, (begin, end) in data["splits"].items()}
+    (X_train, y_train), (X_val, y_val), (X_test, y_test) = parts["train"], parts["val"], parts["test"]
+
+    options = options or {}
+    scaler = None
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    with threadpool_limits(limits=threads), parallel_config(backend="threading", n_jobs=threads):
+        if spec["scale"]:
+            from sklearn.preprocessing import StandardScaler
+
+            scaler = StandardScaler()
+            X_train = scaler.fit_transform(X_train)
+            X_val, X_test = scaler.transform(X_val), scaler.transform(X_test)
+        if y.ndim == 2 and not _native_multi_output(model_name, options):
+            first, params = spec["fit"](X_train, y_train[:, 0], X_val, y_val[:, 0], threads, options)
+            model = registry.HorizonModel([first] + refit_horizons(first, params, X_train, y_train[:, 1:], X_val,
+                                                                   y_val[:, 1:], threads))
+        else:
+            model, params = spec["fit"](X_train, y_train, X_val, y_val, threads, options)
+        y_val_pred, y_test_pred = model.predict(X_val), model.predict(X_test)
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    # one column per horizon from here on, also for single-horizon runs
+    y_val, y_test = np.asarray(y_val).reshape(len(y_val), -1), np.asarray(y_test).reshape(len(y_test), -1)
+    y_val_pred, y_test_pred = y_val_pred.reshape(y_val.shape), y_test_pred.reshape(y_test.shape)
+    horizons = [{"horizon": h + 1, "val": evaluate(y_val[:, h], y_val_pred[:, h]),
+                 "test": evaluate(y_test[:, h], y_test_pred[:, h])} for h in range(y_val.shape[1])]
+
+    # a scaling Pipeline (RidgeCV) is registered as its scaler plus the final estimator
+    if scaler is None and hasattr(model, "named_steps") and "scaler" in model.named_steps:
+        scaler, model = model.named_steps["scaler"], model[-1]
+
+    return {
+        "model_name": model_name,
+        "model": model,
+        "scaler": scaler,
+        "features": data["columns"],
+        "params": params,
+        "val": horizons[0]["val"],
+        "test": horizons[0]["test"],
+        "horizons": horizons,
+        "y_test": y_test[:, 0],
+        "y_test_pred": y_test_pred[:, 0],
+        "wall_seconds": wall,
+        "cpu_seconds": cpu,
+        "threads": threads,
+    }
+
+
+# === RESULTS ===
+def plot_predictions(y_true, y_pred, model_name, label="(Test)"):
+    """Save the notebook's True vs Predicted plot to images/<model>.png and return its relative path."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 4))
+    plt.plot(y_true, label="True", linewidth=2)
+    plt.plot(y_pred, label="Predicted", linestyle="--", linewidth=2)
+    plt.title(f"{model_name} - True vs Predicted {label}")
+    plt.xlabel("Samples")
+    plt.ylabel("PUN €/MWh")
+    plt.legend()
+    plt.grid(True)
+    plt.tight_layout()
+
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    filename = f"{model_name}.png"
+    plt.savefig(os.path.join(IMAGE_DIR, filename))
+    plt.close()
+    return os.path.join("images", filename).replace("\\", "/")
+
+
+def save_result(conn, result, image_path=None):
+    """
+    Upsert one model's metrics and run timings, one row per horizon, dropping rows of horizons
+    this run did not train; the stored plot path (D+1) is kept when image_path is None.
+    """
+    trained_at = datetime.now().isoformat(timespec="seconds")
+    horizons = result.get("horizons") or [{"horizon": 1, "val": result["val"], "test": result["test"]}]
+    with conn:
+        conn.executemany("""
+            INSERT INTO model_results (
+                model_name, horizon, val_mae, val_rmse, val_r2, test_mae, test_rmse, test_r2,
+                image_path, wall_seconds, cpu_seconds, threads, trained_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(model_name, horizon) DO UPDATE SET
+                val_mae = excluded.val_mae, val_rmse = excluded.val_rmse, val_r2 = excluded.val_r2,
+                test_mae = excluded.test_mae, test_rmse = excluded.test_rmse, test_r2 = excluded.test_r2,
+                image_path = COALESCE(excluded.image_path, model_results.image_path),
+                wall_seconds = excluded.wall_seconds, cpu_seconds = excluded.cpu_seconds,
+                threads = excluded.threads, trained_at = excluded.trained_at
+        """, [(
+            result["model_name"], entry["horizon"],
+            entry["val"]["MAE"], entry["val"]["RMSE"], entry["val"]["R2"],
+            entry["test"]["MAE"], entry["test"]["RMSE"], entry["test"]["R2"],
+            image_path if entry["horizon"] == 1 else None,
+            result["wall_seconds"], result["cpu_seconds"], result["threads"], trained_at,
+        ) for entry in horizons])
+        conn.execute("DELETE FROM model_results WHERE model_name = ? AND horizon > ?",
+                     (result["model_name"], len(horizons)))
+        schema.bump_data_version(conn, "model_results")
+
+
+# === ORCHESTRATOR ===
+def train_all(models=None, cores=None, workers=None, options=None, plots=False, db_path=schema.DB_PATH,
+              root=feature_store.FEATURE_DIR, horizons=1):
+    """
+    Train model families in a process pool; as each finishes, store its metrics in model_results
+    and register the fitted model (core.registry).
+
+    Feature tables are read once and shared through memory-mapped files; the core budget is
+    split into outer workers and per-model threads. Families are submitted slowest first.
+    `options` is passed to every fit function (n_iter, search, budget_seconds, budget_cpu, log_dir).
+    With horizons > 1 every family forecasts D+1 ... D+horizons (see MULTI-HORIZON FORECASTS).
+
+    Returns:
+        tuple: (list of results in completion order, total wall seconds, threads per model)
+    """
+    models = sorted(models or MODELS, key=lambda name: -MODELS[name]["cost"])
+    cores = cores or os.cpu_count() or 1
+    workers, threads = split_cores(cores, len(models), workers)
+    print(f"🧮 {len(models)} models, {cores} cores: {workers} worker(s) × {threads} thread(s)")
+
+    folder = _shared_folder()
+    results = []
+    started = time.perf_counter()
+    try:
+        shared = share_datasets(sorted({MODELS[name]["dataset"] for name in models}), folder, root=root,
+                                horizons=horizons)
+        context = multiprocessing.get_context("spawn")  # fresh interpreters: no forked thread pools or locks
+        conn = schema.connect(db_path)
+        try:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(threads,)) as pool:
+                futures = {pool.submit(train_model, name, shared[MODELS[name]["dataset"]], threads, options): name
+                           for name in models}
+                for future in as_completed(futures):
+                    name = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as exc:
+                        print(f"❌ {name}: training failed ({exc})")
+                        continue
+                    begin, end = shared[MODELS[name]["dataset"]]["splits"]["train"]
+                    perf.record(f"train:{name}", result["wall_seconds"], result["cpu_seconds"], rows=end - begin,
+                                detail=f"{threads} threads")  # measured in the worker
+                    image_path = plot_predictions(result["y_test"], result["y_test_pred"], name) if plots else None
+                    save_result(conn, result, image_path)
+                    result["version"] = registry.register(
+                        conn, name, result["model"], result["scaler"], result["features"],
+                        dataset=MODELS[name]["dataset"], params=result["params"],
+                        metrics={"val": result["val"], "test": result["test"]}, horizons=horizons,
+                    )
+                    results.append(result)
+                    last = f", D+{horizons} {result['horizons'][-1]['test']['MAE']:.2f}" if horizons > 1 else ""
+                    print(f"✅ {name} v{result['version']}: val MAE {result['val']['MAE']:.2f}, "
+                          f"test MAE {result['test']['MAE']:.2f}{last} ({result['wall_seconds']:.1f}s)")
+        finally:
+            conn.close()
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return results, time.perf_counter() - started, threads
+
+
+def print_report(results, total_seconds):
+    """Per-model wall time, CPU time and utilization (CPU / (wall × threads))."""
+    print(f"\n{'model':<24}{'threads':>8}{'wall s':>9}{'cpu s':>9}{'util':>7}{'val MAE':>9}{'test MAE':>10}")
+    for r in sorted(results, key=lambda r: -r["wall_seconds"]):
+        util = r["cpu_seconds"] / (r["wall_seconds"] * r["threads"]) if r["wall_seconds"] else 0.0
+        print(f"{r['model_name']:<24}{r['threads']:>8}{r['wall_seconds']:>9.1f}{r['cpu_seconds']:>9.1f}"
+              f"{util:>7.0%}{r['val']['MAE']:>9.2f}{r['test']['MAE']:>10.2f}")
+    if any(len(r["horizons"]) > 1 for r in results):
+        n = max(len(r["horizons"]) for r in results)
+        print(f"\n{'test MAE':<24}" + "".join(f"{f'D+{h}':>8}" for h in range(1, n + 1)))
+        for r in sorted(results, key=lambda r: r["model_name"]):
+            print(f"{r['model_name']:<24}" + "".join(f"{entry['test']['MAE']:>8.2f}" for entry in r["horizons"]))
+    serial = sum(r["wall_seconds"] for r in results)
+    print(f"⏱️ {total_seconds:.1f}s total for {serial:.1f}s of model time "
+          f"({serial / total_seconds if total_seconds else 0:.1f}x overlap)")
+
+
+@perf.timed("training", rows=None)
+def main():
+    parser = argparse.ArgumentParser(description="Train the PUN model families in parallel and store their results")
+    parser.add_argument("--models", nargs="+", choices=list(MODELS), help="model families to train (default: all)")
+    parser.add_argument("--cores", type=int, help="total core budget (default: all cores)")
+    parser.add_argument("--workers", type=int, help="models trained at once (default: as many as the budget allows)")
+    parser.add_argument("--n-iter", type=int, help="override the number of search candidates")
+    parser.add_argument("--search", choices=["random", "halving", "hyperband"], default="random",
+                        help="booster search: the notebook's RandomizedSearchCV or budgeted racing (core.search)")
+    parser.add_argument("--budget-seconds", type=float, help="wall-clock budget per booster search")
+    parser.add_argument("--budget-cpu", type=float, help="CPU-seconds budget per booster search")
+    parser.add_argument("--horizons", type=int, default=1, choices=range(1, MAX_HORIZON + 1),
+                        help=f"forecast D+1 ... D+N (N up to {MAX_HORIZON}; default: next day only)")
+    parser.add_argument("--plots", action="store_true", help="also save True vs Predicted plots to images/")
+    parser.add_argument("--db", default=schema.DB_PATH, help="SQLite database path")
+    args = parser.parse_args()
+
+    options = {"n_iter": args.n_iter, "search": args.search, "budget_seconds": args.budget_seconds,
+               "budget_cpu": args.budget_cpu}
+    results, total_seconds, _ = train_all(args.models, cores=args.cores, workers=args.workers, options=options,
+                                          plots=args.plots, db_path=args.db, horizons=args.horizons)
+    print_report(results, total_seconds)
+    print("🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
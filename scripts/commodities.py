@@ -1,7 +1,12 @@
+import argparse
 import requests
-import sqlite3
+import sys
+import threading
 import time
 import os
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 # === LOAD ENVIRONMENT VARIABLES ===
@@ -9,6 +14,7 @@ load_dotenv()
 API_KEY = os.getenv("TRADEFEEDS_API_KEY")
 
 # === CONFIGURATION ===
+API_URL = "https://data.tradefeeds.com/api/v1/commodity_historical"
 COMMODITIES = ["crude_oil", "ttf_gas", "gasoline", "brent", "coal"]
 YEAR_RANGES = [
     ("2020-01-01", "2020-12-31"),
@@ -18,34 +24,63 @@ YEAR_RANGES = [
     ("2024-01-01", "2024-12-31")
 ]
 
+# === INCREMENTAL MODE ===
+HISTORY_START = "2020-01-01"  # first date fetched for a commodity with no rows yet
+MAX_WINDOW_DAYS = 366  # largest date span requested in one API call
+
+# === CONCURRENT MODE DEFAULTS ===
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 2.0  # requests per second
+DEFAULT_BURST = 2
+MAX_RETRIES = 5
+BACKOFF_BASE = 0.5  # seconds, doubled at every retry
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
 # === DATABASE SETUP ===
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_FOLDER = os.path.join(BASE_DIR, "db")
-os.makedirs(DB_FOLDER, exist_ok=True)
-DB_PATH = os.path.join(DB_FOLDER, "data.db")  # unified DB
-
-# === CONNECT TO DATABASE ===
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-# === CREATE TABLE IF NOT EXISTS ===
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS commodity_prices (
-    id INTEGER PRIMARY KEY AUTOINCREMENT,
-    commodity TEXT,
-    date TEXT,
-    price REAL,
-    unit TEXT,
-    UNIQUE(commodity, date)
-)
-""")
-conn.commit()
+sys.path.insert(0, BASE_DIR)
 
-# === FUNCTION: FETCH AND STORE DATA ===
-def fetch_and_store_commodity(name, start_date, end_date):
-    print(f"📥 Downloading: {name} ({start_date} → {end_date})")
-    url = "https://data.tradefeeds.com/api/v1/commodity_historical"
-    params = {
+from core import perf, range_stats, schema  # noqa: E402
+
+DB_PATH = schema.DB_PATH  # unified DB
+
+
+# === RATE LIMITER ===
+class TokenBucket:
+    """Thread-safe token bucket allowing `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# === HTTP HELPERS ===
+def create_session(pool_size):
+    """Session with a keep-alive connection pool sized for `pool_size` concurrent workers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def build_params(name, start_date, end_date):
+    return {
         "key": API_KEY,
         "name": name,
         "date_from": start_date,
@@ -53,13 +88,9 @@ def fetch_and_store_commodity(name, start_date, end_date):
         "frequency": "day"
     }
 
-    response = requests.get(url, params=params)
 
-    if response.status_code != 200:
-        print(f"❌ Error for {name}: {response.status_code} - {response.text}")
-        return
-
-    data = response.json()
+def parse_prices(data):
+    """Extract (unit, [(date, price), ...]) from a `commodity_historical` response, or None."""
     result = data.get("result", {})
     output = result.get("output")
 
@@ -67,8 +98,7 @@ def fetch_and_store_commodity(name, start_date, end_date):
         output = output[0]
 
     if not output or "prices" not in output:
-        print(f"⚠️ No 'prices' field found for {name} ({start_date})")
-        return
+        return None
 
     prices_raw = output["prices"]
     unit = output.get("unit", "unknown")
@@ -76,26 +106,202 @@ def fetch_and_store_commodity(name, start_date, end_date):
     if isinstance(prices_raw, dict):
         prices_raw = [prices_raw]
 
-    count = 0
-    for entry in prices_raw:
-        date = entry["date"]
-        price = float(entry["price"])
+    return unit, [(entry["date"], float(entry["price"])) for entry in prices_raw]
+
+
+def request_window(session, name, start_date, end_date, limiter=None, url=API_URL,
+                   max_retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+    """GET one commodity/date window, retrying with exponential backoff on 429, 5xx and non-JSON bodies."""
+    params = build_params(name, start_date, end_date)
+
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+
+        try:
+            response = session.get(url, params=params, timeout=30)
+            if response.status_code == 200:
+                return response.json()
+        except (requests.RequestException, ValueError) as exc:  # ValueError: a 200 that is not JSON (error page)
+            if attempt == max_retries:
+                print(f"❌ Error for {name} ({start_date}): {exc}")
+                return None
+            time.sleep(backoff * 2 ** attempt)
+            continue
+
+        if response.status_code not in RETRY_STATUS or attempt == max_retries:
+            print(f"❌ Error for {name}: {response.status_code} - {response.text}")
+            return None
 
-        cursor.execute("""
-            INSERT OR IGNORE INTO commodity_prices (commodity, date, price, unit)
-            VALUES (?, ?, ?, ?)
-        """, (name, date, price, unit))
-        count += 1
+        retry_after = response.headers.get("Retry-After")
+        delay = float(retry_after) if retry_after and retry_after.isdigit() else backoff * 2 ** attempt
+        print(f"🔁 {name} ({start_date}): HTTP {response.status_code}, retrying in {delay:.1f}s")
+        time.sleep(delay)
 
+
+# === DATABASE WRITE ===
+@perf.timed("commodities.store", rows=lambda count: count)
+def store_prices(conn, name, unit, prices):
+    """Write one response's prices with a single executemany and commit. Returns the row count."""
+    conn.executemany("""
+        INSERT OR IGNORE INTO commodity_prices (commodity, date, price, unit)
+        VALUES (?, ?, ?, ?)
+    """, [(name, day, price, unit) for day, price in prices])
+    schema.bump_data_version(conn, "commodity_prices")
     conn.commit()
+    return len(prices)
+
+
+# === FUNCTION: FETCH AND STORE DATA ===
+def fetch_and_store_commodity(conn, name, start_date, end_date, session=None, url=API_URL):
+    print(f"📥 Downloading: {name} ({start_date} → {end_date})")
+    data = request_window(session or requests, name, start_date, end_date, url=url, max_retries=0)
+    if data is None:
+        return 0
+
+    parsed = parse_prices(data)
+    if parsed is None:
+        print(f"⚠️ No 'prices' field found for {name} ({start_date})")
+        return 0
+
+    unit, prices = parsed
+    count = store_prices(conn, name, unit, prices)
     print(f"✅ {name} ({start_date}): {count} records saved.")
+    return count
 
-# === LOOP THROUGH COMMODITIES AND YEARS ===
-for commodity in COMMODITIES:
-    for start_date, end_date in YEAR_RANGES:
-        fetch_and_store_commodity(commodity, start_date, end_date)
+
+# === SERIAL MODE: ONE WINDOW AT A TIME ===
+def run_serial(conn, windows, url=API_URL):
+    for commodity, start_date, end_date in windows:
+        fetch_and_store_commodity(conn, commodity, start_date, end_date, url=url)
         time.sleep(1)  # prevent API rate limit issues
 
-# === CLOSE CONNECTION ===
-conn.close()
-print("🏁 Done.")
+
+# === CONCURRENT MODE: POOLED, RATE-LIMITED FETCHES ===
+def run_concurrent(conn, windows, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE, burst=DEFAULT_BURST,
+                   url=API_URL, max_retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+    """
+    Fetch all windows in a thread pool sharing one session and one token bucket.
+
+    Network I/O runs in the workers; responses are written from the calling thread as they
+    complete, so the SQLite connection is never shared across threads.
+
+    Returns:
+        dict: windows, rows, failed, seconds, windows_per_s, rows_per_s
+    """
+    limiter = TokenBucket(rate, burst)
+    session = create_session(workers)
+    rows = failed = 0
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(request_window, session, name, start_date, end_date,
+                        limiter, url, max_retries, backoff): (name, start_date)
+            for name, start_date, end_date in windows
+        }
+        for future in as_completed(futures):
+            name, start_date = futures[future]
+            data = future.result()
+            parsed = parse_prices(data) if data is not None else None
+            if parsed is None:
+                if data is not None:
+                    print(f"⚠️ No 'prices' field found for {name} ({start_date})")
+                failed += 1
+                continue
+            unit, prices = parsed
+            count = store_prices(conn, name, unit, prices)
+            rows += count
+            print(f"✅ {name} ({start_date}): {count} records saved.")
+
+    session.close()
+    seconds = time.perf_counter() - start
+    return {
+        "windows": len(windows),
+        "rows": rows,
+        "failed": failed,
+        "seconds": seconds,
+        "windows_per_s": len(windows) / seconds if seconds else 0.0,
+        "rows_per_s": rows / seconds if seconds else 0.0,
+    }
+
+
+def build_windows(commodities=COMMODITIES, year_ranges=YEAR_RANGES):
+    return [(c, start, end) for c in commodities for start, end in year_ranges]
+
+
+def read_watermarks(conn):
+    """Latest stored date per commodity, as {commodity: 'YYYY-MM-DD'}."""
+    rows = conn.execute("SELECT commodity, MAX(date) FROM commodity_prices GROUP BY commodity")
+    return dict(rows.fetchall())
+
+
+def split_range(start, end, max_days=MAX_WINDOW_DAYS):
+    """Split the inclusive date range [start, end] into chunks of at most `max_days` days."""
+    chunks = []
+    while start <= end:
+        chunk_end = min(end, start + timedelta(days=max_days - 1))
+        chunks.append((start.isoformat(), chunk_end.isoformat()))
+        start = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def build_incremental_windows(conn, commodities=COMMODITIES, until=None, max_days=MAX_WINDOW_DAYS):
+    """Windows covering only the days after each commodity's watermark, up to `until` (default today)."""
+    until = until or date.today()
+    watermarks = read_watermarks(conn)
+    windows = []
+    for commodity in commodities:
+        last = watermarks.get(commodity)
+        start = date.fromisoformat(last) + timedelta(days=1) if last else date.fromisoformat(HISTORY_START)
+        windows += [(commodity, s, e) for s, e in split_range(start, until, max_days)]
+    return windows
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download commodity prices from Tradefeeds into data.db")
+    parser.add_argument("--mode", choices=["serial", "concurrent"], default="serial")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent HTTP workers")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE, help="max requests per second")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST, help="token bucket capacity")
+    parser.add_argument("--incremental", action="store_true",
+                        help="fetch only the days after each commodity's latest stored date")
+    parser.add_argument("--until", type=date.fromisoformat, default=None,
+                        help="last date to fetch in incremental mode (default: today)")
+    parser.add_argument("--url", default=API_URL, help="commodity_historical endpoint")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    return parser.parse_args()
+
+
+@perf.timed("commodities", rows=None)
+def main():
+    args = parse_args()
+
+    # === CONNECT TO DATABASE ===
+    conn = schema.connect(args.db)
+
+    # === LOOP THROUGH COMMODITIES AND YEARS ===
+    if args.incremental:
+        windows = build_incremental_windows(conn, until=args.until)
+        print(f"🔎 Incremental mode: {len(windows)} window(s) to fetch")
+    else:
+        windows = build_windows()
+    if args.mode == "serial":
+        run_serial(conn, windows, url=args.url)
+    else:
+        stats = run_concurrent(conn, windows, workers=args.workers, rate=args.rate,
+                               burst=args.burst, url=args.url)
+        print(f"⏱️ {stats['windows']} windows, {stats['rows']} rows in {stats['seconds']:.2f}s "
+              f"({stats['windows_per_s']:.2f} windows/s, {stats['rows_per_s']:.0f} rows/s, "
+              f"{stats['failed']} failed)")
+    if windows:
+        range_stats.refresh(conn, "commodity_prices", since=min(window[1] for window in windows),
+                            keys=sorted({window[0] for window in windows}))
+
+    # === CLOSE CONNECTION ===
+    conn.close()
+    print("🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
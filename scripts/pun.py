@@ -1,57 +1,214 @@
+import argparse
+import io
 import os
+import sys
+from datetime import datetime
+import numpy as np
 import pandas as pd
-import sqlite3
 
 # === Percorsi ===
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core import perf, range_stats, resolution, schema, source_files  # noqa: E402
+
 CSV_PATH = os.path.join(BASE_DIR, "data", "pun_index_gme.csv")
-DB_PATH = os.path.join(BASE_DIR, "db", "data.db")  # singolo DB
+DB_PATH = schema.DB_PATH  # singolo DB
+
+
+# === Carica e pulisci il CSV ===
+DATE_FORMATS = ["%d/%m/%Y", "%Y%m%d", "%Y-%m-%d"]  # PUN index export, GME market results, ISO
+
+
+def _date_format(values):
+    """The first of DATE_FORMATS that parses the first date of the file."""
+    first = str(values.iloc[0]).strip()
+    for fmt in DATE_FORMATS:
+        try:
+            datetime.strptime(first, fmt)
+            return fmt
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised date format: {first!r}")
+
+
+def _read(path, offset=0):
+    """The raw CSV, or only its header plus the lines from byte `offset` on."""
+    options = {"delimiter": ";", "encoding": "utf-8", "decimal": ","}
+    if not offset:
+        return pd.read_csv(path, **options)
+    with open(path, "rb") as handle:
+        header = handle.readline()
+        handle.seek(offset)
+        return pd.read_csv(io.BytesIO(header + handle.read()), **options)
+
+
+# === ORARIO LOCALE: GME numbers the periods of each market day from local midnight ===
+# A day has 23 hours in March and 25 in October (periods 1-92 / 1-100 at 15 minutes). Periods
+# are stored at their local wall time; the second pass through the hour repeated in October has
+# the same wall time as the first and is told apart by fold = 1 (as datetime.fold), so the
+# (date, fold) key keeps every period of the day.
+TIMEZONE = "Europe/Rome"
+
+
+def wall_times(days, periods, step):
+    """
+    Local wall time and fold of period `periods` (1-based, `step` long) of each market day in `days`.
+
+    Returns:
+        tuple: (wall times, ndarray of folds: 1 on the repeated hour's second pass, else 0)
+    """
+    instants = days.dt.tz_localize(TIMEZONE) + (periods.astype(int) - 1) * step  # elapsed since local midnight
+    wall = instants.dt.tz_localize(None)
+    # the summer-time reading of a wall time differs from the instant only on the repeated hour's second pass
+    first = wall.dt.tz_localize(TIMEZONE, ambiguous=np.ones(len(wall), dtype=bool))
+    return wall, (first != instants).to_numpy().astype(int)
+
 
-# === Carica il CSV ===
-try:
-    df = pd.read_csv(CSV_PATH, delimiter=";", encoding="utf-8")
-    print("✅ CSV loaded.")
-except FileNotFoundError:
-    print(f"❌ File not found: {CSV_PATH}")
-    exit(1)
+@perf.timed("pun.parse")
+def load_csv(path=CSV_PATH, offset=0):
+    """
+    PUN rows of a GME export as (date, fold, price), dates as storage text (see wall_times for fold).
 
-# === Pulizia colonne ===
-df.columns = [col.strip().lower() for col in df.columns]
+    Args:
+        offset (int): parse only the lines from this byte on (the header is always read)
+    """
+    df = _read(path, offset)
 
-column_mapping = {
-    "data": "date",
-    "€/mwh": "price",
-    "prezzo": "price",
-    "giorno": "date"
-}
-df.rename(columns=column_mapping, inplace=True)
+    df.columns = [col.strip().lower() for col in df.columns]
 
-if "date" not in df.columns or "price" not in df.columns:
-    print(f"❌ Columns 'date' and/or 'price' missing. Found: {list(df.columns)}")
-    exit(1)
+    column_mapping = {
+        "data": "date",
+        "€/mwh": "price",
+        "prezzo": "price",
+        "giorno": "date",
+        "ora": "hour",  # 1-24 (23 or 25 on clock-change days), hourly files
+        "periodo": "period",  # 1-96 (92 or 100), quarter-hourly files
+    }
+    df.rename(columns=column_mapping, inplace=True)
 
-df["price"] = df["price"].astype(str).str.replace(",", ".", regex=False).astype(float)
-df["date"] = pd.to_datetime(df["date"], dayfirst=True).dt.strftime("%Y-%m-%d")  # Uniforma formato
+    if "date" not in df.columns or "price" not in df.columns:
+        raise ValueError(f"Columns 'date' and/or 'price' missing. Found: {list(df.columns)}")
+    df = df.dropna(subset=["date"])
+    if df.empty:
+        return pd.DataFrame({"date": pd.Series(dtype=str), "fold": pd.Series(dtype=int),
+                             "price": pd.Series(dtype=float)})
+
+    # === PARSE: comma decimals are read by the CSV parser, dates with an explicit format ===
+    if not pd.api.types.is_numeric_dtype(df["price"]):  # dot decimals or stray text
+        df["price"] = pd.to_numeric(df["price"].astype(str).str.replace(",", ".", regex=False))
+    dates = df["date"].astype(str).str.strip()
+    df["date"] = pd.to_datetime(dates, format=_date_format(dates))
+
+    # === NATIVE RESOLUTION: one timestamp per hour / quarter-hour when the file has them ===
+    freq = "D"
+    df["fold"] = 0
+    if "period" in df.columns:
+        freq = "15min"
+        df["date"], df["fold"] = wall_times(df["date"], df["period"], pd.Timedelta(minutes=15))
+    elif "hour" in df.columns:
+        freq = "h"
+        df["date"], df["fold"] = wall_times(df["date"], df["hour"], pd.Timedelta(hours=1))
+    df["date"] = resolution.format_timestamps(df["date"], freq).to_numpy()  # Uniforma formato
+
+    df = df[["date", "fold", "price"]].drop_duplicates(["date", "fold"], keep="last")
+    return df.sort_values(["date", "fold"], ignore_index=True)
+
+
+# === Confronto con il DB ===
+@perf.timed("pun.diff")
+def changed_rows(conn, df):
+    """Rows of `df` whose (date, fold) is new or whose price differs from the stored one."""
+    if df.empty:
+        return df
+    stored = pd.read_sql("SELECT date, fold, price AS stored FROM pun_prices WHERE date BETWEEN ? AND ?", conn,
+                         params=(df["date"].iloc[0], df["date"].iloc[-1]))
+    merged = df.merge(stored, on=["date", "fold"], how="left", indicator=True)
+    same = (merged["_merge"] == "both") & (merged["price"].eq(merged["stored"])
+                                           | (merged["price"].isna() & merged["stored"].isna()))
+    return df[~same.to_numpy()]
 
-df = df.sort_values("date")
 
 # === Scrittura nel DB ===
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
+@perf.timed("pun.upsert", rows=lambda changed: changed)
+def upsert_prices(conn, df):
+    """
+    Insert or update (date, fold, price) rows in a single transaction, rewriting only rows whose
+    price changed. Returns the number of rows inserted or changed.
+
+    Sub-daily rows replace the date-only row of their day, if one was stored before.
+    """
+    dates = df["date"].tolist()
+    with conn:
+        dropped = resolution.drop_daily_rows(conn, "pun_prices", "date", dates)
+        cursor = conn.executemany("""
+            INSERT INTO pun_prices (date, fold, price) VALUES (?, ?, ?)
+            ON CONFLICT(date, fold) DO UPDATE SET price = excluded.price
+            WHERE price IS NOT excluded.price
+        """, zip(dates, df["fold"].tolist(), df["price"].tolist()))
+        changed = max(cursor.rowcount, 0)
+        if changed or dropped:
+            schema.bump_data_version(conn, "pun_prices")
+    return changed
+
+
+def ingest(conn, path=CSV_PATH, force=False):
+    """
+    Load a GME export if it changed since the last run: only the lines appended since then when
+    the rest of the file is untouched, and only rows that are new or differ from the stored ones.
+
+    Returns:
+        (rows parsed, rows written, first written date); None when the file is unchanged
+    """
+    offset, size, digest = source_files.plan(conn, "pun_prices", path, force)
+    if offset is None:
+        return None
+    parsed = load_csv(path, offset)
+    df = changed_rows(conn, parsed)
+    count = upsert_prices(conn, df) if len(df) else 0
+    source_files.record(conn, "pun_prices", path, size, digest, len(parsed))
+    return len(parsed), count, df["date"].iloc[0] if len(df) else None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load the GME PUN export into data.db")
+    parser.add_argument("--csv", default=CSV_PATH, help="GME export (daily index, hourly or 15-minute results)")
+    parser.add_argument("--force", action="store_true", help="parse the whole file even if it is unchanged")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    return parser.parse_args()
+
+
+@perf.timed("pun", rows=None)
+def main():
+    args = parse_args()
+    conn = schema.connect(args.db)
+    try:
+        result = ingest(conn, args.csv, args.force)
+    except FileNotFoundError:
+        print(f"❌ File not found: {args.csv}")
+        conn.close()
+        sys.exit(1)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        conn.close()
+        sys.exit(1)
+
+    if result is None:
+        print(f"✅ {args.csv} unchanged since the last run, nothing to do.")
+        conn.close()
+        return
+    parsed, count, first = result
+    if count:
+        range_stats.refresh(conn, "pun_prices", since=first[:10])
 
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS pun_prices (
-    date TEXT PRIMARY KEY,
-    price REAL
-)
-""")
+    print(f"✅ {parsed} rows parsed, {count} inserted or changed in DB: {args.db} (table: pun_prices)")
+    preview = pd.read_sql("SELECT * FROM pun_prices LIMIT 5", conn)
+    print("📊 Preview:")
+    print(preview)
 
-df[["date", "price"]].to_sql("pun_prices", conn, if_exists="replace", index=False)
+    conn.close()
+    print("🏁 Done.")
 
-print(f"✅ Data written to DB: {DB_PATH} (table: pun_prices)")
-preview = pd.read_sql("SELECT * FROM pun_prices LIMIT 5", conn)
-print("📊 Preview:")
-print(preview)
 
-conn.close()
-print("🏁 Done.")
+if __name__ == "__main__":
+    main()
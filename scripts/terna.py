@@ -1,64 +1,243 @@
+import argparse
+import glob
 import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
-import sqlite3
 
 # === PATH SETUP ===
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from core import perf, range_stats, resolution, schema  # noqa: E402
+
 CSV_PATH = os.path.join(BASE_DIR, "data", "load_forecast.csv")
-DB_PATH = os.path.join(BASE_DIR, "db", "data.db")
+DB_PATH = schema.DB_PATH
+
+EXPECTED_COLS = ["Date", "Zone", "Load [MW]"]
+
+# === STREAMING ===
+# The CSV is read CHUNK_ROWS lines at a time and aggregated per (date, zone) as it goes: groups
+# of the chunk's last date may continue in the next chunk, so they are carried over and merged
+# instead of written. Terna exports are in date order; a chunk going back before a date already
+# written is an error rather than a silently split sum. Rows are upserted BATCH_ROWS at a time,
+# one transaction each, and only rows whose value changed are rewritten.
+CHUNK_ROWS = 200000
+BATCH_ROWS = 50000
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+
+# === LOAD, CLEAN AND AGGREGATE CSV ===
+def _clean(df, daily, freq=None):
+    """Parsed rows of one raw chunk, with Date as storage text (dates when daily, else `freq` format)."""
+    # === CLEAN COLUMNS ===
+    df.columns = [col.strip() for col in df.columns]
+
+    if not all(col in df.columns for col in EXPECTED_COLS):
+        raise ValueError(f"Missing required columns. Found: {list(df.columns)}")
 
-# === LOAD CSV ===
-try:
-    df = pd.read_csv(CSV_PATH, sep=";", encoding="utf-8")
-    print("✅ CSV loaded successfully.")
-except FileNotFoundError:
-    print(f"❌ File not found: {CSV_PATH}")
-    exit(1)
+    # === CONVERT AND CLEAN DATA ===
+    df = df[EXPECTED_COLS].copy()
+    df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce")
+    df.dropna(subset=EXPECTED_COLS, inplace=True)
+    df["Date"] = (df["Date"].dt.strftime("%Y-%m-%d") if daily
+                  else resolution.format_timestamps(df["Date"], freq).to_numpy())
+    return df
 
 
-# === CLEAN COLUMNS ===
-df.columns = [col.strip() for col in df.columns]
+def _to_db_columns(df):
+    return df.rename(columns={
+        "Date": "date",
+        "Zone": "zone",
+        "Load [MW]": "load_mw"
+    })
 
-expected_cols = ["Date", "Zone", "Load [MW]"]
-if not all(col in df.columns for col in expected_cols):
-    print(f"❌ Missing required columns. Found: {list(df.columns)}")
-    exit(1)
 
-# === CONVERT AND CLEAN DATA ===
-df["Date"] = pd.to_datetime(df["Date"], dayfirst=True, errors="coerce").dt.strftime("%Y-%m-%d")
-df.dropna(subset=["Date", "Zone", "Load [MW]"], inplace=True)
+def iter_csv(path=CSV_PATH, daily=True, chunk_rows=CHUNK_ROWS):
+    """
+    Aggregated (date, zone, load_mw) frames of a Terna CSV, read `chunk_rows` lines at a time.
 
-# === AGGREGATE BY DATE AND ZONE ===
-agg_df = df.groupby(["Date", "Zone"], as_index=False)["Load [MW]"].sum()
+    Args:
+        daily (bool): sum each zone's readings per day (the historical layout); False keeps the
+            file's native hourly or 15-minute timestamps
+    """
+    carry, written_until, freq = None, None, None
+    for chunk in pd.read_csv(path, sep=";", encoding="utf-8", chunksize=chunk_rows):
+        with perf.stage("terna.parse", rows=len(chunk)):
+            df = _clean(chunk, daily, freq)
+        if df.empty:
+            continue
+        if freq is None:  # the first chunk fixes the storage format, so a midnight-only tail keeps its time
+            freq = "D" if daily or (df["Date"].str.len() == 10).all() else "h"
+        if written_until is not None and df["Date"].min() < written_until:
+            raise ValueError(f"{path}: rows are not in date order ({df['Date'].min()} after {written_until})")
+
+        # === AGGREGATE BY DATE AND ZONE, CARRYING THE LAST DATE INTO THE NEXT CHUNK ===
+        if carry is not None:
+            df = pd.concat([carry, df], ignore_index=True)
+        agg_df = df.groupby(["Date", "Zone"], as_index=False)["Load [MW]"].sum()
+        written_until = agg_df["Date"].max()
+        done = agg_df["Date"] < written_until
+        carry = agg_df[~done]
+        if done.any():
+            yield _to_db_columns(agg_df[done])
+    if carry is not None and not carry.empty:
+        yield _to_db_columns(carry)
+
+
+def load_csv(path=CSV_PATH, daily=True, chunk_rows=CHUNK_ROWS):
+    """Terna load rows of a whole file as one (date, zone, load_mw) frame."""
+    frames = list(iter_csv(path, daily, chunk_rows))
+    if not frames:
+        return pd.DataFrame(columns=["date", "zone", "load_mw"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def read_file(path, daily=True, chunk_rows=CHUNK_ROWS):
+    """Process-pool task: one (monthly) file, parsed in chunks and returned whole."""
+    return path, load_csv(path, daily, chunk_rows)
 
-# === RENAME COLUMNS FOR DATABASE ===
-agg_df.rename(columns={
-    "Date": "date",
-    "Zone": "zone",
-    "Load [MW]": "load_mw"
-}, inplace=True)
 
 # === WRITE TO DATABASE ===
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
+@perf.timed("terna.upsert", rows=lambda changed: changed)
+def upsert_load(conn, df):
+    """
+    Insert or update (date, zone) rows in a single transaction, rewriting only rows whose value
+    changed. Returns the number of rows inserted or changed.
+
+    Sub-daily rows replace the date-only row of their (zone, day), if one was stored before.
+    """
+    dates, zones = df["date"].tolist(), df["zone"].tolist()  # plain lists: iterating Arrow strings is slow
+    with conn:
+        dropped = resolution.drop_daily_rows(conn, "load_forecast", "date", zip(zones, dates), key_col="zone")
+        cursor = conn.executemany("""
+            INSERT INTO load_forecast (date, zone, load_mw) VALUES (?, ?, ?)
+            ON CONFLICT(zone, date) DO UPDATE SET load_mw = excluded.load_mw
+            WHERE load_mw IS NOT excluded.load_mw
+        """, zip(dates, zones, df["load_mw"].tolist()))
+        changed = max(cursor.rowcount, 0)
+        if changed or dropped:
+            schema.bump_data_version(conn, "load_forecast")
+    return changed
+
+
+class Ingest:
+    """Upserts frames in BATCH_ROWS transactions and tracks what the range-stats refresh needs."""
+
+    def __init__(self, conn, batch_rows=BATCH_ROWS):
+        self.conn = conn
+        self.batch_rows = batch_rows
+        self.pending = []
+        self.pending_rows = 0
+        self.rows = 0
+        self.changed = 0
+        self.first_date = None
+        self.zones = set()
+
+    def add(self, df):
+        if df.empty:
+            return
+        self.pending.append(df)
+        self.pending_rows += len(df)
+        self.rows += len(df)
+        first = df["date"].min()
+        self.first_date = first if self.first_date is None else min(self.first_date, first)
+        self.zones.update(df["zone"].unique().tolist())
+        if self.pending_rows >= self.batch_rows:
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.changed += upsert_load(self.conn, pd.concat(self.pending, ignore_index=True))
+        self.pending, self.pending_rows = [], 0
+
+
+def ingest_files(conn, paths, daily=True, workers=DEFAULT_WORKERS, chunk_rows=CHUNK_ROWS, batch_rows=BATCH_ROWS):
+    """
+    Stream one or more CSV files into load_forecast.
+
+    A single file (or workers=1) is streamed chunk by chunk in this process. Several files are
+    parsed in a process pool, one file per task; each parsed file is upserted here, by the only
+    writer, as soon as it is ready. Files should not overlap: a (date, zone) present in two files
+    keeps the value of the one written last.
+
+    Returns:
+        Ingest: rows read, rows changed, first date and zones touched
+    """
+    ingest = Ingest(conn, batch_rows)
+    if len(paths) == 1 or workers <= 1:
+        for path in paths:
+            for df in iter_csv(path, daily, chunk_rows):
+                ingest.add(df)
+            print(f"✅ {os.path.basename(path)}")
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            futures = [pool.submit(read_file, path, daily, chunk_rows) for path in paths]
+            for future in as_completed(futures):
+                path, df = future.result()
+                ingest.add(df)
+                ingest.flush()  # one file's rows never wait for another file
+                print(f"✅ {os.path.basename(path)}: {len(df)} rows")
+    ingest.flush()
+    return ingest
+
+
+def csv_paths(path):
+    """The CSV itself, or every *.csv of a directory in name order (monthly exports sort by date)."""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, "*.csv")))
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    return [path]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Load Terna load forecast CSVs into data.db")
+    parser.add_argument("--csv", default=CSV_PATH, help="Terna CSV export, or a directory of them (e.g. monthly)")
+    parser.add_argument("--native", action="store_true",
+                        help="keep the files' hourly or 15-minute timestamps instead of daily sums")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="files parsed at once (directories)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="CSV lines read at a time")
+    parser.add_argument("--batch-rows", type=int, default=BATCH_ROWS, help="rows upserted per transaction")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    return parser.parse_args()
+
 
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS load_forecast (
-    date TEXT,
-    zone TEXT,
-    load_mw REAL,
-    PRIMARY KEY (date, zone)
-)
-""")
+@perf.timed("terna", rows=None)
+def main():
+    args = parse_args()
+    try:
+        paths = csv_paths(args.csv)
+    except FileNotFoundError:
+        print(f"❌ File not found: {args.csv}")
+        sys.exit(1)
+    if not paths:
+        print(f"❌ No CSV files in {args.csv}")
+        sys.exit(1)
+    print(f"📥 {len(paths)} file(s)")
 
-agg_df.to_sql("load_forecast", conn, if_exists="replace", index=False)
+    conn = schema.connect(args.db)
+    started = time.perf_counter()
+    try:
+        ingest = ingest_files(conn, paths, daily=not args.native, workers=args.workers, chunk_rows=args.chunk_rows,
+                              batch_rows=args.batch_rows)
+    except ValueError as exc:
+        print(f"❌ {exc}")
+        conn.close()
+        sys.exit(1)
+    if ingest.changed:
+        range_stats.refresh(conn, "load_forecast", since=ingest.first_date[:10], keys=sorted(ingest.zones))
 
-print(f"✅ Data written to DB: {DB_PATH} (table: load_forecast)")
-preview = pd.read_sql("SELECT * FROM load_forecast LIMIT 5", conn)
-print("📊 Preview:")
-print(preview)
+    print(f"✅ {ingest.rows} rows read, {ingest.changed} inserted or changed in {args.db} (table: load_forecast)")
+    print(f"⏱️ {time.perf_counter() - started:.2f}s")
+    preview = pd.read_sql("SELECT * FROM load_forecast LIMIT 5", conn)
+    print("📊 Preview:")
+    print(preview)
 
-conn.close()
-print("🏁 Done.")
+    conn.close()
+    print("🏁 Done.")
 
 
+if __name__ == "__main__":
+    main()
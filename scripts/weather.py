@@ -1,18 +1,23 @@
+import argparse
 import os
-import sqlite3
-from datetime import datetime
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 import pandas as pd
-from meteostat import Point, Daily
 
 # === CONFIG ===
 
 START = datetime(2020, 1, 1)
 END = datetime(2024, 12, 31)
+DEFAULT_WORKERS = 8
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-DB_FOLDER = os.path.join(BASE_DIR, "db")
-os.makedirs(DB_FOLDER, exist_ok=True)
-DB_PATH = os.path.join(DB_FOLDER, "data.db")  # singolo DB
+sys.path.insert(0, BASE_DIR)
+
+from core import perf, range_stats, resolution, schema  # noqa: E402
+
+DB_PATH = schema.DB_PATH  # singolo DB
 
 CITIES = {
     "milano": (45.4642, 9.19),
@@ -26,45 +31,163 @@ CITIES = {
     "cagliari": (39.2238, 9.1217)
 }
 
-# === CONNESSIONE DB ===
-conn = sqlite3.connect(DB_PATH)
-cursor = conn.cursor()
-
-cursor.execute("""
-CREATE TABLE IF NOT EXISTS weather_data (
-    city TEXT,
-    time TEXT,
-    tavg REAL,
-    tmin REAL,
-    tmax REAL,
-    prcp REAL,
-    snow REAL,
-    wdir REAL,
-    wspd REAL,
-    wpgt REAL,
-    pres REAL,
-    tsun REAL,
-    PRIMARY KEY (city, time)
-)
-""")
-conn.commit()
+WEATHER_COLUMNS = ["tavg", "tmin", "tmax", "prcp", "snow", "wdir", "wspd", "wpgt", "pres", "tsun"]
+FREQUENCIES = ["D", "h"]  # Meteostat Daily / Hourly
 
-# === SCARICA E SALVA DATI ===
-for city, (lat, lon) in CITIES.items():
-    print(f"📥 Fetching weather data for {city.title()}")
-    point = Point(lat, lon)
-    df = Daily(point, START, END).fetch().reset_index()
 
-    if df.empty:
-        print(f"⚠️ No data for {city}")
-        continue
+# === FETCH SOURCES ===
+class MeteostatSource:
+    """Daily or hourly observations from the Meteostat API."""
+
+    def __init__(self, freq="D"):
+        self.freq = freq
+
+    def fetch(self, city, lat, lon, start, end):
+        from meteostat import Point, Daily, Hourly
+
+        if self.freq == "D":
+            return Daily(Point(lat, lon), start, end).fetch().reset_index()
+        df = Hourly(Point(lat, lon), start, end).fetch().reset_index()
+        # one reading per hour: it is the hour's average, minimum and maximum temperature
+        return df.assign(tavg=df["temp"], tmin=df["temp"], tmax=df["temp"])
+
+
+class FixtureSource:
+    """Daily observations read from `<folder>/<city>.csv` (columns: time + WEATHER_COLUMNS), for offline runs."""
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def fetch(self, city, lat, lon, start, end):
+        path = os.path.join(self.folder, f"{city}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        df = pd.read_csv(path, parse_dates=["time"])
+        return df[(df["time"] >= start) & (df["time"] <= end)].reset_index(drop=True)
+
+
+def load_cities(path):
+    """Read a city list from a CSV with columns city, lat, lon."""
+    df = pd.read_csv(path)
+    return {row.city.strip().lower(): (float(row.lat), float(row.lon)) for row in df.itertuples()}
+
+
+# === WATERMARKS ===
+def read_watermarks(conn):
+    """Latest stored timestamp per city, as {city: 'YYYY-MM-DD[ HH:MM:SS]'}."""
+    rows = conn.execute("SELECT city, MAX(time) FROM weather_data GROUP BY city")
+    return dict(rows.fetchall())
+
+
+def plan_fetches(conn, cities, start, end, refresh):
+    """(city, lat, lon, start, end) jobs; in refresh mode each city starts after its latest stored period."""
+    watermarks = read_watermarks(conn) if refresh else {}
+    jobs = []
+    for city, (lat, lon) in cities.items():
+        city_start = start
+        if city in watermarks:
+            latest = watermarks[city]
+            step = timedelta(days=1) if len(latest) == 10 else timedelta(hours=1)  # a stored day is complete
+            city_start = max(start, datetime.fromisoformat(latest) + step)
+        if city_start <= end:
+            jobs.append((city, lat, lon, city_start, end))
+    return jobs
+
 
-    df["time"] = df["time"].dt.strftime("%Y-%m-%d")  # Uniforma formato
+# === UPSERT ===
+def prepare_rows(df, city, freq="D"):
+    df = df.copy()
+    df["time"] = resolution.format_timestamps(df["time"], freq).to_numpy()  # Uniforma formato
     df["city"] = city
-    df = df[["city"] + [col for col in df.columns if col != "city"]]  # Ordine colonne
+    for col in WEATHER_COLUMNS:
+        if col not in df.columns:
+            df[col] = None
+    df = df[["city", "time"] + WEATHER_COLUMNS].astype(object)  # Ordine colonne
+    return df.where(df.notna(), None).itertuples(index=False, name=None)
+
+
+@perf.timed("weather.upsert", rows=lambda count: count)
+def upsert_city(conn, df, city, freq="D"):
+    """
+    Insert or update one city's rows in a single transaction. Returns the row count.
+
+    Hourly rows replace the date-only row of their day, if one was stored before.
+    """
+    rows = list(prepare_rows(df, city, freq))
+    columns = ", ".join(["city", "time"] + WEATHER_COLUMNS)
+    placeholders = ", ".join("?" * (len(WEATHER_COLUMNS) + 2))
+    updates = ", ".join(f"{col} = excluded.{col}" for col in WEATHER_COLUMNS)
+    with conn:
+        resolution.drop_daily_rows(conn, "weather_data", "time", ((city, row[1]) for row in rows), key_col="city")
+        conn.executemany(f"""
+            INSERT INTO weather_data ({columns}) VALUES ({placeholders})
+            ON CONFLICT(city, time) DO UPDATE SET {updates}
+        """, rows)
+        schema.bump_data_version(conn, "weather_data")
+    return len(rows)
+
+
+# === SCARICA E SALVA DATI ===
+def run(conn, jobs, source, workers=DEFAULT_WORKERS, freq="D"):
+    """Fetch all cities in a thread pool; each finished city is upserted from the calling thread."""
+    total = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(source.fetch, *job): job for job in jobs}
+        for future in as_completed(futures):
+            city, _, _, start, end = futures[future]
+            try:
+                df = future.result()
+            except Exception as exc:
+                print(f"❌ {city}: fetch failed ({exc})")
+                continue
+
+            if df.empty:
+                print(f"⚠️ No data for {city} ({start:%Y-%m-%d} → {end:%Y-%m-%d})")
+                continue
+
+            count = upsert_city(conn, df, city, freq)
+            total += count
+            print(f"✅ {city}: {count} rows upserted")
+    return total
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Download daily or hourly weather per city into data.db")
+    parser.add_argument("--refresh", action="store_true",
+                        help="fetch only the days after each city's latest stored day, up to today")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="concurrent city fetches")
+    parser.add_argument("--cities", help="CSV with columns city, lat, lon (default: built-in CITIES)")
+    parser.add_argument("--freq", choices=FREQUENCIES, default="D", help="Meteostat Daily (D) or Hourly (h)")
+    parser.add_argument("--fixtures", help="read <city>.csv files from this folder instead of Meteostat")
+    parser.add_argument("--db", default=DB_PATH, help="SQLite database path")
+    return parser.parse_args()
+
+
+@perf.timed("weather", rows=None)
+def main():
+    args = parse_args()
+
+    # === CONNESSIONE DB ===
+    conn = schema.connect(args.db)
+
+    cities = load_cities(args.cities) if args.cities else CITIES
+    source = FixtureSource(args.fixtures) if args.fixtures else MeteostatSource(args.freq)
+    end = datetime.combine(datetime.today().date(), datetime.min.time()) if args.refresh else END
+    if args.freq == "h":
+        end += timedelta(hours=23)  # Hourly's end is inclusive: take the last day's every hour
+
+    jobs = plan_fetches(conn, cities, START, end, args.refresh)
+    print(f"📥 Fetching weather data for {len(jobs)} of {len(cities)} cities")
+
+    started = time.perf_counter()
+    total = run(conn, jobs, source, workers=args.workers, freq=args.freq)
+    print(f"⏱️ {total} rows in {time.perf_counter() - started:.2f}s")
+    if jobs:
+        range_stats.refresh(conn, "weather_data", since=min(job[3] for job in jobs), keys=[job[0] for job in jobs])
+
+    conn.close()
+    print("🏁 Done.")
 
-    df.to_sql("weather_data", conn, if_exists="append", index=False)
-    print(f"✅ {city}: {len(df)} rows inserted")
 
-conn.close()
-print("🏁 Done.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import streamlit as st
+from core import downsample
+
+
+# === DOWNSAMPLED LINE CHART (shared by the tabs) ===
+def line_chart(data, method=downsample.DEFAULT_METHOD, width=None):
+    """
+    st.line_chart of at most ~`width` points per line, one per horizontal pixel; exact when the
+    selected range already fits.
+
+    Streamlit does not report how wide a chart renders, so the budget comes from the layout:
+
+    Args:
+        width (int): px of a chart the caller lays out narrower than the page (e.g. in st.columns);
+            the chart is drawn at exactly that width. None for a full-width chart, as every tab
+            draws today: a fixed budget of downsample.CHART_WIDTH, the content width of the app's
+            wide layout.
+
+    Not cached: reducing even years of 15-minute rows takes tens of milliseconds, less than
+    hashing the frame for st.cache_data, and the frame itself comes from the core.cache loaders.
+    """
+    points = width or downsample.CHART_WIDTH
+    chart = downsample.downsample(data, points, method) if len(data) > points else data
+    st.line_chart(chart, width=width or "stretch")
+    if len(chart) < len(data):
+        st.caption(f"Showing {len(chart):,} of {len(data):,} points ({method}); "
+                   "narrow the date range to see every point.")
@@ -0,0 +1,23 @@
+from functools import partial
+import streamlit as st
+from core import export
+
+
+# === DOWNLOAD BUTTONS (shared by the tabs) ===
+def download_buttons(table, file_stem, key=None, start=None, end=None, columns=None):
+    """
+    CSV and Parquet download buttons for one dataset slice.
+
+    The file is produced only when a button is clicked, streamed from SQLite by core.export,
+    so nothing is converted or cached per filter while the user browses.
+    """
+    col1, col2 = st.columns(2)
+    for col, (fmt, spec) in zip((col1, col2), export.FORMATS.items()):
+        col.download_button(
+            label=f"Download {spec['label']}",
+            data=partial(export.export_file, fmt, table, key, start, end, columns),
+            file_name=f"{file_stem}.{spec['extension']}",
+            mime=spec["mime"],
+            icon="⬇️",
+            key=f"download_{fmt}_{file_stem}"
+        )
@@ -1,11 +1,7 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import os
-
-# === DATABASE PATH ===
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "..", "db", "data.db")
+from core import cache, data_access, range_stats
+from tabs import charts, downloads
 
 # === STATIC DESCRIPTIONS FOR COMMODITIES ===
 COMMODITY_DESCRIPTIONS = {
@@ -17,35 +13,33 @@ COMMODITY_DESCRIPTIONS = {
 }
 
 # === LOAD DATA ===
-@st.cache_data
-def load_commodities():
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql("SELECT * FROM commodity_prices", conn, parse_dates=["date"])
+@cache.cached("commodity_prices")
+def load_commodity_names():
+    return data_access.distinct_keys("commodity_prices")
+
+
+@cache.cached("commodity_prices")
+def load_bounds(commodity):
+    return data_access.date_bounds("commodity_prices", key=commodity)
+
 
-# === CSV EXPORT FUNCTION ===
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode("utf-8")
+@cache.cached("commodity_prices")
+def load_commodities(commodity, start_date, end_date):
+    columns = ["commodity", "date", "price", "unit"]
+    return data_access.load("commodity_prices", key=commodity, start=start_date, end=end_date, columns=columns)
 
 # === MAIN FUNCTION ===
 def render():
     st.header("💰 Commodity Prices")
 
-    df_comm = load_commodities()
-    df_comm["date"] = df_comm["date"].dt.date
-
     # === COMMODITY SELECTION ===
-    options = ["overview"] + sorted(df_comm["commodity"].unique().tolist())
+    options = ["overview"] + load_commodity_names()
     selected_commodity = st.selectbox("🛢️ Select a commodity:", options)
 
-    if selected_commodity == "overview":
-        filtered = df_comm.copy()
-    else:
-        filtered = df_comm[df_comm["commodity"] == selected_commodity]
+    commodity = None if selected_commodity == "overview" else selected_commodity
 
     # === DATE FILTER ===
-    min_date = filtered["date"].min()
-    max_date = filtered["date"].max()
+    min_date, max_date = [pd.Timestamp(d).date() for d in load_bounds(commodity)]
     date_range = st.date_input("📅 Filter by date:",
                                [min_date, max_date],
                                min_value=min_date,
@@ -54,7 +48,11 @@ def render():
 
     if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
         start_date, end_date = date_range
-        filtered = filtered[(filtered["date"] >= start_date) & (filtered["date"] <= end_date)]
+        filtered = load_commodities(commodity, start_date.isoformat(), end_date.isoformat())
+        if filtered.empty:
+            st.info(f"No {selected_commodity} prices in the selected date range.")
+            return
+        filtered["date"] = filtered["date"].dt.date
 
         # === SHOW DESCRIPTION IF APPLICABLE ===
         if selected_commodity != "overview" and selected_commodity in COMMODITY_DESCRIPTIONS:
@@ -63,19 +61,22 @@ def render():
         # === SHOW STATS IF SINGLE COMMODITY ===
         if selected_commodity != "overview":
             st.subheader("📊 Summary Statistics")
+            stats = range_stats.summary("commodity_prices", "price", start_date.isoformat(), end_date.isoformat(),
+                                        key=commodity)
+            unit = filtered["unit"].iloc[0]
             col1, col2, col3, col4 = st.columns(4)
-            col1.metric("Mean", f"{filtered['price'].mean():.2f} {filtered['unit'].iloc[0]}")
-            col2.metric("Min", f"{filtered['price'].min():.2f} {filtered['unit'].iloc[0]}")
-            col3.metric("Max", f"{filtered['price'].max():.2f} {filtered['unit'].iloc[0]}")
-            col4.metric("Std Dev", f"{filtered['price'].std():.2f}")
+            col1.metric("Mean", f"{stats['mean']:.2f} {unit}")
+            col2.metric("Min", f"{stats['min']:.2f} {unit}")
+            col3.metric("Max", f"{stats['max']:.2f} {unit}")
+            col4.metric("Std Dev", f"{stats['std']:.2f}")
 
         # === CHART ===
         st.subheader("📈 Price Trends")
         if selected_commodity == "overview":
             chart_data = filtered.pivot(index="date", columns="commodity", values="price")
-            st.line_chart(chart_data)
+            charts.line_chart(chart_data)
         else:
-            st.line_chart(filtered.set_index("date")["price"])
+            charts.line_chart(filtered.set_index("date")["price"])
 
         # === TABLE ===
         st.subheader("📋 Data")
@@ -85,14 +86,8 @@ def render():
 
         # === DOWNLOAD ===
         st.subheader("📥 Download Data")
-        csv = convert_df_to_csv(filtered[columns_to_show])
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name=f"{selected_commodity.lower().replace(' ', '_')}_data.csv",
-            mime="text/csv",
-            icon="⬇️"
-        )
+        downloads.download_buttons("commodity_prices", f"{selected_commodity.lower().replace(' ', '_')}_data", key=commodity,
+                                   start=start_date.isoformat(), end=end_date.isoformat(), columns=columns_to_show)
 
         # === FOOTER ATTRIBUTION ===
         st.markdown(
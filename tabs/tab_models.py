@@ -1,11 +1,9 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
 import os
-
-# === DATABASE PATH ===
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "..", "db", "data.db")
+from contextlib import closing
+from core import cache, feature_store, predict, registry, schema
+from tabs import charts
 
 # === MODEL DESCRIPTIONS PLACEHOLDER ===
 MODEL_DESCRIPTIONS = {
@@ -18,12 +16,91 @@ MODEL_DESCRIPTIONS = {
     "LGBMRegressor": "da inserire dopo"
 }
 
+TEST_START = "2024-01-01"  # default prediction window: the notebook's test year
+
 # === LOAD MODEL RESULTS FROM DB ===
-@st.cache_data
+@cache.cached("model_results")
 def load_model_results():
-    with sqlite3.connect(DB_PATH) as conn:
+    with closing(schema.connect()) as conn:
         return pd.read_sql("SELECT * FROM model_results", conn)
 
+
+@cache.cached("model_registry")
+def load_registry():
+    return registry.list_models()
+
+
+@cache.cached(lambda dataset: dataset)
+def load_date_bounds(dataset):
+    return feature_store.date_bounds(dataset)
+
+
+@cache.cached(lambda dataset, features, start_date, end_date: predict.feature_table(dataset))
+def load_feature_rows(dataset, features, start_date, end_date):
+    return predict.read_rows(dataset, features, start_date, end_date)
+
+
+# === PREDICTION API (one warm instance per server process) ===
+@st.cache_resource
+def get_predictor():
+    return predict.Predictor()
+
+
+def render_predictions(model_name, entry):
+    """Live True vs Predicted for a registered model, scored through the prediction API."""
+    st.subheader(f"📈 Live Predictions (v{entry['version']}, {entry['created_at']})")
+
+    min_date, max_date = [bound.date() for bound in load_date_bounds(predict.feature_table(entry["dataset"]))]
+    default_start = max(min_date, pd.Timestamp(TEST_START).date())
+    date_range = st.date_input(
+        "📅 Select date range:",
+        [default_start, max_date],
+        min_value=min_date,
+        max_value=max_date,
+        key=f"prediction_range_{model_name}"
+    )
+    if not (isinstance(date_range, (list, tuple)) and len(date_range) == 2):
+        st.warning("Please select both a start and end date.")
+        return
+
+    start_date, end_date = date_range
+    rows = load_feature_rows(entry["dataset"], tuple(entry["features"]), start_date.isoformat(), end_date.isoformat())
+    if rows.empty:
+        st.warning("No feature rows in the selected range.")
+        return
+
+    predictor = get_predictor()
+    try:
+        if predictor.load(model_name)["version"] != entry["version"]:
+            predictor.reload(model_name)  # a newer version was registered since it was warmed
+            predictor.load(model_name)
+    except Exception as exc:  # missing or unloadable artifact (e.g. pickled by an older layout): retrain the model
+        st.warning(f"⚠️ Cannot load {model_name} v{entry['version']}: {exc}")
+        return
+    try:
+        predictions = predictor.predict(model_name, rows)
+    except ValueError as exc:  # e.g. features the stored tables no longer have: retrain the model
+        st.warning(f"⚠️ Cannot score {model_name} v{entry['version']}: {exc}")
+        return
+    horizons = predictor.load(model_name).get("horizons", 1)
+    if horizons > 1:  # forecasts issued on each row's date for D+1 ... D+horizons
+        labels = [f"D+{h}" for h in range(1, horizons + 1)]
+        horizon = labels.index(st.selectbox("🔭 Horizon:", labels, key=f"prediction_horizon_{model_name}")) + 1
+        truth = registry.horizon_targets(rows["date"].to_numpy(), rows["target_pun"], horizons)[:, horizon - 1]
+        chart = pd.DataFrame({"True": truth, "Predicted": predictions[:, horizon - 1]},
+                             index=rows["date"].dt.date).dropna()
+    else:
+        chart = pd.DataFrame({"True": rows["target_pun"].to_numpy(), "Predicted": predictions},
+                             index=rows["date"].dt.date)
+    charts.line_chart(chart)
+
+    stats = predictor.stats(model_name)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("MAE (range)", f"{(chart['True'] - chart['Predicted']).abs().mean():.2f} €/MWh")
+    col2.metric("Latency p50", f"{stats['p50_ms']:.2f} ms")
+    col3.metric("Latency p99", f"{stats['p99_ms']:.2f} ms")
+    col4.metric("Throughput", f"{stats['rows_per_s']:,.0f} rows/s")
+
 # === MAIN FUNCTION ===
 def render():
     st.header("🧠 Machine Learning Model Results")
@@ -39,14 +116,25 @@ def render():
 
     selected_model = st.selectbox("📂 Select a model:", options)
 
+    registered = load_registry().set_index("model_name")
+
     if selected_model == "overview":
         st.subheader("📋 All Model Results")
-        st.dataframe(
-            df_results.drop(columns=["image_path"]).sort_values(by="model_name"),
-            use_container_width=True
-        )
+        overview = df_results[df_results["horizon"] == 1].drop(columns=["image_path", "horizon"])
+        overview = overview.sort_values(by="model_name")
+        overview["horizons"] = overview["model_name"].map(df_results.groupby("model_name")["horizon"].max())
+        overview["registered_version"] = overview["model_name"].map(registered["version"]).astype("Int64")
+        st.dataframe(overview, use_container_width=True)
+
+        if df_results["horizon"].max() > 1:
+            st.subheader("📉 Test MAE by Horizon")
+            by_horizon = df_results.pivot(index="horizon", columns="model_name", values="test_mae")
+            by_horizon.index = [f"D+{h}" for h in by_horizon.index]
+            st.line_chart(by_horizon)
+            st.dataframe(by_horizon.T.round(2), use_container_width=True)
     else:
-        model_data = df_results[df_results["model_name"] == selected_model].iloc[0]
+        model_rows = df_results[df_results["model_name"] == selected_model].sort_values("horizon")
+        model_data = model_rows.iloc[0]  # D+1
 
         # === DESCRIPTION ===
         st.markdown(f"**About {selected_model}:** {MODEL_DESCRIPTIONS.get(selected_model, 'da inserire dopo')}")
@@ -63,11 +151,23 @@ def render():
         col5.metric("Test RMSE", f"{model_data['test_rmse']:.2f} €/MWh")
         col6.metric("Test R²", f"{model_data['test_r2']:.2f}")
 
-        # === IMAGE ===
+        if len(model_rows) > 1:
+            st.subheader("📉 Metrics by Horizon")
+            by_horizon = model_rows.set_index("horizon")[["val_mae", "test_mae", "val_rmse", "test_rmse",
+                                                          "val_r2", "test_r2"]]
+            by_horizon.index = [f"D+{h}" for h in by_horizon.index]
+            st.line_chart(by_horizon[["val_mae", "test_mae"]])
+            st.dataframe(by_horizon.round(3), use_container_width=True)
+
+        # === LIVE PREDICTIONS (static plot when the model is not in the registry) ===
+        if selected_model in registered.index:
+            render_predictions(selected_model, registry.describe(selected_model))
+            return
+
         st.subheader("📈 Prediction Plot")
+        st.info("Model not in the registry yet (train it with `python -m core.training`); showing the saved plot.")
         image_path = model_data["image_path"]
         if os.path.exists(image_path):
             st.image(image_path, use_container_width=True)
         else:
             st.error(f"Plot not found at: {image_path}")
-
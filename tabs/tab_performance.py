@@ -0,0 +1,108 @@
+import streamlit as st
+import pandas as pd
+from core import cache, perf
+
+# === PERIODS SHOWN ===
+PERIODS = {
+    "Last hour": pd.Timedelta(hours=1),
+    "Last 24 hours": pd.Timedelta(days=1),
+    "Last 7 days": pd.Timedelta(days=7),
+    "Last 30 days": pd.Timedelta(days=30),
+    "All": None,
+}
+
+
+# === LOAD EVENTS (uncached: perf_events has no data version and changes on every rerun) ===
+def load_events(period):
+    since = None if PERIODS[period] is None else (pd.Timestamp.now() - PERIODS[period]).isoformat()
+    return perf.read_events(since=since)
+
+
+def reruns_by_view(events):
+    """One row per view rerun: its wall time plus the calls, misses and time of its loaders."""
+    views = events[events["stage"].str.startswith("view:")]
+    loads = events[events["stage"].str.startswith("load:")]
+    per_run = loads.groupby("run").agg(loader_s=("wall_seconds", "sum"), calls=("stage", "size"),
+                                       misses=("detail", lambda detail: int((detail == "miss").sum())))
+    reruns = views.set_index("run")[["stage", "started_at", "wall_seconds"]].join(per_run)
+    reruns[["loader_s", "calls", "misses"]] = reruns[["loader_s", "calls", "misses"]].fillna(0)
+    reruns["view"] = reruns["stage"].str.removeprefix("view:")
+    return reruns.reset_index(drop=True)
+
+
+# === SECTIONS ===
+def render_stages(events):
+    st.subheader("📈 Stage Latency")
+    stages = sorted(set(events["stage"]) - {s for s in events["stage"] if s.startswith(("view:", "load:"))})
+    if not stages:
+        st.caption("No ingestion, pipeline or training stages recorded in this period.")
+        return
+    roots = sorted(set(events.loc[events["parent"].isna() & events["stage"].isin(stages), "stage"]))
+    selected = st.multiselect("🧩 Stages:", stages, default=roots or stages[:5], key="perf_stages")
+    chosen = events[events["stage"].isin(selected)]
+    if chosen.empty:
+        return
+    st.scatter_chart(chosen, x="started_at", y="wall_seconds", color="stage")
+    st.dataframe(perf.summary(chosen).round(4), width="stretch")
+
+
+def render_reruns(events):
+    st.subheader("🔁 Loader Cost per Rerun")
+    reruns = reruns_by_view(events)
+    if reruns.empty:
+        st.caption("No dashboard reruns recorded in this period.")
+        return
+    st.scatter_chart(reruns, x="started_at", y="loader_s", color="view")
+    grouped = reruns.groupby("view")
+    st.dataframe(pd.DataFrame({
+        "reruns": grouped.size(),
+        "median_s": grouped["wall_seconds"].median(),
+        "loader_median_s": grouped["loader_s"].median(),
+        "loader_p95_s": grouped["loader_s"].quantile(0.95),
+        "loader_calls": grouped["calls"].sum().astype(int),
+        "miss_rate": grouped["misses"].sum() / grouped["calls"].sum().where(lambda calls: calls > 0),
+    }).round(4), width="stretch")
+
+    loads = events[events["stage"].str.startswith("load:")]
+    if not loads.empty:
+        st.markdown("**Loaders**")
+        table = perf.summary(loads)
+        table["miss_rate"] = loads.groupby("stage")["detail"].apply(lambda detail: (detail == "miss").mean())
+        st.dataframe(table.round(4), width="stretch")
+
+
+def render_cache():
+    st.subheader("🗄️ Data Cache")
+    stats = cache.get_cache().stats()
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Hit rate", "–" if stats["hit_rate"] is None else f"{stats['hit_rate']:.0%}")
+    col2.metric("Hits", stats["hits"])
+    col3.metric("Misses", stats["misses"])
+    col4.metric("Size", f"{stats['bytes'] / 2**20:.1f} MiB")
+    if stats["datasets"]:
+        datasets = pd.DataFrame(stats["datasets"]).T
+        datasets["MiB"] = (datasets.pop("bytes") / 2**20).round(2)
+        st.dataframe(datasets, width="stretch")
+
+
+# === MAIN FUNCTION ===
+def render():
+    st.header("⏱️ Performance")
+
+    # === RECORDING SWITCH (process-wide: every session of this server) ===
+    recording = st.toggle("⏺️ Record timings", value=perf.enabled(), key="perf_recording")
+    if recording != perf.enabled():
+        perf.set_recording(recording)
+    if perf.enabled():
+        st.caption(f"Recording to {perf.sink()}. Scripts record when started with PERF_EVENTS=1.")
+    else:
+        st.caption("Not recording. Turn it on here, or start the app and the scripts with PERF_EVENTS=1.")
+
+    period = st.selectbox("📅 Period:", list(PERIODS), index=1, key="perf_period")
+    events = load_events(period)
+    if events.empty:
+        st.info("No timings recorded in this period.")
+    else:
+        render_stages(events)
+        render_reruns(events)
+    render_cache()
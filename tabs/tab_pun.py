@@ -1,22 +1,22 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import os
-
-# === DATABASE PATH ===
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "..", "db", "data.db")
+from core import cache, data_access, range_stats, resolution
+from tabs import charts, downloads
 
 # === LOAD DATA FROM DATABASE ===
-@st.cache_data
-def load_pun():
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql("SELECT * FROM pun_prices", conn, parse_dates=["date"])
+@cache.cached("pun_prices")
+def load_bounds():
+    return data_access.date_bounds("pun_prices")
+
+
+@cache.cached("pun_prices")
+def load_native_freq():
+    return data_access.native_freq("pun_prices")
+
 
-# === CONVERT DATAFRAME TO CSV ===
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode("utf-8")
+@cache.cached("pun_prices")
+def load_pun(start_date, end_date, freq=None):
+    return data_access.load("pun_prices", start=start_date, end=end_date, freq=freq)
 
 # === MAIN TAB FUNCTION ===
 def render():
@@ -26,13 +26,8 @@ def render():
         "The **PUN Index GME** is the reference index for the Italian electricity market. It represents the reference price of electricity traded on the MGP and is calculated by the GME according to Article 13 of Legislative Decree 210/21 and its amendments, following the procedures set out in Article 1, paragraph 2 of Ministerial Decree MASE April 18, 2024."
     )
 
-    # Load and preprocess data
-    df_pun = load_pun()
-    df_pun["date"] = df_pun["date"].dt.date
-
     # === DATE FILTER ===
-    min_date = df_pun["date"].min()
-    max_date = df_pun["date"].max()
+    min_date, max_date = [pd.Timestamp(d).date() for d in load_bounds()]
 
     date_range = st.date_input(
         "📅 Select date range:",
@@ -41,24 +36,29 @@ def render():
         max_value=max_date
     )
 
+    native = load_native_freq()
+    choices = {resolution.LABELS[f]: f for f in resolution.coarser(native)}
+    freq = choices[st.selectbox("⏱️ Resolution:", list(choices), key="pun_freq")]
+
     if isinstance(date_range, (list, tuple)) and len(date_range) == 2:
         start_date, end_date = date_range
 
-        filtered_pun = df_pun[
-            (df_pun["date"] >= start_date) & (df_pun["date"] <= end_date)
-        ]
+        filtered_pun = load_pun(start_date.isoformat(), end_date.isoformat(), None if freq == native else freq)
+        if not resolution.is_sub_daily(freq):
+            filtered_pun["date"] = filtered_pun["date"].dt.date
 
-        # === SUMMARY STATISTICS ===
+        # === SUMMARY STATISTICS (range-statistics index) ===
         st.subheader("📊 Summary Statistics")
+        stats = range_stats.summary("pun_prices", "price", start_date.isoformat(), end_date.isoformat())
         col1, col2, col3, col4 = st.columns(4)
-        col1.metric("Mean", f"{filtered_pun['price'].mean():.2f} €/MWh")
-        col2.metric("Min", f"{filtered_pun['price'].min():.2f} €/MWh")
-        col3.metric("Max", f"{filtered_pun['price'].max():.2f} €/MWh")
-        col4.metric("Std Dev", f"{filtered_pun['price'].std():.2f}")
+        col1.metric("Mean", f"{stats['mean']:.2f} €/MWh")
+        col2.metric("Min", f"{stats['min']:.2f} €/MWh")
+        col3.metric("Max", f"{stats['max']:.2f} €/MWh")
+        col4.metric("Std Dev", f"{stats['std']:.2f}")
 
         # === PLOT PRICE TREND ===
-        st.subheader("📈 Daily PUN Price")
-        st.line_chart(filtered_pun.set_index("date")["price"])
+        st.subheader(f"📈 {resolution.LABELS[freq]} PUN Price")
+        charts.line_chart(filtered_pun.set_index("date")["price"])
 
         # === DISPLAY TABLE ===
         st.subheader("📋 Data")
@@ -66,14 +66,8 @@ def render():
 
         # === DOWNLOAD SECTION ===
         st.subheader("📥 Download Data")
-        csv = convert_df_to_csv(filtered_pun)
-        st.download_button(
-            label="Download CSV",
-            data=csv,
-            file_name="pun_filtered_data.csv",
-            mime="text/csv",
-            icon="⬇️"
-        )
+        downloads.download_buttons("pun_prices", "pun_filtered_data", start=start_date.isoformat(),
+                                   end=end_date.isoformat())
 
         # === FOOTER ATTRIBUTION ===
         st.markdown(
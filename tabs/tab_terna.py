@@ -1,32 +1,34 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import os
-
-# === DATABASE PATH ===
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "..", "db", "data.db")
+from core import cache, data_access, range_stats, resolution
+from tabs import charts, downloads
 
 # === LOAD FORECAST DATA ===
-@st.cache_data
-def load_forecast():
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql("SELECT * FROM load_forecast", conn, parse_dates=["date"])
+@cache.cached("load_forecast")
+def load_zones():
+    return data_access.distinct_keys("load_forecast")
+
+
+@cache.cached("load_forecast")
+def load_bounds(zone):
+    return data_access.date_bounds("load_forecast", key=zone)
+
+
+@cache.cached("load_forecast")
+def load_native_freq(zone):
+    return data_access.native_freq("load_forecast", key=zone)
 
-# === CONVERT TO CSV ===
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode("utf-8")
+
+@cache.cached("load_forecast")
+def load_forecast(zone, start_date, end_date, freq=None):
+    return data_access.load("load_forecast", key=zone, start=start_date, end=end_date, freq=freq)
 
 # === MAIN TAB RENDER FUNCTION ===
 def render():
     st.header("🌀 Load Forecast")
 
-    df = load_forecast()
-    df["date"] = df["date"].dt.date
-
     # === ZONE SELECTION ===
-    zone_options = sorted(df["zone"].unique().tolist())
+    zone_options = load_zones()
     normalized_zones = [z.lower() for z in zone_options]
 
     if "italy" in normalized_zones:
@@ -37,8 +39,7 @@ def render():
     selected_zone = st.selectbox("🏞️ Select a zone:", zone_options, index=default_index)
 
     # === DATE FILTER ===
-    min_date = df["date"].min()
-    max_date = df["date"].max()
+    min_date, max_date = [pd.Timestamp(d).date() for d in load_bounds(selected_zone)]
     date_range = st.date_input(
         "🗓️ Select date range:",
         [min_date, max_date],
@@ -53,39 +54,39 @@ def render():
 
     start_date, end_date = date_range
 
+    # === RESOLUTION (sub-daily readings are MW; coarser buckets sum to MWh) ===
+    native = load_native_freq(selected_zone)
+    choices = {resolution.LABELS[f]: f for f in resolution.coarser(native)}
+    freq = choices[st.selectbox("⏱️ Resolution:", list(choices), key="load_forecast_freq")]
+
     # === FILTER DATA ===
-    filtered = df[
-        (df["zone"] == selected_zone) &
-        (df["date"] >= start_date) &
-        (df["date"] <= end_date)
-    ]
+    filtered = load_forecast(selected_zone, start_date.isoformat(), end_date.isoformat(),
+                             None if freq == native else freq)
+    if not resolution.is_sub_daily(freq):
+        filtered["date"] = filtered["date"].dt.date
 
     # === STATISTICS ===
     st.subheader("📊 Summary Statistics")
+    stats = range_stats.summary("load_forecast", "load_mw", start_date.isoformat(), end_date.isoformat(),
+                                key=selected_zone)
     col1, col2, col3, col4 = st.columns(4)
-    col1.metric("Mean", f"{filtered['load_mw'].mean():,.0f} MW")
-    col2.metric("Min", f"{filtered['load_mw'].min():,.0f} MW")
-    col3.metric("Max", f"{filtered['load_mw'].max():,.0f} MW")
-    col4.metric("Std Dev", f"{filtered['load_mw'].std():,.0f}")
+    col1.metric("Mean", f"{stats['mean']:,.0f} MW")
+    col2.metric("Min", f"{stats['min']:,.0f} MW")
+    col3.metric("Max", f"{stats['max']:,.0f} MW")
+    col4.metric("Std Dev", f"{stats['std']:,.0f}")
 
     # === LINE CHART ===
     st.subheader("📈 Load Forecast Trend")
-    st.line_chart(filtered.set_index("date")["load_mw"])
+    charts.line_chart(filtered.set_index("date")["load_mw"])
 
     # === TABLE VIEW ===
     st.subheader("📋 Data")
     st.dataframe(filtered.sort_values(by=["zone", "date"]), use_container_width=True)
 
-    # === DOWNLOAD CSV ===
+    # === DOWNLOAD ===
     st.subheader("📥 Download Data")
-    csv = convert_df_to_csv(filtered)
-    st.download_button(
-        label="Download CSV",
-        data=csv,
-        file_name=f"load_forecast_{selected_zone.lower().replace(' ', '_')}.csv",
-        mime="text/csv",
-        icon="⬇️"
-    )
+    downloads.download_buttons("load_forecast", f"load_forecast_{selected_zone.lower().replace(' ', '_')}", key=selected_zone,
+                               start=start_date.isoformat(), end=end_date.isoformat())
 
     # === ATTRIBUTION ===
     st.markdown(
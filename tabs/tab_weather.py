@@ -1,35 +1,38 @@
 import streamlit as st
 import pandas as pd
-import sqlite3
-import os
+from core import cache, data_access, range_stats, resolution
+from tabs import charts, downloads
 
-# === DATABASE CONNECTION ===
-BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DB_PATH = os.path.join(BASE_DIR, "..", "db", "data.db")
+WEATHER_COLS = ["time", "tavg", "tmin", "tmax", "prcp", "wspd"]
 
 # === LOAD WEATHER DATA ===
-@st.cache_data
-def load_weather():
-    with sqlite3.connect(DB_PATH) as conn:
-        return pd.read_sql("SELECT * FROM weather_data", conn, parse_dates=["time"])
+@cache.cached("weather_data")
+def load_cities():
+    return data_access.distinct_keys("weather_data")
 
-# === CONVERT TO CSV ===
-@st.cache_data
-def convert_df_to_csv(df):
-    return df.to_csv(index=False).encode("utf-8")
+
+@cache.cached("weather_data")
+def load_bounds(city):
+    return data_access.date_bounds("weather_data", key=city)
+
+
+@cache.cached("weather_data")
+def load_native_freq(city):
+    return data_access.native_freq("weather_data", key=city)
+
+
+@cache.cached("weather_data")
+def load_weather(city, start_date, end_date, freq=None):
+    return data_access.load("weather_data", key=city, start=start_date, end=end_date, columns=WEATHER_COLS, freq=freq)
 
 # === MAIN TAB ===
 def render():
     st.header("🌦️ Weather Data")
 
-    df_weather = load_weather()
-    df_weather["time"] = df_weather["time"].dt.date
-
-    cities = sorted(df_weather["city"].unique().tolist())
+    cities = load_cities()
     selected_city = st.selectbox("🏙️ Select a city:", cities)
 
-    min_date = df_weather["time"].min()
-    max_date = df_weather["time"].max()
+    min_date, max_date = [pd.Timestamp(d).date() for d in load_bounds(selected_city)]
 
     date_input = st.date_input(
         "🗓️ Select date range:",
@@ -45,46 +48,45 @@ def render():
         st.warning("Please select both start and end dates.")
         return
 
-    filtered = df_weather[
-        (df_weather["city"] == selected_city) &
-        (df_weather["time"] >= start_date) &
-        (df_weather["time"] <= end_date)
-    ]
+    native = load_native_freq(selected_city)
+    choices = {resolution.LABELS[f]: f for f in resolution.coarser(native)}
+    freq = choices[st.selectbox("⏱️ Resolution:", list(choices), key="weather_freq")]
+
+    filtered = load_weather(selected_city, start_date.isoformat(), end_date.isoformat(),
+                            None if freq == native else freq)
+    if not resolution.is_sub_daily(freq):
+        filtered["time"] = filtered["time"].dt.date
 
     # === SUMMARY STATISTICS ===
     st.subheader("📊 Summary Statistics")
+    start, end = start_date.isoformat(), end_date.isoformat()
+    stats = {col: range_stats.summary("weather_data", col, start, end, key=selected_city)
+             for col in ["tavg", "tmin", "tmax", "prcp", "wspd"]}
     col1, col2, col3, col4, col5 = st.columns(5)
-    col1.metric("Avg Temp", f"{filtered['tavg'].mean():.1f} °C")
-    col2.metric("Min Temp", f"{filtered['tmin'].min():.1f} °C")
-    col3.metric("Max Temp", f"{filtered['tmax'].max():.1f} °C")
-    col4.metric("Precipitation", f"{filtered['prcp'].mean():.1f} mm")
-    col5.metric("Wind Speed", f"{filtered['wspd'].mean():.1f} km/h")
+    col1.metric("Avg Temp", f"{stats['tavg']['mean']:.1f} °C")
+    col2.metric("Min Temp", f"{stats['tmin']['min']:.1f} °C")
+    col3.metric("Max Temp", f"{stats['tmax']['max']:.1f} °C")
+    col4.metric("Precipitation", f"{stats['prcp']['mean']:.1f} mm")
+    col5.metric("Wind Speed", f"{stats['wspd']['mean']:.1f} km/h")
 
     # === CHARTS ===
-    st.subheader(f"🌡️ Daily Avg Temperature - {selected_city.title()}")
-    st.line_chart(filtered.set_index("time")["tavg"])
+    st.subheader(f"🌡️ {resolution.LABELS[freq]} Avg Temperature - {selected_city.title()}")
+    charts.line_chart(filtered.set_index("time")["tavg"])
 
-    st.subheader(f"🌧️ Daily Precipitation - {selected_city.title()}")
-    st.line_chart(filtered.set_index("time")["prcp"])
+    st.subheader(f"🌧️ {resolution.LABELS[freq]} Precipitation - {selected_city.title()}")
+    charts.line_chart(filtered.set_index("time")["prcp"], method="minmax")  # keep rain spikes
 
-    st.subheader(f"💨 Daily Wind Speed - {selected_city.title()}")
-    st.line_chart(filtered.set_index("time")["wspd"])
+    st.subheader(f"💨 {resolution.LABELS[freq]} Wind Speed - {selected_city.title()}")
+    charts.line_chart(filtered.set_index("time")["wspd"])
 
     # === TABLE ===
     st.subheader("📋 Data")
-    weather_cols = ["time", "tavg", "tmin", "tmax", "prcp", "wspd"]
-    st.dataframe(filtered[weather_cols], use_container_width=True)
+    st.dataframe(filtered[WEATHER_COLS], use_container_width=True)
 
-    # === CSV DOWNLOAD ===
+    # === DOWNLOAD ===
     st.subheader("📥 Download Data")
-    csv = convert_df_to_csv(filtered[weather_cols])
-    st.download_button(
-        label="Download CSV",
-        data=csv,
-        file_name=f"weather_data_{selected_city.lower()}.csv",
-        mime="text/csv",
-        icon="⬇️"
-    )
+    downloads.download_buttons("weather_data", f"weather_data_{selected_city.lower()}", key=selected_city,
+                               start=start_date.isoformat(), end=end_date.isoformat(), columns=WEATHER_COLS)
 
     # === FOOTER ATTRIBUTION ===
     st.markdown(
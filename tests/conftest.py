@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.insert(0, os.path.join(BASE_DIR, "benchmarks"))
+
+import synthetic  # noqa: E402
+
+
+# === SYNTHETIC DATABASES (benchmarks/synthetic.py, small key counts) ===
+@pytest.fixture
+def daily_db(tmp_path):
+    """One year of daily data ending 2024-12-31: 3 zones, 2 cities, 2 commodities."""
+    db_path = str(tmp_path / "data.db")
+    synthetic.generate(db_path, years=1, freq="D", zones=3, cities=2, commodities=2)
+    return db_path
+
+
+@pytest.fixture
+def hourly_db(tmp_path):
+    """One year of hourly PUN, load and weather ending 2024-12-31 (commodities stay daily)."""
+    db_path = str(tmp_path / "data.db")
+    synthetic.generate(db_path, years=1, freq="h", zones=2, cities=1, commodities=2)
+    return db_path
@@ -0,0 +1,69 @@
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from core import backtest, schema
+
+
+def _forecasts(dates):
+    return pd.DataFrame({"model_name": "RidgeCV", "date": pd.to_datetime(dates), "forecast": 100.0,
+                         "actual": 101.0, "refit": 0})
+
+
+def test_save_forecasts_keeps_sub_daily_times(tmp_path):
+    dates = pd.date_range("2024-12-01", periods=48, freq="h")
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn:
+        assert backtest.save_forecasts(conn, _forecasts(dates)) == 48
+        stored = [row[0] for row in conn.execute("SELECT date FROM backtest_forecasts ORDER BY date")]
+    assert stored == dates.strftime("%Y-%m-%d %H:%M:%S").tolist()
+
+
+def test_save_forecasts_keeps_daily_dates(tmp_path):
+    dates = pd.date_range("2024-12-01", periods=7, freq="D")
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn:
+        backtest.save_forecasts(conn, _forecasts(dates))
+        backtest.save_forecasts(conn, _forecasts(dates))  # a rerun replaces the model's rows
+        stored = [row[0] for row in conn.execute("SELECT date FROM backtest_forecasts ORDER BY date")]
+    assert stored == dates.strftime("%Y-%m-%d").tolist()
+
+
+class _Model:
+    def predict(self, X):
+        return np.zeros(len(X))
+
+
+def _segment(tmp_path, monkeypatch, freq, origins, window="expanding"):
+    """Run one cold segment over synthetic rows; returns the dates and the (first, last) row of each fit."""
+    dates = pd.date_range("2024-01-01", periods=24 * 40 if freq == "h" else 800, freq=freq)
+    paths = {part: str(tmp_path / f"{part}.npy") for part in ("X", "y", "dates")}
+    np.save(paths["X"], np.arange(len(dates), dtype="float64").reshape(-1, 1))  # X holds the row position
+    np.save(paths["y"], np.zeros(len(dates)))
+    np.save(paths["dates"], dates.to_numpy().astype("datetime64[s]" if freq == "h" else "datetime64[D]"))
+    trained = []
+
+    def fit_cold(family, X, y, threads):
+        trained.append((int(X[0, 0]), int(X[-1, 0])))
+        return _Model()
+    monkeypatch.setattr(backtest, "fit_cold", fit_cold)
+    backtest.run_segment("RidgeCV", paths, origins, 1, window, True, 1)
+    return dates, trained
+
+
+def test_sub_daily_training_ends_a_day_before_the_origin(tmp_path, monkeypatch):
+    origin = 24 * 10 + 5  # 2024-01-11 05:00: rows up to 2024-01-10 05:00 have known targets
+    dates, trained = _segment(tmp_path, monkeypatch, "h", [origin])
+    assert trained == [(0, origin - 24)]
+    assert dates[origin - 24] + pd.Timedelta(days=1) == dates[origin]
+
+
+def test_daily_training_uses_every_row_before_the_origin(tmp_path, monkeypatch):
+    _, trained = _segment(tmp_path, monkeypatch, "D", [100])
+    assert trained == [(0, 99)]
+
+
+def test_sliding_window_spans_days_at_any_resolution(tmp_path, monkeypatch):
+    monkeypatch.setattr(backtest, "SLIDING_DAYS", 7)
+    origin = 24 * 30
+    _, trained = _segment(tmp_path, monkeypatch, "h", [origin], window="sliding")
+    assert trained == [(origin - 7 * 24, origin - 24)]
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from core import cache, feature_store, schema
+
+
+def test_feature_store_writes_invalidate_cached_reads(monkeypatch, tmp_path):
+    db_path = str(tmp_path / "data.db")
+    monkeypatch.setattr(schema, "DB_PATH", db_path)
+    monkeypatch.setattr(feature_store, "FEATURE_DIR", str(tmp_path / "features"))  # the live store
+    root = feature_store.FEATURE_DIR
+    df = pd.DataFrame({"date": pd.date_range("2024-01-01", periods=10), "target_pun": 100.0})
+    feature_store.write_dataset(df, "pun_model_features", root=root)
+
+    data = cache.DataCache(db_path)
+    loads = []
+
+    def bounds():
+        loads.append(1)
+        return feature_store.date_bounds("pun_model_features", root=root)
+
+    assert data.get("pun_model_features", "bounds", bounds)[1] == pd.Timestamp("2024-01-10")
+    data.get("pun_model_features", "bounds", bounds)
+    assert len(loads) == 1
+
+    # written directly (as the notebook does), not through core.pipeline
+    feature_store.append_dataset(df.assign(date=df["date"] + pd.Timedelta(days=10)), "pun_model_features",
+                                 root=root)
+    assert data.get("pun_model_features", "bounds", bounds)[1] == pd.Timestamp("2024-01-20")
+    assert len(loads) == 2
@@ -0,0 +1,19 @@
+from contextlib import closing
+
+import pandas as pd
+
+from core import data_access, schema
+
+
+def test_mixed_daily_and_hourly_dates_all_parse(daily_db):
+    hours = pd.date_range("2025-01-01", periods=24, freq="h")
+    with closing(schema.connect(daily_db)) as conn, conn:
+        conn.executemany("INSERT INTO pun_prices (date, price) VALUES (?, ?)",
+                         [(stamp.strftime("%Y-%m-%d %H:%M:%S"), 100.0) for stamp in hours])
+        stored = conn.execute("SELECT COUNT(*) FROM pun_prices").fetchone()[0]
+
+    df = data_access.load("pun_prices", db_path=daily_db)
+    assert len(df) == stored
+    assert df["date"].notna().all()
+    assert df["date"].iloc[-1] == hours[-1]
+    assert (df["date"].iloc[:-24] == df["date"].iloc[:-24].dt.normalize()).all()  # daily history keeps its dates
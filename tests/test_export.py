@@ -0,0 +1,22 @@
+import io
+import os
+
+import pytest
+
+from core import export
+
+
+@pytest.mark.parametrize("fmt", list(export.FORMATS))
+def test_export_file_returns_bytes_and_leaves_nothing_open(daily_db, fmt, tmp_path, monkeypatch):
+    monkeypatch.setattr(export.tempfile, "tempdir", str(tmp_path))
+    expected = io.BytesIO()
+    write = export.write_csv if fmt == "csv" else export.write_parquet
+    write(expected, "commodity_prices", key="brent", db_path=daily_db)
+
+    open_fds = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else None
+    for _ in range(3):
+        data = export.export_file(fmt, "commodity_prices", key="brent", db_path=daily_db)
+    assert data == expected.getvalue()
+    assert not [name for name in os.listdir(tmp_path) if name.startswith("commodity_prices-")]
+    if open_fds is not None:
+        assert len(os.listdir("/proc/self/fd")) == open_fds
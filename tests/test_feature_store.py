@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from core import feature_store
+
+
+def test_append_with_fewer_columns_keeps_the_stored_ones(tmp_path):
+    root = str(tmp_path)
+    dates = pd.date_range("2024-12-25", periods=5)
+    stored = pd.DataFrame({"date": dates, "pun_Price": np.arange(5.0), "coal_Price": np.arange(5.0) * 10,
+                           "target_pun": np.arange(5.0) + 1})
+    feature_store.write_dataset(stored, "features", root=root)
+
+    # the last stored day gets a new price, two new days arrive without coal_Price
+    appended = pd.DataFrame({"date": pd.date_range("2024-12-29", periods=3), "pun_Price": [40.0, 50.0, 60.0],
+                             "target_pun": [5.0, 6.0, 7.0]})
+    feature_store.append_dataset(appended, "features", root=root)
+
+    df = feature_store.read_dataset("features", root=root).set_index("date")
+    assert feature_store.list_columns("features", root) == ["date", "pun_Price", "coal_Price", "target_pun"]
+    assert df["coal_Price"].iloc[:5].tolist() == [0.0, 10.0, 20.0, 30.0, 40.0]  # kept, also on the updated day
+    assert df["pun_Price"].tolist() == [0.0, 1.0, 2.0, 3.0, 40.0, 50.0, 60.0]
+    assert df["coal_Price"].iloc[5:].isna().all()
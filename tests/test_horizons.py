@@ -0,0 +1,36 @@
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+from core import feature_store, schema, training
+
+
+def test_multi_horizon_targets_are_later_days_and_skip_unknown_ones(tmp_path):
+    dates = pd.date_range("2024-01-01", periods=10).delete(5)  # 2024-01-06 missing
+    df = pd.DataFrame({"date": dates, "f1": np.arange(9.0), "target_pun": np.arange(9.0) * 10})
+    root = str(tmp_path / "features")
+    feature_store.write_dataset(df, "features", root=root)
+
+    shared = training.share_datasets(["features"], str(tmp_path), root=root, horizons=3)["features"]
+    y, kept = np.load(shared["y"]), np.load(shared["dates"])
+
+    # rows whose D+2 or D+3 target is missing (the gap, the last days) are left out
+    assert kept.astype("datetime64[D]").astype(str).tolist() == [
+        "2024-01-01", "2024-01-02", "2024-01-03", "2024-01-07", "2024-01-08"]
+    assert y.tolist() == [[0, 10, 20], [10, 20, 30], [20, 30, 40], [50, 60, 70], [60, 70, 80]]
+
+
+def _result(model_name, horizons):
+    metrics = {"MAE": 1.0, "RMSE": 2.0, "R2": 0.5}
+    return {"model_name": model_name, "val": metrics, "test": metrics, "wall_seconds": 1.0, "cpu_seconds": 1.0,
+            "threads": 1, "horizons": [{"horizon": h, "val": metrics, "test": {**metrics, "MAE": float(h)}}
+                                       for h in range(1, horizons + 1)]}
+
+
+def test_results_are_stored_one_row_per_horizon(tmp_path):
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn:
+        training.save_result(conn, _result("RidgeCV", 7), image_path="images/RidgeCV.png")
+        training.save_result(conn, _result("RidgeCV", 3))  # a shorter rerun drops D+4 ... D+7
+        rows = conn.execute("SELECT horizon, test_mae, image_path FROM model_results ORDER BY horizon").fetchall()
+    assert rows == [(1, 1.0, "images/RidgeCV.png"), (2, 2.0, None), (3, 3.0, None)]
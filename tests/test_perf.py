@@ -0,0 +1,35 @@
+import pytest
+from core import perf
+
+
+@pytest.fixture(autouse=True)
+def perf_state(monkeypatch):
+    """Restore the module's recording state after each test."""
+    for name in ("_enabled", "_sink", "_memory", "_buffer"):
+        monkeypatch.setattr(perf, name, getattr(perf, name))
+    yield
+    perf.flush()
+
+
+def test_pausing_keeps_the_configured_sink(tmp_path):
+    path = str(tmp_path / "events.jsonl")
+    perf.configure(path)
+    with perf.stage("test.before"):
+        pass
+    perf.set_recording(False)
+    assert not perf.enabled() and perf.sink() == path
+    with perf.stage("test.paused"):
+        pass
+    perf.set_recording(True)
+    assert perf.enabled() and perf.sink() == path
+    with perf.stage("test.after"):
+        pass
+
+    assert perf.read_events()["stage"].tolist() == ["test.before", "test.after"]
+
+
+def test_recording_defaults_to_the_database(monkeypatch, tmp_path):
+    monkeypatch.setattr(perf.schema, "DB_PATH", str(tmp_path / "data.db"))
+    perf.configure(None)
+    perf.set_recording(True)
+    assert perf.enabled() and perf.sink() == str(tmp_path / "data.db")
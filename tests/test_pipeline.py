@@ -0,0 +1,63 @@
+from contextlib import closing
+
+import pandas as pd
+import pytest
+
+from core import pipeline, schema
+
+LATE = {  # (table, key column, key, date column): rows held back after this day
+    ("load_forecast", "zone", "Calabria", "date"): "2024-12-20",
+    ("commodity_prices", "commodity", "brent", "date"): "2024-12-16",
+}
+
+
+@pytest.fixture(autouse=True)
+def one_year(monkeypatch):
+    monkeypatch.setattr(pipeline, "START_DATE", "2024-01-01")
+
+
+def _hold_back(db_path):
+    """Delete the late keys' recent rows; returns a function storing them again."""
+    held = {}
+    with closing(schema.connect(db_path)) as conn, conn:
+        for (table, key_col, key, date_col), after in LATE.items():
+            where = f"{key_col} = ? AND {date_col} > ?"
+            held[table] = pd.read_sql(f"SELECT * FROM {table} WHERE {where}", conn, params=[key, after])
+            conn.execute(f"DELETE FROM {table} WHERE {where}", [key, after])
+
+    def arrive():
+        with closing(schema.connect(db_path)) as conn, conn:
+            for table, rows in held.items():
+                rows.to_sql(table, conn, if_exists="append", index=False)
+    return arrive
+
+
+def test_late_keys_hold_back_readiness(daily_db):
+    assert pipeline.ready_until(daily_db) == pd.Timestamp("2024-12-30")
+    _hold_back(daily_db)
+    assert pipeline.ready_until(daily_db) == pd.Timestamp("2024-12-16")
+    # a table without the late zone's and commodity's columns is not held back by them
+    assert pipeline.ready_until(daily_db, ["date", "pun_Price", "coal_Price", "Centre-North_Load"]) == \
+        pd.Timestamp("2024-12-30")
+
+
+def test_stale_key_no_longer_gates(daily_db):
+    with closing(schema.connect(daily_db)) as conn, conn:
+        conn.execute("DELETE FROM load_forecast WHERE zone = 'Calabria' AND date > '2024-10-31'")
+    assert pipeline.ready_until(daily_db) == pd.Timestamp("2024-12-30")
+
+
+def test_incremental_with_late_keys_matches_full_rebuild(daily_db):
+    arrive = _hold_back(daily_db)
+    first, state = pipeline.build_full(end="2024-11-30", db_path=daily_db)
+    assert {"Calabria_Load", "brent_Price"} <= set(state["columns"])
+
+    early, state = pipeline.build_incremental(state, db_path=daily_db)  # stops where the late keys stop
+    assert state["last_date"] == "2024-12-16"
+    arrive()
+    late, state = pipeline.build_incremental(state, db_path=daily_db)
+    assert state["last_date"] == "2024-12-30"
+
+    appended = pd.concat([first, early, late], ignore_index=True)
+    rebuilt, _ = pipeline.build_full(end=state["last_date"], columns=state["columns"], db_path=daily_db)
+    pd.testing.assert_frame_equal(appended, rebuilt)
@@ -0,0 +1,48 @@
+from contextlib import closing
+
+import pandas as pd
+
+from core import schema
+from scripts import pun
+
+
+def _csv(path, day, column, periods):
+    lines = [f"Data;{column};Prezzo"] + [f"{day};{n};{100 + n},5" for n in range(1, periods + 1)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_fall_back_day_keeps_all_25_hours(tmp_path):
+    parsed = pun.load_csv(_csv(tmp_path / "pun.csv", "20241027", "Ora", 25))
+
+    assert len(parsed) == 25 and not parsed.duplicated(["date", "fold"]).any()
+    assert parsed["date"].str.startswith("2024-10-27").all()
+    assert sorted(parsed["price"]) == [100.5 + n for n in range(1, 26)]
+    # hours 3 and 4 are both 02:00 local time: summer time first, then winter time (fold 1)
+    repeated = parsed[parsed["date"] == "2024-10-27 02:00:00"].set_index("fold")["price"]
+    assert repeated.to_dict() == {0: 103.5, 1: 104.5}
+    assert (pd.to_datetime(parsed["date"]).dt.minute == 0).all()
+    assert parsed["date"].iloc[-1] == "2024-10-27 23:00:00"
+
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn:
+        assert pun.upsert_prices(conn, parsed) == 25
+        assert pun.changed_rows(conn, pun.load_csv(str(tmp_path / "pun.csv"))).empty  # a rerun changes nothing
+        mean = conn.execute("SELECT AVG(price) FROM pun_prices WHERE substr(date, 1, 10) = '2024-10-27'").fetchone()[0]
+    assert mean == sum(100.5 + n for n in range(1, 26)) / 25
+
+
+def test_fall_back_day_keeps_all_100_quarter_hours(tmp_path):
+    parsed = pun.load_csv(_csv(tmp_path / "pun.csv", "20241027", "Periodo", 100))
+
+    assert len(parsed) == 100 and not parsed.duplicated(["date", "fold"]).any()
+    assert parsed["fold"].sum() == 4  # 02:00, 02:15, 02:30, 02:45 a second time
+    assert (pd.to_datetime(parsed["date"]).dt.minute % 15 == 0).all()
+
+
+def test_spring_forward_day_skips_the_missing_hour(tmp_path):
+    parsed = pun.load_csv(_csv(tmp_path / "pun.csv", "20240331", "Ora", 23))
+
+    times = pd.to_datetime(parsed["date"])
+    assert len(parsed) == 23 and (times.dt.date == pd.Timestamp("2024-03-31").date()).all()
+    assert 2 not in times.dt.hour.tolist() and not parsed["fold"].any()
+    assert times.iloc[-1] == pd.Timestamp("2024-03-31 23:00")
@@ -0,0 +1,34 @@
+from contextlib import closing
+
+from core import schema
+from scripts import pun
+
+
+def _write(path, rows):
+    lines = ["Data;€/MWh"] + [f"{day};{price:.2f}".replace(".", ",") for day, price in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+DAYS = [(f"{day:02d}/12/2024", 100.0 + day) for day in range(1, 11)]
+
+
+def test_unchanged_export_is_skipped_and_appended_lines_parsed_alone(tmp_path):
+    path = _write(tmp_path / "pun.csv", DAYS)
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn:
+        assert pun.ingest(conn, path) == (10, 10, "2024-12-01")
+        assert pun.ingest(conn, path) is None  # same bytes: not even parsed
+
+        _write(tmp_path / "pun.csv", DAYS + [("11/12/2024", 111.0), ("12/12/2024", 112.0)])
+        assert pun.ingest(conn, path) == (2, 2, "2024-12-11")  # only the new lines
+        assert conn.execute("SELECT COUNT(*) FROM pun_prices").fetchone()[0] == 12
+
+
+def test_rewritten_export_updates_only_changed_prices(tmp_path):
+    path = _write(tmp_path / "pun.csv", DAYS)
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn:
+        pun.ingest(conn, path)
+        revised = [(day, 999.0 if day.startswith("05/") else price) for day, price in DAYS]
+        _write(tmp_path / "pun.csv", revised)
+        assert pun.ingest(conn, path) == (10, 1, "2024-12-05")  # full parse, one row written
+        assert conn.execute("SELECT price FROM pun_prices WHERE date = '2024-12-05'").fetchone()[0] == 999.0
@@ -0,0 +1,70 @@
+from contextlib import closing
+
+import numpy as np
+import pytest
+
+from core import data_access, range_stats, schema
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    """Counts of refresh() builds and direct series reads made by range_stats."""
+    counts = {"refresh": 0, "load": 0}
+    refresh, load = range_stats.refresh, data_access.load
+
+    def counted_refresh(*args, **kwargs):
+        counts["refresh"] += 1
+        return refresh(*args, **kwargs)
+
+    def counted_load(*args, **kwargs):
+        counts["load"] += 1
+        return load(*args, **kwargs)
+    monkeypatch.setattr(range_stats, "refresh", counted_refresh)
+    monkeypatch.setattr(data_access, "load", counted_load)
+    monkeypatch.setattr(range_stats, "_cache", {})
+    return counts
+
+
+def test_unindexed_series_is_built_and_saved_once(daily_db, reads):
+    with closing(schema.connect(daily_db)) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM range_stats").fetchone()[0] == 0  # as after the v5 migration
+    for _ in range(3):
+        stats = {col: range_stats.summary("weather_data", col, "2024-03-01", "2024-05-31", key="bari", db_path=daily_db)
+                 for col in range_stats.SERIES_COLUMNS["weather_data"]}
+    assert reads == {"refresh": 1, "load": 0}  # one build covers every column of the city
+
+    with closing(schema.connect(daily_db)) as conn:
+        saved = {row[0] for row in conn.execute("SELECT column_name FROM range_stats WHERE series_key = 'bari'")}
+    assert saved == set(range_stats.SERIES_COLUMNS["weather_data"])
+
+    rows = data_access.load("weather_data", key="bari", start="2024-03-01", end="2024-05-31", db_path=daily_db)
+    assert stats["tavg"]["mean"] == pytest.approx(rows["tavg"].mean())
+    assert stats["tmin"]["min"] == rows["tmin"].min()
+    assert stats["prcp"]["std"] == pytest.approx(rows["prcp"].std())
+
+    range_stats._cache.clear()  # another process: reads the saved index, builds nothing
+    range_stats.summary("weather_data", "tavg", key="bari", db_path=daily_db)
+    assert reads["refresh"] == 1
+
+
+def test_combined_series_is_cached_until_the_table_changes(daily_db, reads):
+    for _ in range(3):
+        stats = range_stats.summary("load_forecast", "load_mw", db_path=daily_db)
+    assert reads["load"] == 1
+    assert stats["count"] == len(data_access.load("load_forecast", db_path=daily_db))
+
+    with closing(schema.connect(daily_db)) as conn, conn:
+        schema.bump_data_version(conn, "load_forecast")
+    range_stats.summary("load_forecast", "load_mw", db_path=daily_db)
+    assert reads["load"] == 3  # the count check above, then one rebuild
+    assert np.isfinite(stats["mean"])
+
+
+def test_hourly_rows_after_daily_history_are_indexed(daily_db, reads):
+    with closing(schema.connect(daily_db)) as conn, conn:
+        conn.executemany("INSERT INTO pun_prices (date, price) VALUES (?, ?)",
+                         [(f"2025-01-01 {hour:02d}:00:00", 100.0 + hour) for hour in range(24)])
+        range_stats.refresh(conn, "pun_prices")
+    stats = range_stats.summary("pun_prices", "price", "2025-01-01", "2025-01-01", db_path=daily_db)
+    assert stats["count"] == 24
+    assert stats["mean"] == pytest.approx(111.5)
@@ -0,0 +1,42 @@
+from contextlib import closing
+
+import pytest
+
+from core import data_access, resolution, schema
+
+
+def test_hourly_prices_average_into_days(hourly_db):
+    hourly = data_access.load("pun_prices", start="2024-06-01", end="2024-06-02", db_path=hourly_db)
+    daily = data_access.load("pun_prices", start="2024-06-01", end="2024-06-02", freq="D", db_path=hourly_db)
+
+    assert len(hourly) == 48 and len(daily) == 2
+    expected = hourly.groupby(hourly["date"].dt.normalize())["price"].mean()
+    assert daily["price"].tolist() == pytest.approx(expected.tolist())
+    assert daily["date"].tolist() == expected.index.tolist()
+
+
+def test_hourly_load_sums_to_daily_energy(hourly_db):
+    zone = data_access.distinct_keys("load_forecast", hourly_db)[0]
+    hourly = data_access.load("load_forecast", key=zone, start="2024-06-01", end="2024-06-01", db_path=hourly_db)
+    daily = data_access.load("load_forecast", key=zone, start="2024-06-01", end="2024-06-01", freq="D",
+                             db_path=hourly_db)
+
+    assert len(hourly) == 24 and len(daily) == 1
+    assert daily["load_mw"].iloc[0] == pytest.approx(hourly["load_mw"].sum())  # MW x 1 h per row
+
+
+def test_stored_resolution_is_inferred(hourly_db):
+    assert data_access.native_freq("pun_prices", db_path=hourly_db) == "h"
+    assert resolution.infer_freq(["2024-06-01", "2024-06-02"]) == "D"
+    assert resolution.infer_freq(["2024-06-01 00:00:00", "2024-06-01 00:15:00"]) == "15min"
+
+
+def test_sub_daily_rows_replace_the_daily_row_of_their_day(tmp_path):
+    with closing(schema.connect(str(tmp_path / "data.db"))) as conn, conn:
+        conn.executemany("INSERT INTO pun_prices (date, price) VALUES (?, ?)",
+                         [("2024-06-01", 100.0), ("2024-06-02", 110.0)])
+        dropped = resolution.drop_daily_rows(conn, "pun_prices", "date",
+                                             ["2024-06-01 00:00:00", "2024-06-01 01:00:00"])
+        remaining = [row[0] for row in conn.execute("SELECT date FROM pun_prices")]
+    assert dropped == 1
+    assert remaining == ["2024-06-02"]
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from core import registry, search, training
+
+MODULES = {"XGBRegressor": "xgboost", "LGBMRegressor": "lightgbm", "CatBoostRegressor": "catboost"}
+
+
+@pytest.mark.parametrize("family", training.RACED)
+def test_raced_booster_refits_every_horizon(family):
+    pytest.importorskip(MODULES[family])
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 5))
+    Y = np.column_stack([X[:, 0] * (h + 1) + rng.normal(scale=0.1, size=300) for h in range(3)])
+    X_train, Y_train, X_val, Y_val = X[:200], Y[:200], X[200:], Y[200:]
+
+    first, _, rounds = search.fit_booster(family, {}, 50, X_train, Y_train[:, 0], X_val, Y_val[:, 0])
+    params = {search.ROUNDS_PARAM[family]: rounds}
+    model = registry.HorizonModel([first] + training.refit_horizons(first, params, X_train, Y_train[:, 1:],
+                                                                      X_val, Y_val[:, 1:], threads=2))
+
+    predictions = model.predict(X_val)
+    assert predictions.shape == (100, 3)
+    assert np.corrcoef(predictions[:, 2], Y_val[:, 2])[0, 1] > 0.9
+
+
+def test_multi_horizon_model_from_a_spawned_worker_loads_in_the_predictor(tmp_path):
+    pytest.importorskip("lightgbm")
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    from contextlib import closing
+
+    import pandas as pd
+    from core import feature_store, predict, schema
+
+    rng = np.random.default_rng(0)
+    dates = pd.date_range("2022-01-01", "2024-12-31", freq="D")
+    features = pd.DataFrame({"date": dates, "f1": rng.normal(size=len(dates)), "f2": rng.normal(size=len(dates))})
+    features["target_pun"] = 100 + 10 * features["f1"]
+    root = str(tmp_path / "features")
+    feature_store.write_dataset(features, "total_pun_model_features", root=root)
+    shared = training.share_datasets(["total_pun_model_features"], str(tmp_path), root=root, horizons=2)
+
+    context = multiprocessing.get_context("spawn")  # as train_all: the model is pickled back from a fresh interpreter
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        result = pool.submit(training.train_model, "LGBMRegressor", shared["total_pun_model_features"], 1,
+                             {"n_iter": 2}).result()
+    db_path = str(tmp_path / "data.db")
+    with closing(schema.connect(db_path)) as conn:
+        registry.register(conn, "LGBMRegressor", result["model"], result["scaler"], result["features"],
+                          dataset="total_pun_model_features", root=str(tmp_path / "models"), horizons=2)
+
+    predictor = predict.Predictor(db_path)
+    assert type(predictor.load("LGBMRegressor")["model"]).__module__ == "core.registry"
+    assert predictor.predict("LGBMRegressor", features.tail(10)).shape == (10, 2)